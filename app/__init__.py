@@ -4,11 +4,19 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.server import start_server
 from app.server.errors import CustomError
-
-from .adapters import init_loggers, logger
+from app.services import (
+    apply_storage_policies,
+    resume_gap_filler_jobs,
+    stop_gap_filler_jobs,
+    update_gap_filler_job_stage,
+    watch_gap_filler_jobs,
+)
+
+from .adapters import init_loggers, logger, pipeline_executor, watch_db_pool
 from .config import config
 from .connections import connections
 
@@ -22,6 +30,20 @@ async def start_app(app=FastAPI) -> FastAPI:
     init_loggers(config.LOG_LEVEL)
 
     api_sever = start_server(app)
+    pipeline_executor.start()
+    pipeline_executor.on_progress(update_gap_filler_job_stage)
+    watch_db_pool(engine=connections.engine)
+    try:
+        await apply_storage_policies(engine=connections.engine)
+    except (SQLAlchemyError, OSError):
+        # NOTE: the service still serves uploads when the DB is not reachable yet, policies are applied next start
+        logger.exception("Storage policies could not be applied")
+
+    try:
+        await resume_gap_filler_jobs()
+    except (SQLAlchemyError, OSError):
+        logger.exception("Orphaned gap filler jobs could not be queued again")
+    watch_gap_filler_jobs()
 
     logger.info("%s Service is starting...", config.SERVICE_NAME)
     logger.info("%s Server running on PORT %s", config.SERVICE_NAME, config.PORT)
@@ -31,6 +53,12 @@ async def start_app(app=FastAPI) -> FastAPI:
 async def shutdown_app() -> None:
     """Shutdown FastAPI Server and Connections."""
     logger.info("Shutdown -> Server shutting down")
+    try:
+        await stop_gap_filler_jobs()
+    except (SQLAlchemyError, OSError):
+        # NOTE: the interrupted jobs are still resumed once their lease expires
+        logger.exception("Leases of the gap filler jobs could not be released")
+    pipeline_executor.shutdown()
     await connections.engine.dispose()
 
 
@@ -1,3 +1,16 @@
 from .logger import init_loggers, logger
+from .metrics import Metric, export_metrics, record_metric, stage_timer, watch_db_pool
+from .process_pool import PipelineExecutor, pipeline_executor, report_progress
 
-__all__ = ["init_loggers", "logger"]
+__all__ = [
+    "Metric",
+    "PipelineExecutor",
+    "export_metrics",
+    "init_loggers",
+    "logger",
+    "pipeline_executor",
+    "record_metric",
+    "report_progress",
+    "stage_timer",
+    "watch_db_pool",
+]
@@ -0,0 +1,182 @@
+import itertools
+from collections.abc import AsyncGenerator, Iterator, Sequence
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import NamedTuple
+
+import asyncpg
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .models import TimeSeriesData, UploadBatch
+
+STAGING_TABLE_NAME = "energy_staging"
+
+
+class SeriesRecords(NamedTuple):
+    """Points of a series to be stored."""
+
+    series_id: str
+    timestamps: np.ndarray
+    energy: np.ndarray
+
+
+@asynccontextmanager
+async def driver_transaction(engine: AsyncEngine) -> AsyncGenerator[asyncpg.Connection]:
+    """Check out a pooled connection and open a transaction directly on its asyncpg connection.
+
+    The asyncpg connection is needed for COPY, which SQLAlchemy does not expose. The transaction is committed when
+    the block exits and rolled back if it raises.
+
+    Args:
+        engine (AsyncEngine): The configured asynchronous database engine.
+
+    Yields:
+        asyncpg.Connection: The driver connection, inside a transaction.
+    """
+    async with engine.connect() as conn:
+        raw_conn = await conn.get_raw_connection()
+        driver_conn: asyncpg.Connection = raw_conn.driver_connection
+        async with driver_conn.transaction():
+            yield driver_conn
+
+
+def timeseries_records(
+    series_id: str,
+    timestamps: np.ndarray,
+    energy: np.ndarray,
+) -> Iterator[tuple[str, datetime, float]]:
+    """Build the COPY records of a timeseries straight from its arrays.
+
+    `tolist` converts a whole array to python objects in one C loop, way cheaper than iterating over DataFrame rows.
+
+    Args:
+        series_id (str): Id of the series, repeated in every record.
+        timestamps (np.ndarray): datetime64 timestamps.
+        energy (np.ndarray): Energy values.
+
+    Returns:
+        Iterator[tuple[str, datetime, float]]: Lazy iterator of (series_id, timestamp, energy) records.
+    """
+    return zip(
+        itertools.repeat(series_id, len(timestamps)),
+        timestamps.astype("datetime64[us]").tolist(),
+        energy.astype(np.float64, copy=False).tolist(),
+        strict=False,
+    )
+
+
+async def copy_timeseries_records(
+    conn: asyncpg.Connection,
+    table_name: str,
+    series_id: str,
+    timestamps: np.ndarray,
+    energy: np.ndarray,
+) -> int:
+    """Bulk load a timeseries into a staging table with a binary COPY.
+
+    Args:
+        conn (asyncpg.Connection): The driver connection.
+        table_name (str): Table to load the rows into, with series_id, timestamp and energy columns.
+        series_id (str): Id of the series.
+        timestamps (np.ndarray): datetime64 timestamps.
+        energy (np.ndarray): Energy values.
+
+    Returns:
+        int: Number of rows copied.
+    """
+    await conn.copy_records_to_table(
+        table_name,
+        records=timeseries_records(series_id=series_id, timestamps=timestamps, energy=energy),
+        columns=["series_id", "timestamp", "energy"],
+    )
+    return len(timestamps)
+
+
+async def reserve_upload_batch_id(conn: asyncpg.Connection) -> int:
+    """Take the id of a new upload batch, its row is only inserted once the upload has written points.
+
+    Args:
+        conn (asyncpg.Connection): The driver connection.
+
+    Returns:
+        int: Id of the upload batch.
+    """
+    batch_id: int = await conn.fetchval(
+        f"SELECT nextval(pg_get_serial_sequence('{UploadBatch.__tablename__}', 'id'))",
+    )
+    return batch_id
+
+
+async def insert_upload_batch(conn: asyncpg.Connection, batch_id: int, series_count: int, points: int) -> None:
+    """Record what an upload wrote in the upload batches table, its id tags every point the upload wrote.
+
+    Args:
+        conn (asyncpg.Connection): The driver connection.
+        batch_id (int): Id of the upload batch, see `reserve_upload_batch_id`.
+        series_count (int): Number of series with points written.
+        points (int): Number of points inserted or updated.
+    """
+    await conn.execute(
+        f"INSERT INTO {UploadBatch.__tablename__} (id, series_count, points) VALUES ($1, $2, $3)",  # noqa: S608
+        batch_id,
+        series_count,
+        points,
+    )
+
+
+async def upsert_timeseries_batch(conn: asyncpg.Connection, batch: Sequence[SeriesRecords]) -> int:
+    """Bulk upsert many series: COPY them all into a staging table, then merge it on the (series_id, timestamp) key.
+
+    The staging table is a temporary table, it skips the WAL like an unlogged table, it is private to the session
+    so concurrent uploads never see each other rows, and it is dropped on commit. Points whose value did not change
+    are left untouched, so re sending the same series does not rewrite any row. Points written are tagged with a new
+    upload batch, recorded only when the merge wrote points, see `insert_upload_batch`.
+
+    Must run inside a transaction, see `driver_transaction`.
+
+    Args:
+        conn (asyncpg.Connection): The driver connection.
+        batch (Sequence[SeriesRecords]): Points of every series, timestamps without duplicates.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    batch_id = await reserve_upload_batch_id(conn=conn)
+    await conn.execute(
+        f"""
+        CREATE TEMPORARY TABLE {STAGING_TABLE_NAME} (
+            series_id varchar(255) NOT NULL,
+            timestamp timestamp without time zone NOT NULL,
+            energy double precision NOT NULL
+        ) ON COMMIT DROP
+        """,
+    )
+    for records in batch:
+        await copy_timeseries_records(
+            conn=conn,
+            table_name=STAGING_TABLE_NAME,
+            series_id=records.series_id,
+            timestamps=records.timestamps,
+            energy=records.energy,
+        )
+
+    points, series_count = await conn.fetchrow(
+        f"""
+        WITH written AS (
+            INSERT INTO {TimeSeriesData.__tablename__} (series_id, timestamp, energy, batch_id)
+            SELECT staging.series_id, staging.timestamp, staging.energy, $1 FROM {STAGING_TABLE_NAME} AS staging
+            ON CONFLICT (series_id, timestamp) DO UPDATE
+            SET energy = EXCLUDED.energy, batch_id = EXCLUDED.batch_id
+            WHERE {TimeSeriesData.__tablename__}.energy IS DISTINCT FROM EXCLUDED.energy
+            RETURNING series_id
+        )
+        SELECT count(*), count(DISTINCT series_id) FROM written
+        """,  # noqa: S608
+        batch_id,
+    )
+    if points:
+        await insert_upload_batch(conn=conn, batch_id=batch_id, series_count=series_count, points=points)
+
+    rows: int = points
+    return rows
@@ -1,4 +1,18 @@
-from .base_table import BaseModel
+from .base_table import Base, BaseModel
 from .energy_consumption import TimeSeriesData
+from .energy_rollups import ENERGY_DAILY, ENERGY_HOURLY, ENERGY_MONTHLY
+from .gap_filler_job import GapFillerJob, JobStage, JobStatus
+from .upload_batch import UploadBatch
 
-__all__ = ["BaseModel", "TimeSeriesData"]
+__all__ = [
+    "ENERGY_DAILY",
+    "ENERGY_HOURLY",
+    "ENERGY_MONTHLY",
+    "Base",
+    "BaseModel",
+    "GapFillerJob",
+    "JobStage",
+    "JobStatus",
+    "TimeSeriesData",
+    "UploadBatch",
+]
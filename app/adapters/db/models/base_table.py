@@ -4,19 +4,8 @@ from sqlalchemy import DateTime, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
-class BaseModel(DeclarativeBase):
-    """Base field for all the tables."""
-
-    __abstract__ = True
-
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        server_default=func.now(),
-        onupdate=func.now(),
-        nullable=False,
-    )
-    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=None)
+class Base(DeclarativeBase):
+    """Base of all the tables, tables storing a row per point do not carry the audit fields."""
 
     def as_dict(self) -> dict:
         """Return the model as a dictionary.
@@ -35,3 +24,18 @@ class BaseModel(DeclarativeBase):
         column_representations = [f"{column.name}={getattr(self, column.name)!r}" for column in self.__table__.columns]
 
         return f"{self.__class__.__name__}({', '.join(column_representations)})"
+
+
+class BaseModel(Base):
+    """Base field for all the tables."""
+
+    __abstract__ = True
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=None)
@@ -1,16 +1,23 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer
+from sqlalchemy import BigInteger, DateTime, Float, String
 from sqlalchemy.orm import Mapped, mapped_column
 
-from .base_table import BaseModel
+from .base_table import Base
 
 
-class TimeSeriesData(BaseModel):
-    """Timeseries table."""
+class TimeSeriesData(Base):
+    """Timeseries table, a TimescaleDB hypertable partitioned on `timestamp`.
+
+    Points are kept narrow, the audit fields are stored once per upload in `UploadBatch`. The (series_id, timestamp)
+    primary key holds the partitioning column every unique key of a hypertable needs, and is the composite index
+    serving the reads of a series over a time range.
+    """
 
     __tablename__ = "energy"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, nullable=False, index=True)
+    series_id: Mapped[str] = mapped_column(String(255), primary_key=True, nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
     energy: Mapped[float] = mapped_column(Float, nullable=False)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # NOTE: no foreign key, its check on every point would slow down the inserts the narrow layout speeds up
+    batch_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
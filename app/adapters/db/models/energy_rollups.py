@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, DateTime, Float, String, TableClause, column, table
+
+
+def _energy_rollup(name: str) -> TableClause:
+    # NOTE: continuous aggregates are created by their migration, they are kept out of the models metadata
+    return table(
+        name,
+        column("series_id", String),
+        column("timestamp", DateTime),
+        column("energy_sum", Float),
+        column("energy_min", Float),
+        column("energy_max", Float),
+        column("points", BigInteger),
+    )
+
+
+ENERGY_HOURLY = _energy_rollup("energy_hourly")
+ENERGY_DAILY = _energy_rollup("energy_daily")
+ENERGY_MONTHLY = _energy_rollup("energy_monthly")
@@ -0,0 +1,50 @@
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_table import BaseModel
+
+
+class JobStatus(StrEnum):
+    """Lifecycle of a gap filler job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobStage(StrEnum):
+    """Pipeline stage a running job is at."""
+
+    PARSING = "parsing"
+    RESAMPLING = "resampling"
+    TRAINING = "training"
+    PREDICTING = "predicting"
+    STORING = "storing"
+
+
+class GapFillerJob(BaseModel):
+    """Gap filler jobs table."""
+
+    __tablename__ = "gap_filler_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=JobStatus.QUEUED, index=True)
+    series_id: Mapped[str] = mapped_column(String(255), nullable=False, server_default="default")
+    stage: Mapped[str | None] = mapped_column(String(16), nullable=True, default=None)
+    file_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    file_extension: Mapped[str] = mapped_column(String(16), nullable=False)
+    file_path: Mapped[str] = mapped_column(Text, nullable=False)
+    # NOTE: nullable, jobs queued before it was recorded are resumed with the configured engine
+    imputation_engine: Mapped[str | None] = mapped_column(String(32), nullable=True, default=None)
+    # NOTE: the worker renews the lease of its jobs while it is alive, jobs with an expired lease are orphaned
+    worker_id: Mapped[str | None] = mapped_column(String(255), nullable=True, default=None)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=None)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True, default=None)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=None)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=None)
@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_table import BaseModel
+
+
+class UploadBatch(BaseModel):
+    """Upload batches table, the audit fields of every point written by an upload."""
+
+    __tablename__ = "upload_batches"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True, nullable=False)
+    series_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    points: Mapped[int] = mapped_column(BigInteger, nullable=False)
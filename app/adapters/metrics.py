@@ -0,0 +1,203 @@
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, nullcontext
+from enum import StrEnum
+from types import TracebackType
+from typing import NamedTuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from app.config import config
+
+
+class Metric(StrEnum):
+    """Metrics recorded by the gap filler pipeline."""
+
+    STAGE_SECONDS = "gap_filler_stage_seconds"
+    ROWS_INGESTED = "gap_filler_rows_ingested"
+    MISSING_RATIO = "gap_filler_missing_ratio"
+    MODEL_FITS = "gap_filler_model_fits"
+    MODEL_CACHE_HITS = "gap_filler_model_cache_hits"
+
+
+class MetricSample(NamedTuple):
+    """Value recorded for a metric, buffered by the pool processes until their job result is sent back."""
+
+    metric: Metric
+    labels: tuple[str, ...]
+    value: float
+
+
+_METRICS: dict[Metric, Counter | Histogram] = {
+    Metric.STAGE_SECONDS: Histogram(
+        Metric.STAGE_SECONDS,
+        "Seconds spent in every stage of the gap filler pipeline",
+        ["stage"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+    ),
+    Metric.ROWS_INGESTED: Counter(Metric.ROWS_INGESTED, "Points inserted or updated in the energy table"),
+    Metric.MISSING_RATIO: Histogram(
+        Metric.MISSING_RATIO,
+        "Share of missing points of every processed series, before its gaps are filled",
+        buckets=(0, 0.01, 0.05, 0.1, 0.2, 0.3, 0.4, 0.6, 0.8, 1),
+    ),
+    Metric.MODEL_FITS: Counter(Metric.MODEL_FITS, "Imputation models trained", ["engine"]),
+    Metric.MODEL_CACHE_HITS: Counter(
+        Metric.MODEL_CACHE_HITS,
+        "Trained imputation models reused from the model cache instead of being fitted",
+        ["engine"],
+    ),
+}
+
+# NOTE: only set inside the pool processes, their samples travel back with the result of the job, see `buffer_metrics`
+_samples: list[MetricSample] | None = None
+_NO_TIMER = nullcontext()
+_db_pool_collector: Collector | None = None
+
+
+def buffer_metrics() -> None:
+    """Keep the samples recorded by this process until `drain_metrics`, called in every pool process."""
+    global _samples  # noqa: PLW0603
+    _samples = []
+
+
+def drain_metrics() -> list[MetricSample]:
+    """Take the samples buffered since the last call.
+
+    Returns:
+        list[MetricSample]: The buffered samples, empty outside of the pool processes.
+    """
+    global _samples
+    if _samples is None:
+        return []
+
+    samples, _samples = _samples, []
+    return samples
+
+
+def record_metric(metric: Metric, value: float, *labels: str) -> None:
+    """Record a value, added to a counter or observed by a histogram, it is a no-op when metrics are disabled.
+
+    Args:
+        metric (Metric): The metric recorded.
+        value (float): Increment of a counter or value observed by a histogram.
+        *labels (str): Values of the labels of the metric.
+    """
+    if not config.METRICS_ENABLED:
+        return
+
+    if _samples is not None:
+        _samples.append(MetricSample(metric=metric, labels=labels, value=value))
+        return
+
+    collector = _METRICS[metric]
+    if isinstance(collector, Counter):
+        (collector.labels(*labels) if labels else collector).inc(value)
+    else:
+        (collector.labels(*labels) if labels else collector).observe(value)
+
+
+def record_samples(samples: list[MetricSample]) -> None:
+    """Record the samples sent back by a pool process.
+
+    Args:
+        samples (list[MetricSample]): Samples drained in the pool process.
+    """
+    for sample in samples:
+        record_metric(sample.metric, sample.value, *sample.labels)
+
+
+class _StageTimer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        record_metric(Metric.STAGE_SECONDS, time.perf_counter() - self.start, self.stage)
+
+
+def stage_timer(stage: str) -> AbstractContextManager[None]:
+    """Time a stage of the pipeline into `gap_filler_stage_seconds`, failed runs of the stage are timed as well.
+
+    When metrics are disabled a shared no-op context is returned, nothing is allocated nor timed.
+
+    Args:
+        stage (str): Name of the stage.
+
+    Returns:
+        AbstractContextManager[None]: Context timing the code it wraps.
+    """
+    if not config.METRICS_ENABLED:
+        return _NO_TIMER
+
+    return _StageTimer(stage)
+
+
+class DBPoolCollector(Collector):
+    """Report the connections of the DB pool of an engine, read every time the metrics are scraped."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        """Initialize the collector.
+
+        Args:
+            engine (AsyncEngine): Engine whose pool is reported.
+        """
+        self.engine = engine
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        """Collect the size of the pool and its connections by state.
+
+        Yields:
+            GaugeMetricFamily: The pool size and the connections checked out, idle and beyond the pool size.
+        """
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+
+        yield GaugeMetricFamily("gap_filler_db_pool_size", "Connections the DB pool keeps open", value=pool.size())
+        connections = GaugeMetricFamily(
+            "gap_filler_db_pool_connections",
+            "Connections of the DB pool by state",
+            labels=["state"],
+        )
+        connections.add_metric(["checked_out"], pool.checkedout())
+        connections.add_metric(["idle"], pool.checkedin())
+        connections.add_metric(["overflow"], max(pool.overflow(), 0))
+        yield connections
+
+
+def watch_db_pool(engine: AsyncEngine) -> None:
+    """Export the usage of the DB pool of an engine, it is a no-op when metrics are disabled or already exported.
+
+    Args:
+        engine (AsyncEngine): Engine whose pool is reported.
+    """
+    global _db_pool_collector  # noqa: PLW0603
+    if not config.METRICS_ENABLED or _db_pool_collector is not None:
+        return
+
+    _db_pool_collector = DBPoolCollector(engine=engine)
+    REGISTRY.register(_db_pool_collector)
+
+
+def export_metrics() -> tuple[bytes, str]:
+    """Render every metric in the Prometheus text format.
+
+    Returns:
+        tuple[bytes, str]: The rendered metrics and their media type.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,203 @@
+import asyncio
+import multiprocessing
+import queue
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from multiprocessing.queues import Queue
+
+from app.config import config
+from app.server.errors import InternalServerError, ServiceUnavailableError
+
+from .logger import init_loggers, logger
+from .metrics import MetricSample, buffer_metrics, drain_metrics, record_samples
+
+type ProgressHandler = Callable[[str, str], Awaitable[None]]
+
+# NOTE: only set inside the pool processes, see `_init_worker`
+_progress_queue: Queue[tuple[str, str] | None] | None = None
+
+
+def _init_worker(log_level: str, progress_queue: Queue[tuple[str, str] | None]) -> None:
+    """Set up loggers, metrics and the progress queue of a pool process."""
+    global _progress_queue  # noqa: PLW0603
+    _progress_queue = progress_queue
+    init_loggers(log_level)
+    buffer_metrics()
+
+
+def _run_with_metrics[T](func: Callable[..., T], *args: object) -> tuple[T, list[MetricSample]]:
+    """Run a job in a pool process and send back the metrics it recorded along with its result.
+
+    Returns:
+        tuple[T, list[MetricSample]]: The value returned by the function and the samples recorded since the last job.
+    """
+    # NOTE: the samples of a failed job are kept and sent back with the next one
+    return func(*args), drain_metrics()
+
+
+def report_progress(job_id: str, stage: str) -> None:
+    """Report from a pool process the stage a job has reached, it is a no-op outside of the pool.
+
+    Args:
+        job_id (str): Id of the job being processed.
+        stage (str): Stage the job has reached.
+    """
+    if _progress_queue is None:
+        return
+
+    try:
+        _progress_queue.put_nowait((job_id, stage))
+    except queue.Full:
+        logger.warning("Progress queue is full, dropping stage %s of job %s", stage, job_id)
+
+
+class PipelineExecutor:
+    """Bounded process pool used to run the CPU bound gap filler pipeline off the event loop.
+
+    At most ``workers`` jobs run in parallel and at most ``max_queued`` more wait for a free process, anything beyond
+    that is rejected straight away so a burst of uploads cannot pile up unbounded work on a single API worker.
+    """
+
+    def __init__(self, workers: int, max_queued: int, timeout: float, max_tasks_per_worker: int | None = None) -> None:
+        """Initialize the executor, processes are only spawned on `start`.
+
+        Args:
+            workers (int): Number of processes in the pool.
+            max_queued (int): Number of jobs allowed to wait for a free process.
+            timeout (float): Max seconds to wait for a job result.
+            max_tasks_per_worker (int | None): Jobs a process runs before being replaced.
+        """
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._pool: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._progress_queue: Queue[tuple[str, str] | None] | None = None
+        self._progress_task: asyncio.Task[None] | None = None
+        self._progress_handler: ProgressHandler | None = None
+
+    def start(self) -> None:
+        """Spawn the process pool."""
+        if self._pool is not None:
+            return
+
+        # NOTE: spawn avoids forking a process that already holds the event loop and the DB engine
+        mp_context = multiprocessing.get_context("spawn")
+        self._progress_queue = mp_context.Queue()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(config.LOG_LEVEL, self._progress_queue),
+            max_tasks_per_child=self.max_tasks_per_worker,
+        )
+        self._slots = asyncio.Semaphore(self.workers + self.max_queued)
+        self._progress_task = asyncio.create_task(self._drain_progress(self._progress_queue))
+        logger.info("Pipeline process pool started with %s workers", self.workers)
+
+    def shutdown(self) -> None:
+        """Stop the process pool, running jobs are cancelled."""
+        if self._pool is None:
+            return
+
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+
+        self._pool = None
+        self._slots = None
+        self._progress_queue = None
+        self._progress_task = None
+
+    def on_progress(self, handler: ProgressHandler) -> None:
+        """Register the coroutine called with ``(job_id, stage)`` every time a job reports its progress.
+
+        Args:
+            handler (ProgressHandler): Coroutine function handling the progress updates, called one at a time.
+        """
+        self._progress_handler = handler
+
+    async def _drain_progress(self, progress_queue: Queue[tuple[str, str] | None]) -> None:
+        """Forward the progress reported by the pool processes to the registered handler."""
+        while (update := await asyncio.to_thread(progress_queue.get)) is not None:
+            if self._progress_handler is None:
+                continue
+
+            try:
+                await self._progress_handler(*update)
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to handle progress %s", update)
+
+    @property
+    def is_full(self) -> bool:
+        """Check if the pool can not accept any more jobs."""
+        return self._slots is not None and self._slots.locked()
+
+    async def run[T](self, func: Callable[..., T], *args: object, wait_for_slot: bool = False) -> T:
+        """Run a function in the process pool and wait for its result.
+
+        A slot is held until the job really finishes in its process, even after a timeout, so the bound on running
+        and queued jobs always reflects the work the pool is doing.
+
+        Args:
+            func (Callable[..., T]): Top level (picklable) function to run.
+            *args (object): Picklable arguments for the function.
+            wait_for_slot (bool): Wait for a free slot instead of rejecting the job when the pool is full.
+
+        Returns:
+            T: The value returned by the function.
+
+        Raises:
+            ServiceUnavailableError: If the pool is not running or it is full.
+            InternalServerError: If the job exceeds the configured timeout.
+        """
+        if self._pool is None or self._slots is None:
+            err_msg = "Pipeline process pool is not running"
+            raise ServiceUnavailableError(err_msg)
+
+        if self._slots.locked() and not wait_for_slot:
+            err_msg = "Too many timeseries being processed, try again later"
+            raise ServiceUnavailableError(err_msg)
+
+        slots = self._slots
+        await slots.acquire()
+
+        loop = asyncio.get_running_loop()
+        try:
+            concurrent_future: Future[tuple[T, list[MetricSample]]] = self._pool.submit(
+                partial(_run_with_metrics, func, *args),
+            )
+        except BaseException:
+            slots.release()
+            raise
+
+        concurrent_future.add_done_callback(lambda _: self._release_slot(loop, slots))
+
+        try:
+            result, samples = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(concurrent_future)),
+                self.timeout,
+            )
+        except TimeoutError as err:
+            concurrent_future.cancel()
+            err_msg = f"Timeseries processing exceeded {self.timeout} seconds"
+            raise InternalServerError(err_msg, status_code=504) from err
+
+        record_samples(samples)
+        return result
+
+    @staticmethod
+    def _release_slot(loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore) -> None:
+        """Release a slot from the pool thread once a job is done."""
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(slots.release)
+
+
+pipeline_executor = PipelineExecutor(
+    workers=config.PIPELINE_WORKERS,
+    max_queued=config.PIPELINE_MAX_QUEUED_JOBS,
+    timeout=config.PIPELINE_JOB_TIMEOUT,
+    max_tasks_per_worker=config.PIPELINE_MAX_TASKS_PER_WORKER,
+)
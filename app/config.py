@@ -1,3 +1,6 @@
+import os
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -19,6 +22,10 @@ class Config(BaseSettings):
         description="Python logging level. Must be a string like 'DEBUG' or 'ERROR'.",
         default="INFO",
     )
+    METRICS_ENABLED: bool = Field(
+        description="Record the pipeline metrics exposed on /metrics, disabled they cost a config lookup per stage",
+        default=True,
+    )
 
     # DB
     LOGS_DB: bool = Field(description="Display logs sqlalchemy", default=False)
@@ -29,6 +36,127 @@ class Config(BaseSettings):
     DB_PASSWORD: str = Field(description="DB Password", default="")
     DB_NAME: str = Field(description="DB Name", default="")
 
+    # PIPELINE
+    PIPELINE_WORKERS: int = Field(
+        description="Number of processes used to run the gap filler pipeline",
+        default_factory=lambda: os.cpu_count() or 1,
+    )
+    PIPELINE_MAX_QUEUED_JOBS: int = Field(
+        description="Jobs allowed to wait for a free process before new uploads are rejected",
+        default=16,
+    )
+    PIPELINE_JOB_TIMEOUT: float = Field(description="Max seconds a pipeline job can run", default=300)
+    PIPELINE_MAX_TASKS_PER_WORKER: int | None = Field(
+        description="Jobs a process runs before being replaced, None keeps processes alive",
+        default=None,
+    )
+    JOB_LEASE_SECONDS: float = Field(
+        description="Seconds a worker owns its queued and running jobs unless it renews them, jobs whose lease has "
+        "expired are resumed by any worker",
+        default=60,
+    )
+    CSV_CHUNK_ROWS: int = Field(
+        description="Rows of a CSV upload parsed at once, bounds the parsing memory, 0 parses the whole file at once",
+        default=100_000,
+    )
+    IMPUTATION_SHORT_GAP_MAX_SAMPLES: int = Field(
+        description="Gaps up to this many samples are interpolated instead of predicted, 0 always uses the model",
+        default=3,
+    )
+    IMPUTATION_SHORT_GAP_METHOD: Literal["linear", "seasonal_naive"] = Field(
+        description="How short gaps are filled, seasonal naive repeats the value of the previous day",
+        default="linear",
+    )
+    IMPUTATION_ENGINE: Literal["random_forest", "hist_gradient_boosting", "seasonal_profile"] = Field(
+        description="Engine used to predict long gaps when a request does not pick one",
+        default="random_forest",
+    )
+    RANDOM_FOREST_N_ESTIMATORS: int = Field(description="Number of trees of the random forest engine", default=100)
+    RANDOM_FOREST_N_JOBS: int = Field(
+        description="Threads used by the random forest engine, -1 uses every core",
+        default=1,
+    )
+    HIST_GRADIENT_BOOSTING_MAX_ITER: int = Field(
+        description="Boosting iterations (trees) of the histogram gradient boosting engine",
+        default=100,
+    )
+    HIST_GRADIENT_BOOSTING_THREADS: int = Field(
+        description="OpenMP threads used by the histogram gradient boosting engine",
+        default=1,
+    )
+    SEASONAL_PROFILE_LEVEL_WINDOW_HOURS: float = Field(
+        description="Hours on each side of a gap used to scale the seasonal profile to the local level, 0 disables it",
+        default=7 * 24,
+    )
+    IMPUTATION_FIT_TIME_BUDGET: float = Field(
+        description="Seconds a model fit can take before falling back to the seasonal profile engine, 0 disables it",
+        default=0,
+    )
+    TRAINING_WINDOW_HOURS: float = Field(
+        description="Hours of history on each side of a gap used to train its model, 0 trains on the whole series",
+        default=0,
+    )
+    TRAINING_MAX_ROWS: int = Field(
+        description="Max training rows per model, picked keeping the share of every hour and weekday, 0 keeps all",
+        default=0,
+    )
+    TRAINING_WINDOW_WORKERS: int = Field(
+        description="Threads used to train the models of independent gap windows in parallel",
+        default=1,
+    )
+    MODEL_CACHE_MAX_BYTES: int = Field(
+        description="Max bytes of trained models kept in memory by each pipeline process, 0 disables it",
+        default=512 * 1024 * 1024,
+    )
+    MODEL_CACHE_DIR: str = Field(
+        description="Directory where trained models are shared between processes, empty disables it",
+        default="",
+    )
+    MODEL_CACHE_MAX_DISK_BYTES: int = Field(
+        description="Max bytes of trained models stored in MODEL_CACHE_DIR, 0 means unbounded",
+        default=4 * 1024 * 1024 * 1024,
+    )
+    DEFAULT_SERIES_ID: str = Field(description="Series id used when an upload does not provide one", default="default")
+    MEASURE_SERIES_ID_SEPARATOR: str = Field(
+        description="Separator of the series id and the measure name identifying the extra measures of an upload",
+        default=":",
+    )
+    UPLOADS_DIR: str = Field(description="Directory where uploads are spooled before processing", default="")
+    RESULT_CACHE_PATH: str = Field(
+        description="SQLite database caching the filled series of uploads, shared by every worker, empty disables it",
+        default="",
+    )
+    RESULT_CACHE_TTL: float = Field(description="Seconds the filled series of an upload is reused", default=24 * 3600)
+    RESULT_CACHE_MAX_BYTES: int = Field(
+        description="Max bytes of filled series kept in RESULT_CACHE_PATH, 0 means unbounded",
+        default=1024 * 1024 * 1024,
+    )
+    APPEND_HISTORY_HOURS: float = Field(
+        description="Hours of stored history loaded as context when a new slice is appended to a series",
+        default=28 * 24,
+    )
+    READ_BATCH_ROWS: int = Field(
+        description="Rows fetched at once from the server-side cursor of a timeseries read",
+        default=10_000,
+    )
+    READ_FROM_ROLLUPS: bool = Field(
+        description="Answer aggregated reads from the continuous aggregates of the energy table when they exist",
+        default=True,
+    )
+    ENERGY_CHUNK_INTERVAL_HOURS: float = Field(
+        description="Time range of every chunk of the energy hypertable, a change applies to the chunks created next",
+        default=7 * 24,
+    )
+    ENERGY_COMPRESS_AFTER_DAYS: float = Field(
+        description="Chunks of the energy hypertable older than this are compressed, 0 disables it. Upserting points "
+        "into compressed chunks needs TimescaleDB 2.11 or later and is slower",
+        default=0,
+    )
+    ENERGY_RETENTION_DAYS: float = Field(
+        description="Chunks of the energy hypertable older than this are dropped, 0 keeps every point",
+        default=0,
+    )
+
     def _get_db_url(self) -> str:
         db_username = self.DB_USERNAME
         db_password = self.DB_PASSWORD
@@ -2,5 +2,6 @@ from .bad_request import BadRequestError
 from .custom_error import CustomError
 from .internal_server_error import InternalServerError
 from .not_found_error import NotFoundError
+from .service_unavailable_error import ServiceUnavailableError
 
-__all__ = ["BadRequestError", "CustomError", "InternalServerError", "NotFoundError"]
+__all__ = ["BadRequestError", "CustomError", "InternalServerError", "NotFoundError", "ServiceUnavailableError"]
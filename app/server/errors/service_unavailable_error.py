@@ -0,0 +1,22 @@
+from .custom_error import CustomError
+from .error_msg import ErrorMessage
+
+
+class ServiceUnavailableError(CustomError):
+    """Service Unavailable error."""
+
+    def __init__(self, message: str) -> None:
+        """Initialize ServiceUnavailableError with a message and a status code of 503.
+
+        Args:
+            message (str): The error message.
+        """
+        super().__init__(message, 503)
+
+    def serialize_error(self) -> list[ErrorMessage]:
+        """Serialize the error into a list of ErrorMessage.
+
+        Returns:
+            list[ErrorMessage]: A list containing the serialized error message.
+        """
+        return [ErrorMessage(message=self.message)]
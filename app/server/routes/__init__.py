@@ -1,9 +1,13 @@
 from fastapi import APIRouter
 
 from .gap_filler import router as filler_router
+from .gap_filler_jobs import router as filler_jobs_router
 from .monitoring import router as monitoring_router
+from .timeseries import router as timeseries_router
 
 router = APIRouter()
 
 router.include_router(monitoring_router)
 router.include_router(filler_router)
+router.include_router(filler_jobs_router)
+router.include_router(timeseries_router)
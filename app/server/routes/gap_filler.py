@@ -1,39 +1,126 @@
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, File, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from app.config import config
 from app.connections import connections
-from app.services import process_timeseries_data_at_different_freq, store_timeseries_data
+from app.services import (
+    DEFAULT_IMPUTATION_ENGINE,
+    ImputationEngineName,
+    append_gap_filler_timeseries,
+    fill_gap_filler_upload,
+    process_gap_filler_batch,
+)
 
 router = APIRouter()
 
 
 @router.post(
     "/filler",
-    tags="Filler",
+    tags=["Filler"],
     description="Gap Filler with ML algorithm to fill gaps in a timeseries data",
     status_code=status.HTTP_201_CREATED,
 )
 async def gap_filler_timeseries_data(
     timeseries_file: Annotated[UploadFile, File()],
     engine: Annotated[AsyncEngine, Depends(connections.get_engine)],
-    # file_details: Annotated[str, Form()],
-) -> dict:
+    series_id: Annotated[str, Form(min_length=1, max_length=255)] = config.DEFAULT_SERIES_ID,
+    imputation_engine: Annotated[ImputationEngineName, Form()] = DEFAULT_IMPUTATION_ENGINE,
+) -> dict[str, Any]:
     """Fill gaps in a timeseries data file using a machine learning algorithm.
 
     Parameters
     ----------
     timeseries_file : UploadFile
-        The uploaded timeseries data file.
+        The uploaded timeseries data file, CSV files can be gzip or zstd compressed. Files with many value columns
+        are filled at once, every column after the first is stored as the series "<series_id>:<column>".
+    engine : AsyncEngine
+        DB engine used to store the filled timeseries.
+    series_id : str
+        Id of the series, re uploading the same series updates its points. Re sending a byte-identical file
+        within `RESULT_CACHE_TTL` returns without processing it again.
+    imputation_engine : ImputationEngineName
+        Imputation engine used to predict long gaps.
+
+    Returns
+    -------
+    dict
+        A message indicating success, and whether the upload was already filled and its result reused.
+    """
+    cached = await fill_gap_filler_upload(
+        file=timeseries_file,
+        series_id=series_id,
+        engine=imputation_engine,
+        db_engine=engine,
+    )
+
+    return {"message": "Success", "cached": cached}
+
+
+@router.post(
+    "/filler/batch",
+    tags=["Filler"],
+    description="Gap Filler for many series at once, from a long format file with a series_id column or many files",
+    status_code=status.HTTP_201_CREATED,
+)
+async def gap_filler_timeseries_batch(
+    timeseries_files: Annotated[list[UploadFile], File()],
+    engine: Annotated[AsyncEngine, Depends(connections.get_engine)],
+    imputation_engine: Annotated[ImputationEngineName, Form()] = DEFAULT_IMPUTATION_ENGINE,
+) -> dict[str, Any]:
+    """Fill gaps in many series in parallel and store them all in a single transaction.
+
+    Parameters
+    ----------
+    timeseries_files : list[UploadFile]
+        The uploaded files, either long format files with a series_id column or one file per series named after it.
+    engine : AsyncEngine
+        DB engine used to store the filled timeseries.
+    imputation_engine : ImputationEngineName
+        Imputation engine used to predict long gaps.
 
     Returns
     -------
     dict
-        A message indicating success.
+        Rows stored by series id, total rows written and the error of every series that failed.
     """
-    file_extension = timeseries_file.filename.split(".")[-1].strip().lower()
-    df = process_timeseries_data_at_different_freq(file=timeseries_file.file, file_extension=file_extension)
-    await store_timeseries_data(df=df, engine=engine)
+    return await process_gap_filler_batch(files=timeseries_files, engine=imputation_engine, db_engine=engine)
 
-    return {"message": "Success"}
+
+@router.post(
+    "/filler/append",
+    tags=["Filler"],
+    description="Gap Filler for a new slice of an existing series, only the new window is filled and stored",
+    status_code=status.HTTP_201_CREATED,
+)
+async def gap_filler_append_timeseries_data(
+    timeseries_file: Annotated[UploadFile, File()],
+    engine: Annotated[AsyncEngine, Depends(connections.get_engine)],
+    series_id: Annotated[str, Form(min_length=1, max_length=255)] = config.DEFAULT_SERIES_ID,
+    imputation_engine: Annotated[ImputationEngineName, Form()] = DEFAULT_IMPUTATION_ENGINE,
+) -> dict[str, Any]:
+    """Fill gaps in the newly arrived data of a stored series, using its stored history as context.
+
+    Parameters
+    ----------
+    timeseries_file : UploadFile
+        The uploaded slice, it does not need to cover the minimum period a full upload needs.
+    engine : AsyncEngine
+        DB engine the history is read from and the filled slice is stored to.
+    series_id : str
+        Id of the stored series the slice is appended to.
+    imputation_engine : ImputationEngineName
+        Imputation engine used to predict long gaps.
+
+    Returns
+    -------
+    dict
+        Number of rows written, first and last timestamp written.
+    """
+    return await append_gap_filler_timeseries(
+        file=timeseries_file,
+        series_id=series_id,
+        engine=imputation_engine,
+        db_engine=engine,
+    )
@@ -0,0 +1,118 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, File, Form, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.db.models import JobStatus
+from app.config import config
+from app.connections import connections
+from app.server.errors import BadRequestError
+from app.services import DEFAULT_IMPUTATION_ENGINE, ImputationEngineName, get_gap_filler_job, submit_gap_filler_job
+
+router = APIRouter(prefix="/filler/jobs")
+
+
+@router.post(
+    "",
+    tags=["Filler Jobs"],
+    description="Queue a timeseries file to have its gaps filled, returns the job id straight away",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_gap_filler_job(
+    timeseries_file: Annotated[UploadFile, File()],
+    series_id: Annotated[str, Form(min_length=1, max_length=255)] = config.DEFAULT_SERIES_ID,
+    imputation_engine: Annotated[ImputationEngineName, Form()] = DEFAULT_IMPUTATION_ENGINE,
+) -> dict[str, Any]:
+    """Queue a gap filler job for an uploaded timeseries data file.
+
+    Parameters
+    ----------
+    timeseries_file : UploadFile
+        The uploaded timeseries data file.
+    series_id : str
+        Id of the series, re uploading the same series updates its points.
+    imputation_engine : ImputationEngineName
+        Imputation engine used to predict long gaps.
+
+    Returns
+    -------
+    dict
+        The id and status of the queued job.
+    """
+    job = await submit_gap_filler_job(file=timeseries_file, series_id=series_id, engine=imputation_engine)
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get(
+    "/{job_id}",
+    tags=["Filler Jobs"],
+    description="Status and current pipeline stage of a gap filler job",
+    status_code=status.HTTP_200_OK,
+)
+async def gap_filler_job_status(
+    job_id: str,
+    session: Annotated[AsyncSession, Depends(connections.get_db)],
+) -> dict[str, Any]:
+    """Report the status of a gap filler job.
+
+    Parameters
+    ----------
+    job_id : str
+        Id of the job.
+    session : AsyncSession
+        DB session.
+
+    Returns
+    -------
+    dict
+        Status, stage and timestamps of the job.
+    """
+    job = await get_gap_filler_job(session=session, job_id=job_id)
+    return {
+        "job_id": job.id,
+        "series_id": job.series_id,
+        "status": job.status,
+        "stage": job.stage,
+        "file_name": job.file_name,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@router.get(
+    "/{job_id}/result",
+    tags=["Filler Jobs"],
+    description="Outcome of a finished gap filler job",
+    status_code=status.HTTP_200_OK,
+)
+async def gap_filler_job_result(
+    job_id: str,
+    session: Annotated[AsyncSession, Depends(connections.get_db)],
+) -> dict[str, Any]:
+    """Return the outcome of a finished gap filler job.
+
+    Parameters
+    ----------
+    job_id : str
+        Id of the job.
+    session : AsyncSession
+        DB session.
+
+    Returns
+    -------
+    dict
+        The result of the job if it succeeded, or its error if it failed.
+
+    Raises
+    ------
+    BadRequestError
+        If the job has not finished yet.
+    """
+    job = await get_gap_filler_job(session=session, job_id=job_id)
+    if job.status not in {JobStatus.SUCCEEDED, JobStatus.FAILED}:
+        err_msg = f"Gap filler job {job_id} has not finished yet, current status: {job.status}"
+        raise BadRequestError(err_msg)
+
+    return {"job_id": job.id, "status": job.status, "result": job.result, "error": job.error}
@@ -1,4 +1,11 @@
-from fastapi import APIRouter, Response, status
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.adapters import export_metrics
+from app.connections import connections
+from app.services import energy_storage_report
 
 router = APIRouter()
 
@@ -16,3 +23,41 @@ async def healthz() -> Response:
         Response: A response with status code 204 indicating the server is healthy.
     """
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    "/metrics",
+    tags=["Monitoring"],
+    description="Prometheus metrics of the pipeline stages, ingestion, imputation models and DB pool",
+    status_code=status.HTTP_200_OK,
+)
+async def metrics() -> Response:
+    """Expose the metrics recorded by this API worker and its pipeline processes.
+
+    Returns:
+        Response: The metrics in the Prometheus text format.
+    """
+    content, media_type = export_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@router.get(
+    "/storage",
+    tags=["Monitoring"],
+    description="On-disk size of the stored timeseries, before and after compression",
+    status_code=status.HTTP_200_OK,
+)
+async def storage_report(engine: Annotated[AsyncEngine, Depends(connections.get_engine)]) -> dict[str, Any]:
+    """Report the size of the stored timeseries.
+
+    Parameters
+    ----------
+    engine : AsyncEngine
+        DB engine the size is measured on.
+
+    Returns
+    -------
+    dict
+        Estimated rows, bytes on disk and bytes per million rows, compressed or not.
+    """
+    return await energy_storage_report(engine=engine)
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.services import (
+    READ_MEDIA_TYPES,
+    ReadAggregation,
+    ReadFormat,
+    ReadStatistic,
+    read_time_range,
+    stream_timeseries,
+)
+
+router = APIRouter(prefix="/timeseries")
+
+
+@router.get(
+    "",
+    tags=["Timeseries"],
+    description="Stream the stored points of a series over a time range, aggregated or downsampled on the fly",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def read_timeseries_data(  # noqa: PLR0913
+    *,
+    series_id: Annotated[str, Query(min_length=1, max_length=255)],
+    start: Annotated[datetime | None, Query()] = None,
+    end: Annotated[datetime | None, Query()] = None,
+    aggregation: Annotated[ReadAggregation, Query()] = ReadAggregation.RAW,
+    statistic: Annotated[ReadStatistic, Query()] = ReadStatistic.SUM,
+    max_points: Annotated[int | None, Query(ge=3)] = None,
+    output_format: Annotated[ReadFormat, Query(alias="format")] = ReadFormat.NDJSON,
+) -> StreamingResponse:
+    """Stream a stored series as NDJSON, CSV or an Arrow IPC stream.
+
+    Parameters
+    ----------
+    series_id : str
+        Id of the series, the extra measures of an upload are read as "<series_id>:<column>".
+    start : datetime | None
+        First timestamp read, timestamps without a timezone are UTC.
+    end : datetime | None
+        Timestamps from this one on are not read.
+    aggregation : ReadAggregation
+        Hourly, daily or monthly buckets the points are aggregated to in SQL, answered from the continuous
+        aggregates when the time range does not cut their buckets, raw returns the stored points.
+    statistic : ReadStatistic
+        Aggregate of the points of every bucket.
+    max_points : int | None
+        Downsample the result to this many points with LTTB, keeping its visual shape.
+    output_format : ReadFormat
+        Format of the response.
+
+    Returns
+    -------
+    StreamingResponse
+        The (timestamp, energy) points in time order.
+    """
+    start, end = read_time_range(start=start, end=end)
+    return StreamingResponse(
+        stream_timeseries(
+            series_id=series_id,
+            start=start,
+            end=end,
+            aggregation=aggregation,
+            statistic=statistic,
+            max_points=max_points,
+            output_format=output_format,
+        ),
+        media_type=READ_MEDIA_TYPES[output_format],
+    )
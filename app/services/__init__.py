@@ -1,24 +1,169 @@
-from .gap_filler_model import get_percentage_of_missing_data, predict_gaps_on_timeseries_data
+from .datetime_parsing import combine_date_and_time_columns, detect_datetime_format, parse_datetime_column
+from .downsampling import LargestTriangleThreeBuckets
+from .gap_analysis import fill_short_gaps, find_gap_runs, short_gaps_mask
+from .gap_filler_append import (
+    append_gap_filler_timeseries,
+    fill_appended_timeseries,
+    load_timeseries_history,
+    parse_timeseries_file,
+)
+from .gap_filler_batches import parse_timeseries_batch_file, process_gap_filler_batch
+from .gap_filler_jobs import (
+    get_gap_filler_job,
+    process_gap_filler_job_file,
+    resume_gap_filler_jobs,
+    run_gap_filler_job,
+    stop_gap_filler_jobs,
+    submit_gap_filler_job,
+    update_gap_filler_job_stage,
+    watch_gap_filler_jobs,
+)
+from .gap_filler_model import (
+    DEFAULT_IMPUTATION_ENGINE,
+    FitTimeBudgetExceededError,
+    HistGradientBoostingEngine,
+    ImputationEngine,
+    ImputationEngineName,
+    RandomForestEngine,
+    SeasonalProfileEngine,
+    calendar_features,
+    create_imputation_engine,
+    fit_imputation_engine,
+    fit_within_time_budget,
+    get_percentage_of_missing_data,
+    interpolate_short_gaps,
+    predict_gaps_on_timeseries_data,
+)
+from .gap_filler_uploads import fill_gap_filler_upload, pipeline_params
 from .handle_timeseries_data import (
     check_frequency,
     check_minimum_data_to_process,
+    measure_series_ids,
     parse_timeseries_data,
     plotting_data,
+    process_parsed_timeseries,
     process_timeseries_data_at_different_freq,
+    process_timeseries_file,
     resampling_5min_freq_to_15min_req,
     resampling_data_based_on_freq,
+    series_records,
+    store_timeseries_batch,
     store_timeseries_data,
 )
+from .model_cache import ModelCache, model_cache
+from .result_cache import CachedResult, ResultCache, result_cache
+from .storage_lifecycle import apply_storage_policies, energy_storage_report
+from .timeseries import TimeSeries
+from .timeseries_readers import (
+    merge_series_chunks,
+    parse_arrow_table,
+    parse_timeseries_columns,
+    read_arrow_file,
+    read_arrow_table,
+    read_batch_file,
+    read_csv_in_chunks,
+    read_xlsx_frame,
+    read_xlsx_rows,
+    split_long_format,
+)
+from .timeseries_reads import (
+    READ_MEDIA_TYPES,
+    ROLLUPS,
+    ReadAggregation,
+    ReadFormat,
+    ReadStatistic,
+    available_rollups,
+    pick_rollup,
+    read_time_range,
+    stream_timeseries,
+    timeseries_read_query,
+)
+from .training_windows import plan_training_windows, stratified_subsample
+from .uploads import detect_compression, open_upload, spool_upload_to_disk, upload_file_format
 
 __all__ = [
+    "DEFAULT_IMPUTATION_ENGINE",
+    "READ_MEDIA_TYPES",
+    "ROLLUPS",
+    "CachedResult",
+    "FitTimeBudgetExceededError",
+    "HistGradientBoostingEngine",
+    "ImputationEngine",
+    "ImputationEngineName",
+    "LargestTriangleThreeBuckets",
+    "ModelCache",
+    "RandomForestEngine",
+    "ReadAggregation",
+    "ReadFormat",
+    "ReadStatistic",
+    "ResultCache",
+    "SeasonalProfileEngine",
+    "TimeSeries",
+    "append_gap_filler_timeseries",
+    "apply_storage_policies",
+    "available_rollups",
+    "calendar_features",
     "check_frequency",
     "check_minimum_data_to_process",
+    "combine_date_and_time_columns",
+    "create_imputation_engine",
+    "detect_compression",
+    "detect_datetime_format",
+    "energy_storage_report",
+    "fill_appended_timeseries",
+    "fill_gap_filler_upload",
+    "fill_short_gaps",
+    "find_gap_runs",
+    "fit_imputation_engine",
+    "fit_within_time_budget",
+    "get_gap_filler_job",
     "get_percentage_of_missing_data",
+    "interpolate_short_gaps",
+    "load_timeseries_history",
+    "measure_series_ids",
+    "merge_series_chunks",
+    "model_cache",
+    "open_upload",
+    "parse_arrow_table",
+    "parse_datetime_column",
+    "parse_timeseries_batch_file",
+    "parse_timeseries_columns",
     "parse_timeseries_data",
+    "parse_timeseries_file",
+    "pick_rollup",
+    "pipeline_params",
+    "plan_training_windows",
     "plotting_data",
     "predict_gaps_on_timeseries_data",
+    "process_gap_filler_batch",
+    "process_gap_filler_job_file",
+    "process_parsed_timeseries",
     "process_timeseries_data_at_different_freq",
+    "process_timeseries_file",
+    "read_arrow_file",
+    "read_arrow_table",
+    "read_batch_file",
+    "read_csv_in_chunks",
+    "read_time_range",
+    "read_xlsx_frame",
+    "read_xlsx_rows",
     "resampling_5min_freq_to_15min_req",
     "resampling_data_based_on_freq",
+    "result_cache",
+    "resume_gap_filler_jobs",
+    "run_gap_filler_job",
+    "series_records",
+    "short_gaps_mask",
+    "split_long_format",
+    "spool_upload_to_disk",
+    "stop_gap_filler_jobs",
+    "store_timeseries_batch",
     "store_timeseries_data",
+    "stratified_subsample",
+    "stream_timeseries",
+    "submit_gap_filler_job",
+    "timeseries_read_query",
+    "update_gap_filler_job_stage",
+    "upload_file_format",
+    "watch_gap_filler_jobs",
 ]
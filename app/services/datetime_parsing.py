@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas import Series
+
+from app.adapters import logger
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d", "%d-%m-%Y", "%m-%d-%Y", "%d.%m.%Y", "%Y%m%d")
+TIME_FORMATS = ("%H:%M:%S", "%H:%M", "%H:%M:%S.%f", "%I:%M:%S %p", "%I:%M %p")
+DATETIME_FORMATS = tuple(
+    f"{date_format}{separator}{time_format}"
+    for date_format in DATE_FORMATS
+    for separator in (" ", "T")
+    for time_format in TIME_FORMATS
+)
+# NOTE: dates both formats parse when day and month are at most 12, e.g. 03/04/2024
+DAY_MONTH_SWAPS = {"%m/%d/%Y": "%d/%m/%Y", "%d/%m/%Y": "%m/%d/%Y", "%m-%d-%Y": "%d-%m-%Y", "%d-%m-%Y": "%m-%d-%Y"}
+FORMAT_SAMPLE_SIZE = 64
+FORMAT_CACHE_SIZE = 256
+
+# NOTE: formats detected per column layout, so the chunks of an upload and later uploads with the same columns skip it
+_detected_formats: OrderedDict[Hashable, str] = OrderedDict()
+
+
+def _sample(values: np.ndarray) -> np.ndarray:
+    if values.size <= FORMAT_SAMPLE_SIZE:
+        return values
+
+    return values[np.linspace(0, values.size - 1, FORMAT_SAMPLE_SIZE).astype(np.int64)]
+
+
+def _matches(sample: np.ndarray, date_format: str) -> bool:
+    try:
+        pd.to_datetime(sample, format=date_format)
+    except (ValueError, TypeError):
+        return False
+
+    return True
+
+
+def detect_datetime_format(values: np.ndarray, formats: Sequence[str]) -> str | None:
+    """Find the first format parsing every value of a sample spread over the given strings.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Strings to parse, distinct values give the most telling sample.
+    formats : Sequence[str]
+        Candidate `strptime` formats, in order of preference.
+
+    Returns
+    -------
+    str | None
+        The detected format, None when no candidate parses the whole sample.
+    """
+    sample = _sample(values)
+    return next((date_format for date_format in formats if _matches(sample, date_format)), None)
+
+
+def resolve_day_month_order(values: np.ndarray, date_format: str, warn: bool = True) -> str:
+    """Pick between the day-first and month-first version of a format from every value, not only a sample.
+
+    A first field above 12 anywhere makes the values day-first, a second field above 12 month-first. When no value
+    tells them apart the format is kept, its order in `DATE_FORMATS` prefers month-first.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Strings the format parses.
+    date_format : str
+        Detected `strptime` format.
+    warn : bool, optional
+        Log a warning when the order can not be told from the values.
+
+    Returns
+    -------
+    str
+        The format, with day and month swapped if the values show the other order.
+    """
+    prefix = next((prefix for prefix in DAY_MONTH_SWAPS if date_format.startswith(prefix)), None)
+    if prefix is None:
+        return date_format
+
+    # NOTE: day and month are in the first characters, the distinct prefixes are few even for datetime columns
+    fields = Series(pd.unique(np.asarray(values, dtype="U5"))).str.extract(r"^\s*(\d{1,2})\D(\d{1,2})").astype(float)
+    first_over_12, second_over_12 = bool((fields[0] > 12).any()), bool((fields[1] > 12).any())
+    if first_over_12 == second_over_12:
+        if warn and not first_over_12:
+            logger.warning("Dates are ambiguous between day-first and month-first, parsed with %s", date_format)
+        return date_format
+
+    day_first = prefix.startswith("%d")
+    if first_over_12 == day_first:
+        return date_format
+
+    return DAY_MONTH_SWAPS[prefix] + date_format.removeprefix(prefix)
+
+
+def _cached_format(values: np.ndarray, formats: Sequence[str], layout: Hashable) -> str | None:
+    date_format = _detected_formats.get(layout)
+    cached = date_format is not None and _matches(_sample(values), date_format)
+    if date_format is None or not cached:
+        date_format = detect_datetime_format(values, formats=formats)
+
+    # NOTE: a failed detection is not cached, the next upload with the same columns detects its format again
+    if date_format is None:
+        return None
+
+    date_format = resolve_day_month_order(values, date_format=date_format, warn=not cached)
+    _detected_formats[layout] = date_format
+    _detected_formats.move_to_end(layout)
+    if len(_detected_formats) > FORMAT_CACHE_SIZE:
+        _detected_formats.popitem(last=False)
+    return date_format
+
+
+def _parse_distinct_values(values: Series, formats: Sequence[str], layout: Hashable) -> np.ndarray:
+    # NOTE: uploads repeat the same dates and times over and over, only the distinct values are parsed
+    codes, uniques = pd.factorize(values, sort=False)
+    uniques = np.asarray(uniques.astype(str), dtype=object)
+
+    date_format = _cached_format(uniques, formats=formats, layout=layout)
+    parsed = pd.to_datetime(uniques, format=date_format).to_numpy(dtype="datetime64[ns]")
+    # NOTE: missing values have the code -1, they pick the NaT appended at the end
+    timestamps: np.ndarray = np.append(parsed, np.datetime64("NaT", "ns"))[codes]
+    return timestamps
+
+
+def parse_datetime_column(values: Series, layout: Hashable) -> np.ndarray:
+    """Parse a column of datetimes, detecting its format once per column layout.
+
+    Parameters
+    ----------
+    values : Series
+        Datetime strings, or already parsed datetimes.
+    layout : Hashable
+        Key of the column layout, e.g. the column names of the upload.
+
+    Returns
+    -------
+    np.ndarray
+        datetime64[ns] timestamps.
+
+    Raises
+    ------
+    ValueError
+        If the values can not be converted to datetime.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        timestamps: np.ndarray = values.to_numpy(dtype="datetime64[ns]")
+        return timestamps
+
+    try:
+        strings = values.astype(str).to_numpy(dtype=object)
+        date_format = _cached_format(strings, formats=DATETIME_FORMATS, layout=(layout, "datetime"))
+        timestamps = pd.to_datetime(strings, format=date_format).to_numpy(dtype="datetime64[ns]")
+    except (pd.errors.ParserError, ValueError, TypeError) as err:
+        err_msg = f"Error: The column {values.name} can not be converted to datetime"
+        raise ValueError(err_msg) from err
+
+    return timestamps
+
+
+def combine_date_and_time_columns(dates: Series, times: Series, layout: Hashable) -> np.ndarray:
+    """Parse a date and a time column separately and add them up, without building any datetime string.
+
+    Parameters
+    ----------
+    dates : Series
+        Date strings, or already parsed dates.
+    times : Series
+        Time of the day strings, or already parsed times.
+    layout : Hashable
+        Key of the column layout, e.g. the column names of the upload.
+
+    Returns
+    -------
+    np.ndarray
+        datetime64[ns] timestamps.
+
+    Raises
+    ------
+    ValueError
+        If the values can not be converted to datetime.
+    """
+    try:
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            day_starts = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+        else:
+            day_starts = _parse_distinct_values(dates, formats=DATE_FORMATS, layout=(layout, "date"))
+
+        if pd.api.types.is_datetime64_any_dtype(times):
+            time_of_day = times.to_numpy(dtype="datetime64[ns]")
+        else:
+            time_of_day = _parse_distinct_values(times, formats=TIME_FORMATS, layout=(layout, "time"))
+    except (pd.errors.ParserError, ValueError, TypeError) as err:
+        err_msg = f"Error: The columns {dates.name} and {times.name} can not be converted to datetime"
+        raise ValueError(err_msg) from err
+
+    timestamps: np.ndarray = day_starts.astype("datetime64[ns]") + (time_of_day - time_of_day.astype("datetime64[D]"))
+    return timestamps
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class LargestTriangleThreeBuckets:
+    """Streaming Largest-Triangle-Three-Buckets downsampling, keeping the visual shape of a series in fewer points.
+
+    The number of points of the series must be known upfront to lay out the buckets. Points are pushed in time order,
+    in batches of any size, and only the bucket being decided and the following one are buffered, so the memory used
+    is bounded by two buckets whatever the length of the series.
+    """
+
+    def __init__(self, total: int, threshold: int) -> None:
+        """Initialize the buckets.
+
+        Args:
+            total (int): Number of points of the series.
+            threshold (int): Number of points kept, at least 3, series with fewer points are kept whole.
+        """
+        self.threshold = threshold
+        self.passthrough = threshold < 3 or total <= threshold
+        # NOTE: first and last points are buckets on their own, the others are split evenly in between
+        middle = np.arange(threshold - 1, dtype=np.int64) * (total - 2) // max(threshold - 2, 1) + 1
+        self.edges = np.concatenate([[0], middle, [total]])
+        self.bucket = 0
+        self.offset = 0
+        self.epochs = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.float64)
+        self.selected_x = 0.0
+        self.selected_y = 0.0
+
+    def push(self, epochs: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Add the next points of the series.
+
+        Args:
+            epochs (np.ndarray): int64 epoch nanoseconds of the points, following the ones already pushed.
+            values (np.ndarray): Values of the points.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Epochs and values of the points selected from the buckets completed.
+        """
+        if self.passthrough:
+            return epochs, values
+
+        self.epochs = np.concatenate([self.epochs, epochs])
+        self.values = np.concatenate([self.values, np.asarray(values, dtype=np.float64)])
+        return self._decide()
+
+    def finish(self) -> tuple[np.ndarray, np.ndarray]:
+        """Flush the points left once the whole series has been pushed.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Epochs and values of the points selected, or of every buffered point if
+            the series turned out shorter than announced.
+        """
+        epochs, values = self.epochs, self.values
+        self.epochs = self.epochs[:0]
+        self.values = self.values[:0]
+        return epochs, values
+
+    def _decide(self) -> tuple[np.ndarray, np.ndarray]:
+        selected = []
+        buffered_end = self.offset + self.epochs.size
+        x, y = self.epochs.astype(np.float64), self.values
+
+        while self.bucket < self.threshold:
+            start, end = self.edges[self.bucket] - self.offset, self.edges[self.bucket + 1] - self.offset
+            is_edge = self.bucket in {0, self.threshold - 1}
+            # NOTE: a bucket is decided once the following one is complete
+            if (self.edges[self.bucket + 1] if is_edge else self.edges[self.bucket + 2]) > buffered_end:
+                break
+
+            pick = start if is_edge else start + self._largest_triangle(x, y, start, end)
+
+            selected.append(pick)
+            self.selected_x, self.selected_y = x[pick], y[pick]
+            self.bucket += 1
+
+        decided = min(int(self.edges[self.bucket]), buffered_end) - self.offset
+        picks = np.array(selected, dtype=np.int64)
+        epochs, values = self.epochs[picks], self.values[picks]
+        self.epochs = self.epochs[decided:]
+        self.values = self.values[decided:]
+        self.offset += decided
+        return epochs, values
+
+    def _largest_triangle(self, x: np.ndarray, y: np.ndarray, start: int, end: int) -> int:
+        # NOTE: the third corner of the triangles is the average of the following bucket
+        next_end = self.edges[self.bucket + 2] - self.offset
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs(
+            (self.selected_x - next_x) * (y[start:end] - self.selected_y)
+            - (self.selected_x - x[start:end]) * (next_y - self.selected_y),
+        )
+        return int(np.argmax(areas))
@@ -0,0 +1,99 @@
+import numpy as np
+
+from .timeseries import TimeSeries
+
+
+def find_gap_runs(missing: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Run-length encode a missing values mask.
+
+    Parameters
+    ----------
+    missing : np.ndarray
+        Boolean mask, True where a value is missing.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Start position and length of every run of missing values.
+    """
+    edges = np.diff(missing.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts, ends - starts
+
+
+def short_gaps_mask(missing: np.ndarray, max_gap: int) -> np.ndarray:
+    """Flag the missing values belonging to a gap of at most `max_gap` samples.
+
+    Parameters
+    ----------
+    missing : np.ndarray
+        Boolean mask, True where a value is missing.
+    max_gap : int
+        Longest gap, in samples, considered short.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask, True for the missing values of short gaps.
+    """
+    starts, lengths = find_gap_runs(missing)
+    short = lengths <= max_gap
+
+    # NOTE: +1 at the start of every short run and -1 right after it, the running sum flags the run itself
+    marks = np.zeros(missing.size + 1, dtype=np.int32)
+    np.add.at(marks, starts[short], 1)
+    np.add.at(marks, starts[short] + lengths[short], -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def fill_short_gaps(series: TimeSeries, max_gap: int, method: str = "linear", season_length: int = 0) -> TimeSeries:
+    """Fill the gaps of a regular series that are at most `max_gap` samples long, longer gaps are left untouched.
+
+    Every measure of a multi-measure series is filled on its own.
+
+    Parameters
+    ----------
+    series : TimeSeries
+        Regularly sampled series with NaNs where values are missing.
+    max_gap : int
+        Longest gap, in samples, filled by this function.
+    method : str, optional
+        "linear" interpolates between the values around the gap, "seasonal_naive" repeats the value one season
+        earlier and falls back to linear when that value is missing too (default is "linear").
+    season_length : int, optional
+        Samples in one season, required by "seasonal_naive".
+
+    Returns
+    -------
+    TimeSeries
+        The series with its short gaps filled, sharing its timestamps with the source series.
+
+    Raises
+    ------
+    ValueError
+        If the method is not supported.
+    """
+    if method not in {"linear", "seasonal_naive"}:
+        err_msg = f"Unsupported short gap filling method -> {method}"
+        raise ValueError(err_msg)
+
+    filled = series.columns.astype(np.float64)
+    for values in filled.T:
+        missing = np.isnan(values)
+        to_fill = short_gaps_mask(missing, max_gap=max_gap) if max_gap > 0 else np.zeros_like(missing)
+        if not to_fill.any() or missing.all():
+            continue
+
+        positions = np.flatnonzero(to_fill)
+        if method == "seasonal_naive" and season_length > 0:
+            previous = positions - season_length
+            valid = previous >= 0
+            valid[valid] = ~missing[previous[valid]]
+            values[positions[valid]] = values[previous[valid]]
+            positions = positions[~valid]
+
+        observed = np.flatnonzero(~missing)
+        values[positions] = np.interp(positions, observed, values[observed])
+
+    return series.with_values(filled if series.measures else filled[:, 0])
@@ -0,0 +1,204 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.adapters import logger, pipeline_executor, stage_timer
+from app.adapters.db.models import TimeSeriesData
+from app.config import config
+from app.server.errors import BadRequestError
+
+from .gap_filler_model import predict_gaps_on_timeseries_data
+from .handle_timeseries_data import check_frequency, measure_series_ids, parse_timeseries_data, store_timeseries_data
+from .timeseries import NS_PER_MINUTE, TimeSeries
+from .uploads import open_upload, spool_upload_to_disk, upload_file_format
+
+STORED_STEP = 15 * NS_PER_MINUTE
+
+
+def parse_timeseries_file(file_path: str, file_extension: str) -> TimeSeries:
+    """Parse a spooled upload without processing it, entry point used by the pipeline process pool.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the spooled upload.
+    file_extension : str
+        The file extension indicating the type of file.
+
+    Returns
+    -------
+    TimeSeries
+        The sorted series, without missing values nor duplicated timestamps.
+    """
+    with open_upload(file_path=file_path, file_extension=file_extension) as file, stage_timer("parsing"):
+        return parse_timeseries_data(file=file, file_path=f".{file_extension}")
+
+
+async def load_timeseries_history(
+    engine: AsyncEngine,
+    series_id: str,
+    measures: tuple[str, ...],
+    start: datetime,
+    end: datetime,
+) -> TimeSeries:
+    """Load the stored points of a series within a time range, served by the (series_id, timestamp) primary key.
+
+    Parameters
+    ----------
+    engine : AsyncEngine
+        The configured asynchronous database engine.
+    series_id : str
+        Id of the series.
+    measures : tuple[str, ...]
+        Names of the measures of the series, empty for a single measure series.
+    start : datetime
+        First timestamp loaded.
+    end : datetime
+        Timestamps from this one on are not loaded.
+
+    Returns
+    -------
+    TimeSeries
+        The stored points, NaN where a measure has no stored point.
+    """
+    series_ids = measure_series_ids(series_id=series_id, measures=measures)
+    query = (
+        select(TimeSeriesData.series_id, TimeSeriesData.timestamp, TimeSeriesData.energy)
+        .where(
+            TimeSeriesData.series_id.in_(series_ids),
+            TimeSeriesData.timestamp >= start,
+            TimeSeriesData.timestamp < end,
+        )
+        .order_by(TimeSeriesData.timestamp)
+    )
+    with stage_timer("loading_history"):
+        async with engine.connect() as conn:
+            rows = (await conn.execute(query)).all()
+
+    if not rows:
+        return TimeSeries.concatenate([])
+
+    stored_ids, timestamps, energy = zip(*rows, strict=True)
+    epochs = np.array(timestamps, dtype="datetime64[ns]").view(np.int64)
+    unique_epochs = np.unique(epochs)
+
+    values = np.full((unique_epochs.size, len(series_ids)), np.nan, dtype=np.float32)
+    column_of_id = {stored_id: column for column, stored_id in enumerate(series_ids)}
+    columns = np.fromiter((column_of_id[stored_id] for stored_id in stored_ids), dtype=np.int64, count=len(rows))
+    values[np.searchsorted(unique_epochs, epochs), columns] = energy
+    return TimeSeries(epochs=unique_epochs, values=values if measures else values[:, 0], measures=measures)
+
+
+def fill_appended_timeseries(history: TimeSeries, series: TimeSeries, engine: str) -> TimeSeries:
+    """Fill the gaps of a newly arrived slice using the stored history as context, in the pipeline process pool.
+
+    The slice is brought to the stored 15 minutes grid first: 5 minutes data is averaged, 30 and 60 minutes data is
+    spread over the grid and its intermediate points filled like any other gap. The history and the slice are then
+    filled together and only the points after the last stored one are returned.
+
+    Parameters
+    ----------
+    history : TimeSeries
+        Stored points preceding the slice.
+    series : TimeSeries
+        The parsed slice.
+    engine : str
+        Name of the imputation engine used for long gaps.
+
+    Returns
+    -------
+    TimeSeries
+        The filled 15 minutes points following the history.
+    """
+    freq = check_frequency(series=series)
+    quarter_hours = series.resample_mean(step=STORED_STEP) if freq["freq"] < 15 else series.asfreq(step=STORED_STEP)
+    del series
+
+    last_stored_epoch = int(history.epochs[-1])
+    combined = TimeSeries.concatenate([history, quarter_hours]).asfreq(step=STORED_STEP)
+    filled = predict_gaps_on_timeseries_data(series=combined, engine=engine)
+
+    first_new = int(np.searchsorted(filled.epochs, last_stored_epoch, side="right"))
+    return TimeSeries(
+        epochs=filled.epochs[first_new:],
+        values=filled.values[first_new:],
+        regular=True,
+        measures=filled.measures,
+    )
+
+
+async def append_gap_filler_timeseries(
+    file: UploadFile,
+    series_id: str,
+    engine: str,
+    db_engine: AsyncEngine,
+) -> dict[str, Any]:
+    """Fill and store only the newly arrived window of an existing series.
+
+    Only `APPEND_HISTORY_HOURS` of stored history preceding the slice is loaded as context, so the cost of a daily
+    append is proportional to the slice and that window, not to the whole series.
+
+    Parameters
+    ----------
+    file : UploadFile
+        The uploaded slice of the series.
+    series_id : str
+        Id of the series the slice is appended to.
+    engine : str
+        Name of the imputation engine used for long gaps.
+    db_engine : AsyncEngine
+        DB engine the history is loaded from and the new points are stored to.
+
+    Returns
+    -------
+    dict[str, Any]
+        Number of rows written, first and last timestamp written.
+
+    Raises
+    ------
+    BadRequestError
+        If the slice is empty or the series has no stored history right before it.
+    """
+    file_extension, _ = upload_file_format(file_name=file.filename or "")
+    file_path = await spool_upload_to_disk(file=file)
+    try:
+        series = await pipeline_executor.run(parse_timeseries_file, str(file_path), file_extension)
+    finally:
+        file_path.unlink(missing_ok=True)
+
+    if series.start is None:
+        err_msg = "Appended timeseries data is empty"
+        raise BadRequestError(err_msg)
+
+    history = await load_timeseries_history(
+        engine=db_engine,
+        series_id=series_id,
+        measures=series.measures,
+        start=series.start - timedelta(hours=config.APPEND_HISTORY_HOURS),
+        end=series.start,
+    )
+    if not len(history):
+        err_msg = (
+            f"Series {series_id} has no stored data in the {config.APPEND_HISTORY_HOURS} hours before the appended "
+            "data, upload it in full first"
+        )
+        raise BadRequestError(err_msg)
+
+    logger.info(
+        "Appending %s points to series %s, with %s stored points as context",
+        len(series),
+        series_id,
+        len(history),
+    )
+    filled = await pipeline_executor.run(fill_appended_timeseries, history, series, engine)
+    await store_timeseries_data(series=filled, engine=db_engine, series_id=series_id)
+
+    return {
+        "rows": len(filled),
+        "start": filled.start.isoformat() if filled.start else None,
+        "end": filled.end.isoformat() if filled.end else None,
+    }
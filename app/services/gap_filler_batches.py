@@ -0,0 +1,142 @@
+import asyncio
+from typing import Any
+
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.adapters import logger, pipeline_executor, stage_timer
+from app.config import config
+from app.server.errors import BadRequestError, ServiceUnavailableError
+
+from .handle_timeseries_data import process_parsed_timeseries, store_timeseries_batch
+from .timeseries import TimeSeries
+from .timeseries_readers import read_batch_file
+from .uploads import open_upload, spool_upload_to_disk, upload_file_format
+
+MAX_SERIES_ID_LENGTH = 255
+
+
+def parse_timeseries_batch_file(file_path: str, file_extension: str, default_series_id: str) -> dict[str, TimeSeries]:
+    """Split a spooled batch upload into its series, entry point used by the pipeline process pool.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the spooled upload.
+    file_extension : str
+        The file extension indicating the type of file.
+    default_series_id : str
+        Id of the series of uploads without a `series_id` column.
+
+    Returns
+    -------
+    dict[str, TimeSeries]
+        The sorted series of every id.
+    """
+    with open_upload(file_path=file_path, file_extension=file_extension) as file, stage_timer("parsing"):
+        return read_batch_file(
+            file=file,
+            file_format=file_extension,
+            default_series_id=default_series_id,
+            chunk_rows=config.CSV_CHUNK_ROWS,
+        )
+
+
+async def _parse_batch_files(files: list[UploadFile]) -> dict[str, TimeSeries]:
+    spooled_files = []
+    try:
+        for file in files:
+            file_name = file.filename or ""
+            file_extension, _ = upload_file_format(file_name=file_name)
+            # NOTE: files without a series_id column hold a single series, named after the file
+            default_series_id = file_name.split(".", maxsplit=1)[0] or config.DEFAULT_SERIES_ID
+            spooled_files.append((await spool_upload_to_disk(file=file), file_extension, default_series_id))
+
+        parsed_files = await asyncio.gather(
+            *(
+                pipeline_executor.run(
+                    parse_timeseries_batch_file,
+                    str(file_path),
+                    file_extension,
+                    default_series_id,
+                    wait_for_slot=True,
+                )
+                for file_path, file_extension, default_series_id in spooled_files
+            ),
+        )
+    finally:
+        for file_path, _, _ in spooled_files:
+            file_path.unlink(missing_ok=True)
+
+    batch: dict[str, TimeSeries] = {}
+    for parsed_file in parsed_files:
+        for series_id, series in parsed_file.items():
+            if series_id in batch:
+                err_msg = f"Series {series_id} is found in more than one file of the batch"
+                raise BadRequestError(err_msg)
+
+            if len(series_id) > MAX_SERIES_ID_LENGTH:
+                err_msg = f"Series id {series_id[:32]}... is longer than {MAX_SERIES_ID_LENGTH} characters"
+                raise BadRequestError(err_msg)
+
+            batch[series_id] = series
+
+    return batch
+
+
+async def process_gap_filler_batch(files: list[UploadFile], engine: str, db_engine: AsyncEngine) -> dict[str, Any]:
+    """Fill the gaps of every series of a batch upload in parallel and store them all in a single transaction.
+
+    A batch is either a long format file told apart by a `series_id` column, or many files holding one series each.
+    Every series is checked, resampled and imputed in its own process pool job, series failing to process are
+    reported instead of failing the whole batch. A series found in more than one file rejects the whole batch.
+
+    Parameters
+    ----------
+    files : list[UploadFile]
+        The uploaded timeseries data files.
+    engine : str
+        Name of the imputation engine used for long gaps.
+    db_engine : AsyncEngine
+        DB engine used to store the filled series.
+
+    Returns
+    -------
+    dict[str, Any]
+        Rows stored by series id, total rows written and the error of every series that failed.
+
+    Raises
+    ------
+    ServiceUnavailableError
+        If the pipeline process pool is full.
+    """
+    # NOTE: batch jobs wait for a slot, only the start of a batch is rejected when the pool is already full
+    if pipeline_executor.is_full:
+        err_msg = "Too many timeseries being processed, try again later"
+        raise ServiceUnavailableError(err_msg)
+
+    batch = await _parse_batch_files(files=files)
+    series_ids = list(batch)
+    results = await asyncio.gather(
+        *(
+            pipeline_executor.run(process_parsed_timeseries, batch.pop(series_id), None, engine, wait_for_slot=True)
+            for series_id in series_ids
+        ),
+        return_exceptions=True,
+    )
+
+    filled_batch: dict[str, TimeSeries] = {}
+    errors: dict[str, str] = {}
+    for series_id, result in zip(series_ids, results, strict=True):
+        if isinstance(result, TimeSeries):
+            filled_batch[series_id] = result
+        else:
+            logger.error("Series %s of the batch has failed: %s", series_id, result)
+            errors[series_id] = str(result) or repr(result)
+
+    rows_written = await store_timeseries_batch(batch=filled_batch, engine=db_engine) if filled_batch else 0
+    return {
+        "series": {series_id: len(series) for series_id, series in filled_batch.items()},
+        "rows_written": rows_written,
+        "errors": errors,
+    }
@@ -0,0 +1,368 @@
+import asyncio
+import os
+import socket
+import uuid
+from collections.abc import Collection
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from fastapi import UploadFile
+from sqlalchemy import ColumnElement, case, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters import logger, pipeline_executor, report_progress
+from app.adapters.db.models import GapFillerJob, JobStage, JobStatus
+from app.config import config
+from app.connections import connections
+from app.server.errors import NotFoundError
+
+from .handle_timeseries_data import process_timeseries_file, store_timeseries_data
+from .timeseries import TimeSeries
+from .uploads import spool_upload_to_disk, upload_file_format
+
+# NOTE: keeps a reference to the running jobs by id, otherwise the event loop could garbage collect them
+_running_jobs: dict[str, asyncio.Task[None]] = {}
+_lease_renewer: asyncio.Task[None] | None = None
+STAGE_RANKS = {stage: rank for rank, stage in enumerate(JobStage)}
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+# NOTE: unique per process, a restarted worker does not own the jobs of its previous run
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def process_gap_filler_job_file(job_id: str, file_path: str, file_extension: str, engine: str) -> TimeSeries:
+    """Process the file of a job inside the pipeline process pool, reporting every stage it reaches.
+
+    Parameters
+    ----------
+    job_id : str
+        Id of the job being processed.
+    file_path : str
+        Path of the spooled upload.
+    file_extension : str
+        The file extension indicating the type of file.
+    engine : str
+        Name of the imputation engine used for long gaps.
+
+    Returns
+    -------
+    TimeSeries
+        The processed series resampled to the required frequency.
+    """
+    return process_timeseries_file(
+        file_path=file_path,
+        file_extension=file_extension,
+        on_stage=partial(report_progress, job_id),
+        engine=engine,
+    )
+
+
+async def update_gap_filler_job_stage(job_id: str, stage: str) -> None:
+    """Persist the stage a job has reached, the first stage reported moves the job to running.
+
+    Progress reported by the pool arrives asynchronously, a stage earlier than the one already stored or reported
+    once the job has finished is ignored.
+
+    Parameters
+    ----------
+    job_id : str
+        Id of the job.
+    stage : str
+        Stage reached by the job.
+    """
+    stored_rank = case(STAGE_RANKS, value=GapFillerJob.stage, else_=-1)
+    async with connections.async_session() as session, session.begin():
+        await session.execute(
+            update(GapFillerJob)
+            .where(
+                GapFillerJob.id == job_id,
+                GapFillerJob.status.in_(ACTIVE_STATUSES),
+                stored_rank < STAGE_RANKS[JobStage(stage)],
+            )
+            .values(
+                status=JobStatus.RUNNING,
+                stage=stage,
+                started_at=func.coalesce(GapFillerJob.started_at, func.now()),
+            ),
+        )
+
+
+def _lease_expiry() -> ColumnElement[datetime]:
+    return func.now() + timedelta(seconds=config.JOB_LEASE_SECONDS)
+
+
+async def _lease_gap_filler_jobs(session: AsyncSession, job_ids: Collection[str]) -> None:
+    await session.execute(
+        update(GapFillerJob)
+        .where(GapFillerJob.id.in_(job_ids), GapFillerJob.status.in_(ACTIVE_STATUSES))
+        .values(worker_id=WORKER_ID, lease_expires_at=_lease_expiry())
+        .execution_options(synchronize_session=False),
+    )
+
+
+async def _finish_gap_filler_job(
+    job_id: str,
+    status: JobStatus,
+    result: dict[str, Any] | None,
+    error: str | None,
+) -> None:
+    async with connections.async_session() as session, session.begin():
+        await session.execute(
+            update(GapFillerJob)
+            .where(GapFillerJob.id == job_id)
+            .values(status=status, result=result, error=error, finished_at=func.now()),
+        )
+
+
+async def run_gap_filler_job(job_id: str, series_id: str, file_path: str, file_extension: str, engine: str) -> None:
+    """Run a queued job: fill the gaps of its file in the process pool and store the result.
+
+    Jobs wait for a free slot in the pool instead of being rejected, so bursts of uploads are queued. Any error is
+    recorded in the job instead of being raised. The upload is deleted once the outcome of the job is recorded, a
+    cancelled job keeps it and stays queued or running, to be resumed by the next worker that leases it.
+
+    Parameters
+    ----------
+    job_id : str
+        Id of the job.
+    series_id : str
+        Id of the series the file belongs to.
+    file_path : str
+        Path of the spooled upload.
+    file_extension : str
+        The file extension indicating the type of file.
+    engine : str
+        Name of the imputation engine used for long gaps.
+
+    Raises
+    ------
+    asyncio.CancelledError
+        If the job is interrupted, e.g. on shutdown.
+    """
+    try:
+        series = await pipeline_executor.run(
+            process_gap_filler_job_file,
+            job_id,
+            file_path,
+            file_extension,
+            engine,
+            wait_for_slot=True,
+        )
+
+        await update_gap_filler_job_stage(job_id=job_id, stage=JobStage.STORING)
+        await store_timeseries_data(series=series, engine=connections.engine, series_id=series_id)
+
+        result = {
+            "rows": len(series),
+            "start": series.start.isoformat() if series.start else None,
+            "end": series.end.isoformat() if series.end else None,
+        }
+        await _finish_gap_filler_job(job_id=job_id, status=JobStatus.SUCCEEDED, result=result, error=None)
+        logger.info("Gap filler job %s has finished", job_id)
+    except asyncio.CancelledError:
+        logger.warning("Gap filler job %s has been interrupted, its upload is kept to resume it", job_id)
+        raise
+    except Exception as err:  # noqa: BLE001
+        logger.error("Gap filler job %s has failed: %s", job_id, err)
+        await _finish_gap_filler_job(job_id=job_id, status=JobStatus.FAILED, result=None, error=str(err) or repr(err))
+
+    Path(file_path).unlink(missing_ok=True)
+
+
+async def submit_gap_filler_job(file: UploadFile, series_id: str, engine: str) -> GapFillerJob:
+    """Spool an upload to disk, persist a queued job for it and schedule its processing.
+
+    Parameters
+    ----------
+    file : UploadFile
+        The uploaded timeseries data file.
+    series_id : str
+        Id of the series the file belongs to.
+    engine : str
+        Name of the imputation engine used for long gaps.
+
+    Returns
+    -------
+    GapFillerJob
+        The queued job.
+    """
+    file_name = file.filename or ""
+    file_extension, _ = upload_file_format(file_name=file_name)
+    file_path = await spool_upload_to_disk(file=file)
+
+    job = GapFillerJob(
+        id=uuid.uuid4().hex,
+        series_id=series_id,
+        status=JobStatus.QUEUED,
+        file_name=file_name,
+        file_extension=file_extension,
+        file_path=str(file_path),
+        imputation_engine=engine,
+    )
+
+    try:
+        async with connections.async_session() as session, session.begin():
+            session.add(job)
+            await session.flush()
+            await _lease_gap_filler_jobs(session=session, job_ids=[job.id])
+    except Exception:
+        file_path.unlink(missing_ok=True)
+        raise
+
+    _schedule_gap_filler_job(job)
+    logger.info("Gap filler job %s has been queued", job.id)
+    return job
+
+
+def _schedule_gap_filler_job(job: GapFillerJob) -> None:
+    task = asyncio.create_task(
+        run_gap_filler_job(
+            job_id=job.id,
+            series_id=job.series_id,
+            file_path=job.file_path,
+            file_extension=job.file_extension,
+            engine=job.imputation_engine or config.IMPUTATION_ENGINE,
+        ),
+    )
+    _running_jobs[job.id] = task
+    task.add_done_callback(lambda _: _running_jobs.pop(job.id, None))
+
+
+async def resume_gap_filler_jobs() -> int:
+    """Queue again the jobs whose lease has expired, called on startup and while the jobs leases are renewed.
+
+    Jobs only live in the worker that leased them, once it stops renewing their lease nothing would ever finish them.
+    Jobs whose spooled upload is still on disk are leased by this worker and start over, the others are marked as
+    failed.
+
+    Returns
+    -------
+    int
+        Number of jobs queued again.
+    """
+    # NOTE: jobs are locked until their new lease is committed, two workers never resume the same job
+    async with connections.async_session() as session, session.begin():
+        jobs = (
+            await session.scalars(
+                select(GapFillerJob)
+                .where(
+                    GapFillerJob.status.in_(ACTIVE_STATUSES),
+                    GapFillerJob.deleted_at.is_(None),
+                    or_(GapFillerJob.lease_expires_at.is_(None), GapFillerJob.lease_expires_at < func.now()),
+                    GapFillerJob.id.not_in(list(_running_jobs)),
+                )
+                .with_for_update(skip_locked=True),
+            )
+        ).all()
+        resumed = [job for job in jobs if Path(job.file_path).exists()]
+        lost_ids = [job.id for job in jobs if job not in resumed]
+
+        await session.execute(
+            update(GapFillerJob)
+            .where(GapFillerJob.id.in_([job.id for job in resumed]))
+            .values(status=JobStatus.QUEUED, stage=None, started_at=None)
+            .execution_options(synchronize_session=False),
+        )
+        await _lease_gap_filler_jobs(session=session, job_ids=[job.id for job in resumed])
+        await session.execute(
+            update(GapFillerJob)
+            .where(GapFillerJob.id.in_(lost_ids))
+            .values(
+                status=JobStatus.FAILED,
+                error="The upload of the job was lost when the service restarted, upload it again",
+                finished_at=func.now(),
+            )
+            .execution_options(synchronize_session=False),
+        )
+
+    for job in resumed:
+        _schedule_gap_filler_job(job)
+
+    if jobs:
+        logger.warning("%s orphaned gap filler jobs queued again, %s failed", len(resumed), len(lost_ids))
+
+    return len(resumed)
+
+
+async def _renew_gap_filler_job_leases() -> None:
+    while True:
+        await asyncio.sleep(config.JOB_LEASE_SECONDS / 3)
+        try:
+            if _running_jobs:
+                async with connections.async_session() as session, session.begin():
+                    await _lease_gap_filler_jobs(session=session, job_ids=list(_running_jobs))
+
+            await resume_gap_filler_jobs()
+        except (SQLAlchemyError, OSError):
+            logger.exception("Leases of the gap filler jobs could not be renewed")
+
+
+def watch_gap_filler_jobs() -> None:
+    """Renew the leases of the jobs of this worker in the background and resume the jobs other workers left."""
+    global _lease_renewer  # noqa: PLW0603
+    if _lease_renewer is None:
+        _lease_renewer = asyncio.create_task(_renew_gap_filler_job_leases())
+
+
+async def stop_gap_filler_jobs() -> None:
+    """Interrupt the jobs of this worker and release their leases, called on shutdown.
+
+    Interrupted jobs keep their upload and a released lease has expired, the next worker to start or renew its leases
+    resumes them.
+    """
+    global _lease_renewer  # noqa: PLW0603
+    if _lease_renewer is not None:
+        _lease_renewer.cancel()
+        _lease_renewer = None
+
+    job_ids = list(_running_jobs)
+    tasks = list(_running_jobs.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if not job_ids:
+        return
+
+    async with connections.async_session() as session, session.begin():
+        await session.execute(
+            update(GapFillerJob)
+            .where(
+                GapFillerJob.id.in_(job_ids),
+                GapFillerJob.worker_id == WORKER_ID,
+                GapFillerJob.status.in_(ACTIVE_STATUSES),
+            )
+            .values(lease_expires_at=None)
+            .execution_options(synchronize_session=False),
+        )
+
+    logger.info("%s gap filler jobs interrupted, their leases have been released", len(job_ids))
+
+
+async def get_gap_filler_job(session: AsyncSession, job_id: str) -> GapFillerJob:
+    """Retrieve a job by its id.
+
+    Parameters
+    ----------
+    session : AsyncSession
+        DB session.
+    job_id : str
+        Id of the job.
+
+    Returns
+    -------
+    GapFillerJob
+        The job.
+
+    Raises
+    ------
+    NotFoundError
+        If the job does not exist.
+    """
+    job = await session.get(GapFillerJob, job_id)
+    if job is None or job.deleted_at is not None:
+        err_msg = f"Gap filler job {job_id} not found"
+        raise NotFoundError(err_msg)
+
+    return job
@@ -1,88 +1,594 @@
-from pandas import DataFrame
-from sklearn.ensemble import RandomForestRegressor
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
+from typing import Any, ClassVar, Self
 
-from app.adapters import logger
+import numpy as np
+from pandas import DataFrame, Series
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from threadpoolctl import threadpool_limits
 
+from app.adapters import Metric, logger, record_metric, stage_timer
+from app.config import config
 
-def get_percentage_of_missing_data(df: DataFrame, missing_data_df: DataFrame) -> float:
-    """Calculate the percentage of missing data in a DataFrame.
+from .gap_analysis import fill_short_gaps, find_gap_runs
+from .model_cache import model_cache
+from .timeseries import NS_PER_DAY, NS_PER_MINUTE, TimeSeries
+from .training_windows import plan_training_windows, stratified_subsample
+
+
+class ImputationEngineName(StrEnum):
+    """Available imputation engines."""
+
+    RANDOM_FOREST = "random_forest"
+    HIST_GRADIENT_BOOSTING = "hist_gradient_boosting"
+    SEASONAL_PROFILE = "seasonal_profile"
+
+
+DEFAULT_IMPUTATION_ENGINE = ImputationEngineName(config.IMPUTATION_ENGINE)
+
+
+class FitTimeBudgetExceededError(Exception):
+    """Raised when training an engine is projected to take longer than its time budget."""
+
+
+def fit_within_time_budget(
+    model: RandomForestRegressor | HistGradientBoostingRegressor,
+    size: tuple[str, int],
+    x_train: DataFrame,
+    y_train: Series | DataFrame,
+    time_budget: float | None,
+) -> None:
+    """Fit a tree ensemble, giving up as soon as it is projected to exceed its time budget.
+
+    The ensemble is grown with `warm_start`, one tree first and then batches of a tenth of its trees, the time taken so
+    far projects the time needed by the whole ensemble.
+
+    Args:
+        model (RandomForestRegressor | HistGradientBoostingRegressor): The untrained model.
+        size (tuple[str, int]): Name of the parameter holding the number of trees and the number of trees to fit.
+        x_train (DataFrame): Training features.
+        y_train (Series | DataFrame): Training target, one column per target for multi-output models.
+        time_budget (float | None): Max seconds the fit can take, None or 0 fits without any limit.
+
+    Raises:
+        FitTimeBudgetExceededError: If the fit is projected to exceed its time budget.
+    """
+    size_param, total_size = size
+    if not time_budget:
+        model.set_params(**{size_param: total_size})
+        model.fit(x_train, y_train)
+        return
+
+    model.set_params(warm_start=True)
+    batch_size = max(1, total_size // 10)
+    fitted = 0
+    start_time = time.perf_counter()
+
+    while fitted < total_size:
+        fitted = min(total_size, fitted + (batch_size if fitted else 1))
+        model.set_params(**{size_param: fitted})
+        model.fit(x_train, y_train)
+
+        projected_time = (time.perf_counter() - start_time) / fitted * total_size
+        if fitted < total_size and projected_time > time_budget:
+            err_msg = f"Fit projected to take {projected_time:.1f} s, over its budget of {time_budget} s"
+            raise FitTimeBudgetExceededError(err_msg)
+
+    model.set_params(warm_start=False)
+
+
+class ImputationEngine(ABC):
+    """Model predicting the missing values of a series from its calendar features.
+
+    Multi-measure series are fitted at once: the target is a DataFrame with one column per measure and predictions
+    have one column per measure too.
+    """
+
+    name: ClassVar[ImputationEngineName]
+
+    @property
+    @abstractmethod
+    def params(self) -> dict[str, Any]:
+        """Parameters changing the predictions of the engine, used to key the model cache."""
+        error_message = "Implement method"
+        raise NotImplementedError(error_message)
+
+    @abstractmethod
+    def fit(self, x_train: DataFrame, y_train: Series | DataFrame, time_budget: float | None = None) -> Self:
+        """Train the engine, raising `FitTimeBudgetExceededError` if it can not be trained within the time budget."""
+        error_message = "Implement method"
+        raise NotImplementedError(error_message)
+
+    @abstractmethod
+    def predict(self, x_predict: DataFrame) -> np.ndarray:
+        """Predict the values of the given features."""
+        error_message = "Implement method"
+        raise NotImplementedError(error_message)
+
+
+class RandomForestEngine(ImputationEngine):
+    """RandomForestRegressor engine, multi-measure series are fitted natively by a single multi-output forest."""
+
+    name = ImputationEngineName.RANDOM_FOREST
+
+    def __init__(self, n_estimators: int, n_jobs: int, random_state: int = 42) -> None:
+        """Initialize the engine.
+
+        Args:
+            n_estimators (int): Number of trees.
+            n_jobs (int): Number of threads used to fit and predict, -1 uses every core.
+            random_state (int): Seed of the forest.
+        """
+        self.n_estimators = n_estimators
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.model: RandomForestRegressor | None = None
+
+    @property
+    def params(self) -> dict[str, Any]:
+        """Parameters changing the predictions of the engine."""
+        return {"engine": self.name, "n_estimators": self.n_estimators, "random_state": self.random_state}
+
+    def fit(self, x_train: DataFrame, y_train: Series | DataFrame, time_budget: float | None = None) -> Self:
+        """Train the forest.
+
+        Returns:
+            Self: The trained engine.
+        """
+        self.model = RandomForestRegressor(n_jobs=self.n_jobs, random_state=self.random_state)
+        fit_within_time_budget(self.model, ("n_estimators", self.n_estimators), x_train, y_train, time_budget)
+        return self
+
+    def predict(self, x_predict: DataFrame) -> np.ndarray:
+        """Predict the values of the given features.
+
+        Returns:
+            np.ndarray: The predicted values.
+
+        Raises:
+            ValueError: If the engine has not been trained.
+        """
+        if self.model is None:
+            err_msg = "Engine has not been trained"
+            raise ValueError(err_msg)
+
+        predicted: np.ndarray = self.model.predict(x_predict)
+        return predicted
+
+
+class HistGradientBoostingEngine(ImputationEngine):
+    """HistGradientBoostingRegressor engine, bins the features so it fits large series much faster than a forest.
+
+    Boosting has no multi-output support, multi-measure series get one model per measure sharing the time budget.
+    """
+
+    name = ImputationEngineName.HIST_GRADIENT_BOOSTING
+
+    def __init__(self, max_iter: int, threads: int, random_state: int = 42) -> None:
+        """Initialize the engine.
+
+        Args:
+            max_iter (int): Number of boosting iterations, one tree each.
+            threads (int): Number of OpenMP threads used to fit and predict.
+            random_state (int): Seed of the model.
+        """
+        self.max_iter = max_iter
+        self.threads = threads
+        self.random_state = random_state
+        self.models: list[HistGradientBoostingRegressor] = []
+        self.multi_output = False
+
+    @property
+    def params(self) -> dict[str, Any]:
+        """Parameters changing the predictions of the engine."""
+        return {"engine": self.name, "max_iter": self.max_iter, "random_state": self.random_state}
+
+    def fit(self, x_train: DataFrame, y_train: Series | DataFrame, time_budget: float | None = None) -> Self:
+        """Train the boosting models, limited to the configured number of threads.
+
+        Returns:
+            Self: The trained engine.
+        """
+        self.multi_output = isinstance(y_train, DataFrame)
+        targets = [y_train.iloc[:, column] for column in range(y_train.shape[1])] if self.multi_output else [y_train]
+        target_budget = time_budget / len(targets) if time_budget else time_budget
+
+        self.models = []
+        with threadpool_limits(limits=self.threads, user_api="openmp"):
+            for target in targets:
+                model = HistGradientBoostingRegressor(random_state=self.random_state)
+                fit_within_time_budget(model, ("max_iter", self.max_iter), x_train, target, target_budget)
+                self.models.append(model)
+        return self
+
+    def predict(self, x_predict: DataFrame) -> np.ndarray:
+        """Predict the values of the given features.
+
+        Returns:
+            np.ndarray: The predicted values.
+
+        Raises:
+            ValueError: If the engine has not been trained.
+        """
+        if not self.models:
+            err_msg = "Engine has not been trained"
+            raise ValueError(err_msg)
+
+        with threadpool_limits(limits=self.threads, user_api="openmp"):
+            predictions = [model.predict(x_predict) for model in self.models]
+        return np.column_stack(predictions) if self.multi_output else predictions[0]
+
+
+class SeasonalProfileEngine(ImputationEngine):
+    """Training-free engine, fills gaps with a median profile by hour of the day and day of the week.
+
+    The profile is scaled to the local level of the series: the ratio between the observed values and the profile
+    around each gap, over `level_window_hours` on both sides, so seasonal drifts are followed without any fit. It costs
+    one grouped reduction and one gather, which also makes it the fallback of the engines exceeding their time budget.
+    """
+
+    name = ImputationEngineName.SEASONAL_PROFILE
+
+    def __init__(self, level_window_hours: float) -> None:
+        """Initialize the engine.
+
+        Args:
+            level_window_hours (float): Hours on each side of a gap used to measure the local level, 0 disables it.
+        """
+        self.level_window_hours = level_window_hours
+        self.profile: np.ndarray | None = None
+        self.train_hours: np.ndarray | None = None
+        self.cumulative_observed: np.ndarray | None = None
+        self.cumulative_profile: np.ndarray | None = None
+
+    @property
+    def params(self) -> dict[str, Any]:
+        """Parameters changing the predictions of the engine."""
+        return {"engine": self.name, "level_window_hours": self.level_window_hours}
+
+    @staticmethod
+    def _profile_keys(x: DataFrame) -> np.ndarray:
+        keys: np.ndarray = x["day_of_week"].to_numpy(dtype=np.int16) * 24 + x["hour"].to_numpy(dtype=np.int16)
+        return keys
+
+    def fit(self, x_train: DataFrame, y_train: Series | DataFrame, time_budget: float | None = None) -> Self:  # noqa: ARG002
+        """Build the median profile and the running sums used to measure the local level, one per measure.
+
+        Returns:
+            Self: The trained engine.
+        """
+        keys = self._profile_keys(x_train)
+        values = y_train.to_numpy(dtype=np.float64)
+
+        profile = type(y_train)(values).groupby(keys).median()
+        self.profile = np.full((7 * 24, *values.shape[1:]), np.nanmedian(values, axis=0) if values.size else 0.0)
+        self.profile[profile.index.to_numpy()] = profile.to_numpy()
+
+        # NOTE: running sums of the observed values and of their profile, any window sum is then two lookups
+        zeros = np.zeros((1, *values.shape[1:]))
+        self.train_hours = x_train["time_since_start"].to_numpy(dtype=np.float64)
+        self.cumulative_observed = np.concatenate((zeros, np.cumsum(values, axis=0)))
+        self.cumulative_profile = np.concatenate((zeros, np.cumsum(self.profile[keys], axis=0)))
+        return self
+
+    def predict(self, x_predict: DataFrame) -> np.ndarray:
+        """Gather the profile of every missing value and scale it to the local level.
+
+        Returns:
+            np.ndarray: The predicted values.
+
+        Raises:
+            ValueError: If the engine has not been trained.
+        """
+        if self.profile is None or self.train_hours is None:
+            err_msg = "Engine has not been trained"
+            raise ValueError(err_msg)
+
+        predicted: np.ndarray = self.profile[self._profile_keys(x_predict)]
+        if self.level_window_hours <= 0 or self.cumulative_observed is None or self.cumulative_profile is None:
+            return predicted
+
+        hours = x_predict["time_since_start"].to_numpy(dtype=np.float64)
+        window_start = np.searchsorted(self.train_hours, hours - self.level_window_hours, side="left")
+        window_end = np.searchsorted(self.train_hours, hours + self.level_window_hours, side="right")
+        observed_sum = self.cumulative_observed[window_end] - self.cumulative_observed[window_start]
+        profile_sum = self.cumulative_profile[window_end] - self.cumulative_profile[window_start]
+
+        scale = np.ones_like(predicted)
+        np.divide(observed_sum, profile_sum, out=scale, where=np.abs(profile_sum) > np.finfo(np.float64).eps)
+        predicted *= scale
+        return predicted
+
+
+def threads_per_fit(threads: int, concurrent_fits: int) -> int:
+    """Share the threads configured for a fit between the fits running in parallel in the same process.
+
+    Parameters
+    ----------
+    threads : int
+        Threads configured for a single fit, -1 uses every core available to the process.
+    concurrent_fits : int
+        Number of fits running at the same time.
+
+    Returns
+    -------
+    int
+        Threads of every fit, at least one.
+    """
+    available = (os.process_cpu_count() or 1) if threads == -1 else threads
+    return max(1, available // max(1, concurrent_fits))
+
+
+def create_imputation_engine(name: str = config.IMPUTATION_ENGINE, concurrent_fits: int = 1) -> ImputationEngine:
+    """Create an imputation engine configured from the settings in `Config`.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the engine (default is `IMPUTATION_ENGINE`).
+    concurrent_fits : int, optional
+        Number of engines fitted at the same time, they share the threads configured for the engine.
+
+    Returns
+    -------
+    ImputationEngine
+        The untrained engine.
+
+    Raises
+    ------
+    ValueError
+        If the engine does not exist.
+    """
+    match name:
+        case ImputationEngineName.RANDOM_FOREST:
+            return RandomForestEngine(
+                n_estimators=config.RANDOM_FOREST_N_ESTIMATORS,
+                n_jobs=threads_per_fit(config.RANDOM_FOREST_N_JOBS, concurrent_fits),
+            )
+        case ImputationEngineName.HIST_GRADIENT_BOOSTING:
+            return HistGradientBoostingEngine(
+                max_iter=config.HIST_GRADIENT_BOOSTING_MAX_ITER,
+                threads=threads_per_fit(config.HIST_GRADIENT_BOOSTING_THREADS, concurrent_fits),
+            )
+        case ImputationEngineName.SEASONAL_PROFILE:
+            return SeasonalProfileEngine(level_window_hours=config.SEASONAL_PROFILE_LEVEL_WINDOW_HOURS)
+        case _:
+            err_msg = f"Unsupported imputation engine -> {name}"
+            raise ValueError(err_msg)
+
+
+def get_percentage_of_missing_data(missing: np.ndarray) -> float:
+    """Calculate the percentage of missing data in a series.
 
     Parameters
     ----------
-    df : pandas.DataFrame
-        The original DataFrame.
-    missing_data_df : pandas.DataFrame
-        DataFrame containing missing data.
+    missing : np.ndarray
+        Boolean mask, True where a value is missing.
 
     Returns
     -------
     float
         Percentage of missing data.
     """
-    df_len = df.shape[0]
-    missing_data_df = df.shape[1]
-    return missing_data_df / df_len
+    return float(missing.mean()) if missing.size else 0.0
+
+
+def interpolate_short_gaps(series: TimeSeries) -> TimeSeries:
+    """Fill the gaps of a regular series shorter than `IMPUTATION_SHORT_GAP_MAX_SAMPLES` with the configured method.
+
+    Every measure of a multi-measure series is filled on its own.
+
+    Parameters
+    ----------
+    series : TimeSeries
+        Regularly sampled series.
+
+    Returns
+    -------
+    TimeSeries
+        Series with only its long gaps left as NaNs.
+    """
+    for column in series.columns.T:
+        _, gap_lengths = find_gap_runs(np.isnan(column))
+        long_gaps = int((gap_lengths > config.IMPUTATION_SHORT_GAP_MAX_SAMPLES).sum())
+        logger.info("Found %s gaps, %s of them longer than the short gap limit", gap_lengths.size, long_gaps)
 
+    return fill_short_gaps(
+        series=series,
+        max_gap=config.IMPUTATION_SHORT_GAP_MAX_SAMPLES,
+        method=config.IMPUTATION_SHORT_GAP_METHOD,
+        season_length=NS_PER_DAY // series.most_frequent_step(),
+    )
 
-def predict_gaps_on_timeseries_data(df: DataFrame, target_column: str = "energy") -> DataFrame:
-    """Predict and fill gaps (missing values) in a time series DataFrame using a RandomForestRegressor.
+
+def calendar_features(series: TimeSeries) -> DataFrame:
+    """Build the calendar features the imputation engines are trained on, straight from the epochs of a series.
 
     Parameters
     ----------
-    df : pandas.DataFrame
-        Input DataFrame with a datetime index and a target column containing gaps (NaNs).
-    target_column : str, optional
-        Name of the column to fill gaps in (default is "energy").
+    series : TimeSeries
+        The series.
 
     Returns
     -------
     pandas.DataFrame
-        DataFrame with gaps in the target column filled by model predictions.
+        "hour", "day_of_week", "month", "day_of_year" and "time_since_start" (hours) of every timestamp.
+    """
+    days = series.datetimes.astype("datetime64[D]")
+    months = days.astype("datetime64[M]")
+    return DataFrame(
+        {
+            "hour": (series.epochs // (60 * NS_PER_MINUTE)) % 24,
+            # NOTE: 1970-01-01 was a Thursday, day 3 counting from Monday as 0 like pandas
+            "day_of_week": (days.view(np.int64) + 3) % 7,
+            "month": months.view(np.int64) % 12 + 1,
+            "day_of_year": (days - days.astype("datetime64[Y]")).view(np.int64) + 1,
+            "time_since_start": (series.epochs - series.epochs[0]) / (60 * NS_PER_MINUTE),
+        },
+        copy=False,
+    )
+
+
+def fit_imputation_engine(
+    engine: str,
+    x_train: DataFrame,
+    y_train: Series | DataFrame,
+    concurrent_fits: int = 1,
+) -> ImputationEngine:
+    """Train an imputation engine, reusing the cached one when the same data was already fitted.
+
+    When the fit exceeds `IMPUTATION_FIT_TIME_BUDGET` the seasonal profile engine is trained instead.
+
+    Parameters
+    ----------
+    engine : str
+        Name of the imputation engine.
+    x_train : pandas.DataFrame
+        Training features.
+    y_train : pandas.Series | pandas.DataFrame
+        Training target, one column per measure of a multi-measure series.
+    concurrent_fits : int, optional
+        Number of engines fitted at the same time in this process, see `create_imputation_engine`.
+
+    Returns
+    -------
+    ImputationEngine
+        The trained engine.
+    """
+    imputation_engine = create_imputation_engine(name=engine, concurrent_fits=concurrent_fits)
+    model_key = model_cache.fingerprint(x_train=x_train, y_train=y_train, params=imputation_engine.params)
+    model: ImputationEngine | None = model_cache.get(model_key)
+    if model is not None:
+        logger.info("Reusing cached %s model %s", engine, model_key)
+        record_metric(Metric.MODEL_CACHE_HITS, 1, engine)
+        return model
+
+    record_metric(Metric.MODEL_FITS, 1, engine)
+    try:
+        model = imputation_engine.fit(x_train, y_train, time_budget=config.IMPUTATION_FIT_TIME_BUDGET)
+    except FitTimeBudgetExceededError as err:
+        logger.warning("Falling back to the seasonal profile engine, %s: %s", engine, err)
+        record_metric(Metric.MODEL_FITS, 1, ImputationEngineName.SEASONAL_PROFILE)
+        return create_imputation_engine(name=ImputationEngineName.SEASONAL_PROFILE).fit(x_train, y_train)
+
+    model_cache.put(model_key, model)
+    return model
+
+
+def predict_gaps_on_timeseries_data(
+    series: TimeSeries,
+    on_stage: Callable[[str], None] | None = None,
+    engine: str = config.IMPUTATION_ENGINE,
+) -> TimeSeries:
+    """Predict and fill gaps (missing values) in a regular series using an imputation engine.
+
+    Gaps up to `IMPUTATION_SHORT_GAP_MAX_SAMPLES` long are interpolated first, the model is only trained when longer
+    gaps remain. Every measure of a multi-measure series is filled by the same multi-output fit, trained on the rows
+    where all of them are observed over a single feature matrix.
+
+    Parameters
+    ----------
+    series : TimeSeries
+        Regularly sampled series containing gaps (NaNs).
+    on_stage : Callable[[str], None], optional
+        Called with the name of the stage ("training", "predicting") when it starts.
+    engine : str, optional
+        Name of the imputation engine (default is `IMPUTATION_ENGINE`).
+
+    Returns
+    -------
+    TimeSeries
+        Series with its gaps filled by model predictions.
 
     Raises
     ------
     ValueError
         If the percentage of gaps to be filled exceeds 40%.
     """
-    initial_df = df.copy()
+    missing = series.missing
+    observed = ~missing.reshape(len(series), -1).any(axis=1)
 
-    # Adding extra information to improve model prediction
-    initial_df["hour"] = initial_df.index.hour
-    initial_df["day_of_week"] = initial_df.index.dayofweek
-    initial_df["month"] = initial_df.index.month
-    initial_df["day_of_year"] = initial_df.index.dayofyear
-    initial_df["time_since_start"] = (initial_df.index - initial_df.index[0]).total_seconds() / 3600
-    initial_df["timestamp"] = initial_df.index
-
-    # Splitting my data among training and prediction
-    df_train = initial_df.dropna(subset=[target_column])
-    df_predict = initial_df[initial_df[target_column].isna()]
-
-    percentage = get_percentage_of_missing_data(df=initial_df, missing_data_df=df_predict)
+    percentage = get_percentage_of_missing_data(missing=missing)
+    record_metric(Metric.MISSING_RATIO, percentage)
     logger.info(f"Total missing values is around {(percentage * 100):.2f} %")
 
     if percentage > 0.4:
         err_msg = "Gaps to filled exceed 40%, makes prediction much unreliable"
         raise ValueError(err_msg)
 
-    # If there are no missing values to predict, just return the original DataFrame
-    if df_predict.empty:
-        return initial_df.drop(columns=initial_df.columns.difference(df.columns))
+    # If there are no missing values to predict, just return the original series
+    if observed.all():
+        return series
+
+    # Short gaps are cheaply interpolated, the model is only trained when long gaps remain
+    if config.IMPUTATION_SHORT_GAP_MAX_SAMPLES > 0:
+        with stage_timer("interpolating"):
+            series = interpolate_short_gaps(series=series)
+
+        if not series.missing.any():
+            logger.info("Only short gaps found, filled them without training a model")
+            return series
+
+    # Adding extra information to improve model prediction
+    x_all = calendar_features(series=series)
+    y_all = (
+        DataFrame(series.values, columns=list(series.measures), copy=False)
+        if series.measures
+        else Series(series.values, copy=False)
+    )
+    strata = (x_all["day_of_week"] * 24 + x_all["hour"]).to_numpy()
+
+    # Training rows are picked around every cluster of gaps, independent clusters are trained in parallel
+    # NOTE: a row is predicted when any of its measures is missing, and trained on when all of them were observed
+    missing = series.missing
+    missing_rows = missing.reshape(len(series), -1).any(axis=1)
+    windows = plan_training_windows(
+        hours=x_all["time_since_start"].to_numpy(),
+        missing=missing_rows,
+        observed=observed,
+        horizon=config.TRAINING_WINDOW_HOURS,
+    )
+    logger.info("Training %s model(s) for %s rows to predict", len(windows), int(missing_rows.sum()))
+
+    window_workers = max(1, min(len(windows), config.TRAINING_WINDOW_WORKERS))
+
+    def fit_window(rows: tuple[np.ndarray, np.ndarray]) -> ImputationEngine:
+        train_rows = rows[0][stratified_subsample(strata[rows[0]], max_rows=config.TRAINING_MAX_ROWS)]
+        return fit_imputation_engine(
+            engine=engine,
+            x_train=x_all.iloc[train_rows],
+            y_train=y_all.iloc[train_rows],
+            concurrent_fits=window_workers,
+        )
 
-    features = ["hour", "day_of_week", "month", "day_of_year", "time_since_start"]
-    x_train = df_train[features]
-    y_train = df_train[target_column]
-    x_predict = df_predict[features]
+    if on_stage is not None:
+        on_stage("training")
 
-    # Model training and prediction
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(x_train, y_train)
+    with (
+        stage_timer("training"),
+        ThreadPoolExecutor(max_workers=window_workers) as pool,
+    ):
+        models = list(pool.map(fit_window, windows))
 
     # Prediction
-    predicted_values = model.predict(x_predict)
+    if on_stage is not None:
+        on_stage("predicting")
 
     # Used the predicted data to fill gaps
-    initial_df.loc[initial_df[target_column].isna(), target_column] = predicted_values
+    # NOTE: rows where only some measures are missing keep their observed values
+    filled_values = series.columns.copy()
+    missing_values = missing.reshape(filled_values.shape)
+    with stage_timer("predicting"):
+        for model, (_, predict_rows) in zip(models, windows, strict=True):
+            predicted = model.predict(x_all.iloc[predict_rows]).reshape(predict_rows.size, -1)
+            filled_values[predict_rows] = np.where(
+                missing_values[predict_rows],
+                predicted,
+                filled_values[predict_rows],
+            )
 
-    # clean up dataframe
-    return initial_df.drop(columns=[*features, "timestamp"])
+    return series.with_values(filled_values.reshape(missing.shape))
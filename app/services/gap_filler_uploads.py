@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+from typing import Any
+
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.adapters import logger, pipeline_executor
+from app.config import config
+
+from .gap_filler_model import create_imputation_engine
+from .handle_timeseries_data import measure_series_ids, process_timeseries_file, store_timeseries_data
+from .result_cache import result_cache
+from .uploads import spool_upload_to_disk, upload_file_format
+
+
+def pipeline_params(file_extension: str, series_id: str, engine: str) -> dict[str, Any]:
+    """Gather everything besides the content of an upload that changes its filled series or where it is stored.
+
+    Parameters
+    ----------
+    file_extension : str
+        The file extension indicating the type of file.
+    series_id : str
+        Id of the series the upload belongs to.
+    engine : str
+        Name of the imputation engine used for long gaps.
+
+    Returns
+    -------
+    dict[str, Any]
+        The parameters, keying the result cache along with the hash of the upload.
+    """
+    return {
+        "file_extension": file_extension,
+        "series_id": series_id,
+        "engine": create_imputation_engine(name=engine).params,
+        "short_gap_max_samples": config.IMPUTATION_SHORT_GAP_MAX_SAMPLES,
+        "short_gap_method": config.IMPUTATION_SHORT_GAP_METHOD,
+        "fit_time_budget": config.IMPUTATION_FIT_TIME_BUDGET,
+        "training_window_hours": config.TRAINING_WINDOW_HOURS,
+        "training_max_rows": config.TRAINING_MAX_ROWS,
+        "measure_separator": config.MEASURE_SERIES_ID_SEPARATOR,
+    }
+
+
+async def fill_gap_filler_upload(file: UploadFile, series_id: str, engine: str, db_engine: AsyncEngine) -> bool:
+    """Fill and store an upload, byte-identical uploads already filled and stored are not processed again.
+
+    The upload is hashed while it is spooled to disk. A cached result already stored returns straight away, one
+    filled but not stored yet, e.g. because the DB failed or another upload changed the points of its series since,
+    is only stored.
+
+    Parameters
+    ----------
+    file : UploadFile
+        The uploaded timeseries data file.
+    series_id : str
+        Id of the series the upload belongs to.
+    engine : str
+        Name of the imputation engine used for long gaps.
+    db_engine : AsyncEngine
+        DB engine used to store the filled series.
+
+    Returns
+    -------
+    bool
+        Whether the filled series came from the result cache.
+    """
+    file_extension, _ = upload_file_format(file_name=file.filename or "")
+    content_digest = hashlib.blake2b(digest_size=20)
+    file_path = await spool_upload_to_disk(file=file, on_chunk=content_digest.update)
+
+    try:
+        key = result_cache.fingerprint(
+            content_digest=content_digest.hexdigest(),
+            params=pipeline_params(file_extension=file_extension, series_id=series_id, engine=engine),
+        )
+        cached = await asyncio.to_thread(result_cache.get, key) if result_cache.enabled else None
+        if cached is not None and cached.stored:
+            logger.info("Upload of series %s has already been filled and stored, result %s", series_id, key)
+            return True
+
+        if cached is None:
+            series = await pipeline_executor.run(process_timeseries_file, str(file_path), file_extension, None, engine)
+            if result_cache.enabled:
+                await asyncio.to_thread(
+                    result_cache.put,
+                    key=key,
+                    series=series,
+                    series_ids=measure_series_ids(series_id=series_id, measures=series.measures),
+                    stored=False,
+                )
+        else:
+            series = cached.series
+    finally:
+        file_path.unlink(missing_ok=True)
+
+    await store_timeseries_data(series=series, engine=db_engine, series_id=series_id)
+    if result_cache.enabled:
+        await asyncio.to_thread(result_cache.mark_stored, key)
+
+    return cached is not None
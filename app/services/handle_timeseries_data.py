@@ -1,79 +1,83 @@
+import asyncio
+import time
+from collections.abc import Callable, Mapping
+from typing import BinaryIO
+
 import matplotlib.pyplot as plt
 import pandas as pd
 from dateutil.relativedelta import relativedelta
-from fastapi import UploadFile
 from pandas import DataFrame, Timedelta
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from app.adapters import logger
+from app.adapters import Metric, logger, record_metric, stage_timer
+from app.adapters.db.bulk_writer import (
+    SeriesRecords,
+    driver_transaction,
+    upsert_timeseries_batch,
+)
+from app.config import config
 from app.server.errors import BadRequestError
 
 from .gap_filler_model import predict_gaps_on_timeseries_data
+from .result_cache import result_cache
+from .timeseries import NS_PER_MINUTE, TimeSeries
+from .timeseries_readers import (
+    ARROW_IPC_EXTENSIONS,
+    parse_timeseries_columns,
+    read_arrow_file,
+    read_csv_in_chunks,
+    read_xlsx_rows,
+)
+from .uploads import open_upload
 
 
-def parse_timeseries_data(file: UploadFile, file_path: str) -> DataFrame:
-    """Read a CSV or Excel file and process datetime columns based on a simplified set of rules.
+def parse_timeseries_data(file: BinaryIO, file_path: str) -> TimeSeries:
+    """Read a CSV, Excel, Parquet or Arrow IPC file and process datetime columns based on a simplified set of rules.
 
     Args:
-        file (UploadFile): The uploaded file object (.csv or .xlsx).
-        file_path (str): The path to the input file (.csv or .xlsx).
+        file (BinaryIO): The uploaded file object (.csv, .xlsx, .parquet, .arrow, .feather or .ipc).
+        file_path (str): The path to the input file, only its extension is used.
 
     Returns:
-        pd.DataFrame: The processed DataFrame with a single 'datetime' column,
-        or None if an error occurs.
+        TimeSeries: The sorted series, without missing values nor duplicated timestamps.
 
     Raises:
         TypeError: If the file format is not supported.
-        ValueError: If the column count is invalid or a column cannot be converted to datetime.
     """
+    if file_path.endswith(".csv") and config.CSV_CHUNK_ROWS > 0:
+        series = read_csv_in_chunks(file=file, chunk_rows=config.CSV_CHUNK_ROWS)
+        logger.info("👻 Data has been streamed in chunks and minimal processed has been added")
+        return series
+
+    if file_path.endswith(".xlsx"):
+        series = read_xlsx_rows(file=file)
+        logger.info("👻 Data has been streamed from the first sheet and minimal processed has been added")
+        return series
+
+    file_format = file_path.rsplit(".", maxsplit=1)[-1]
+    if file_format == "parquet" or file_format in ARROW_IPC_EXTENSIONS:
+        series = read_arrow_file(file=file, file_format=file_format)
+        logger.info("👻 Data has been read from its columnar format and minimal processed has been added")
+        return series
+
     if file_path.endswith(".csv"):
         df = pd.read_csv(file)
-    elif file_path.endswith(".xlsx"):
-        df = pd.read_excel(file)
     else:
-        err_msg = f"Unsupported file format -> {file_path}. Please provide a .csv or .xlsx file."
+        err_msg = f"Unsupported file format -> {file_path}. Please provide a .csv, .xlsx, .parquet or Arrow IPC file."
         raise TypeError(err_msg)
 
-    num_columns = df.shape[1]
-    df = df.dropna(axis=0, how="any")
-
-    # NOTE: Handle date and time columns
-    if num_columns == 3:
-        date_col, time_col, _ = df.columns
-
-        try:
-            pd.to_datetime(df[date_col].iloc[0])
-        except (pd.errors.ParserError, ValueError, TypeError) as err:
-            err_msg = f"Error: The first column {time_col} is not a date"
-            raise ValueError(err_msg) from err
-
-        df["datetime"] = pd.to_datetime(df[date_col].astype(str) + " " + df[time_col].astype(str))
-        df = df.drop(columns=[date_col, time_col])
-    elif num_columns == 2:
-        datetime_col, _ = df.columns
-
-        df["datetime"] = pd.to_datetime(df[datetime_col])
-        df = df.drop(columns=[datetime_col])
-    else:
-        err_msg = f"Invalid file format, file should only have 2 or 3 columns, current: {num_columns}"
-        raise ValueError(err_msg)
-
-    # Renaming energy column name
-    old_energy_name = df.columns[0]
-    df = df.rename(columns={old_energy_name: "energy"})
-    df = df.sort_values(by="datetime", ascending=True)
-    df = df.drop_duplicates(subset=["datetime"], keep="first")
+    series = parse_timeseries_columns(df=df)
     logger.info("👻 Data has been extracted and minimal processed has been added")
-    return df[["datetime", "energy"]]
+    return series
 
 
-def check_minimum_data_to_process(df: DataFrame, freq: float) -> bool:
-    """Check if the DataFrame contains at least one year of data.
+def check_minimum_data_to_process(series: TimeSeries, freq: float) -> bool:
+    """Check if the series contains at least one year of data.
 
     Parameters
     ----------
-    df : DataFrame
-        The DataFrame containing a 'datetime' column.
+    series : TimeSeries
+        The parsed series.
     freq : float
         The frequency in minutes between data points.
 
@@ -82,35 +86,32 @@ def check_minimum_data_to_process(df: DataFrame, freq: float) -> bool:
     bool
         True if the maximum timestamp is at least one year after the minimum timestamp, False otherwise.
     """
-    max_timestamp: pd.Timestamp = df["datetime"].max()
-    min_timestamp: pd.Timestamp = df["datetime"].min()
+    max_timestamp = pd.Timestamp(series.end)
+    min_timestamp = pd.Timestamp(series.start)
     next_year = min_timestamp + relativedelta(months=4) - relativedelta(minutes=freq)
 
     return max_timestamp >= next_year
 
 
-def check_frequency(df: DataFrame) -> dict[str, Timedelta | float]:
-    """Determine the most frequent time interval (in minutes) between consecutive 'datetime' entries in the DataFrame.
+def check_frequency(series: TimeSeries) -> dict[str, Timedelta | float]:
+    """Determine the most frequent time interval (in minutes) between consecutive timestamps of the series.
 
     Parameters
     ----------
-    df : DataFrame
-        The DataFrame containing a 'datetime' column.
+    series : TimeSeries
+        The parsed series.
 
     Returns
     -------
-    float or None
-        The most frequent interval in minutes if it matches one of {5, 15, 30, 60}, otherwise None.
+    dict[str, Timedelta | float]
+        The most frequent interval as a Timedelta ("freq_time") and in minutes ("freq").
 
     Raises
     ------
     ValueError
         If the frequency is not one of the supported values {5, 15, 30, 60}.
     """
-    time_diffs = df["datetime"].diff()
-
-    # Find the most frequent difference
-    most_frequent_time: Timedelta = time_diffs.mode()[0]
+    most_frequent_time = Timedelta(series.most_frequent_step(), unit="ns")
     frequency_in_minutes: float = most_frequent_time.total_seconds() / 60
 
     if frequency_in_minutes not in {5, 15, 30, 60}:
@@ -120,99 +121,293 @@ def check_frequency(df: DataFrame) -> dict[str, Timedelta | float]:
     return {"freq_time": most_frequent_time, "freq": frequency_in_minutes}
 
 
-def resampling_5min_freq_to_15min_req(df: DataFrame) -> DataFrame:
-    """Resample a DataFrame from 5-minute frequency to 15-minute frequency by averaging.
+def resampling_5min_freq_to_15min_req(series: TimeSeries) -> TimeSeries:
+    """Resample a series from 5-minute frequency to 15-minute frequency by averaging.
 
     Parameters
     ----------
-    df : DataFrame
-        The DataFrame to be resampled.
+    series : TimeSeries
+        The series to be resampled.
 
     Returns
     -------
-    DataFrame
-        The resampled DataFrame with 15-minute frequency.
+    TimeSeries
+        The resampled series with 15-minute frequency.
     """
-    return df.resample("15min").mean()
+    return series.resample_mean(step=15 * NS_PER_MINUTE)
 
 
-def resampling_data_based_on_freq(df: DataFrame, td: Timedelta | str) -> DataFrame:
-    """Resample the DataFrame based on the given time frequency.
+def resampling_data_based_on_freq(series: TimeSeries, td: Timedelta | str) -> TimeSeries:
+    """Resample the series based on the given time frequency.
 
     Parameters
     ----------
-    df : DataFrame
-        The DataFrame containing a 'datetime' column.
+    series : TimeSeries
+        The series to be resampled.
     td : Timedelta | str
         The time frequency to resample the data.
 
     Returns
     -------
-    DataFrame
-        The resampled DataFrame with a 'time' column.
+    TimeSeries
+        The regular series, timestamps without data are missing.
     """
-    return df.resample(td).asfreq()
+    return series.asfreq(step=Timedelta(td).value)
 
 
-def process_timeseries_data_at_different_freq(file: UploadFile, file_extension: str) -> DataFrame:
+def process_timeseries_data_at_different_freq(
+    file: BinaryIO,
+    file_extension: str,
+    on_stage: Callable[[str], None] | None = None,
+    engine: str = config.IMPUTATION_ENGINE,
+) -> TimeSeries:
     """Process timeseries data at different frequencies, filling gaps and resampling as needed.
 
     Parameters
     ----------
-    file : UploadFile
-        The uploaded file object (.csv or .xlsx).
+    file : BinaryIO
+        The uploaded file object.
     file_extension : str
         The file extension indicating the type of file.
+    on_stage : Callable[[str], None], optional
+        Called with the name of each pipeline stage when it starts.
+    engine : str, optional
+        Name of the imputation engine used for long gaps.
+
+    Returns
+    -------
+    TimeSeries
+        The processed series resampled to the required frequency.
+    """
+    if on_stage is not None:
+        on_stage("parsing")
+
+    with stage_timer("parsing"):
+        series = parse_timeseries_data(file=file, file_path=f".{file_extension}")
+
+    return process_parsed_timeseries(series=series, on_stage=on_stage, engine=engine)
+
+
+def process_parsed_timeseries(
+    series: TimeSeries,
+    on_stage: Callable[[str], None] | None = None,
+    engine: str = config.IMPUTATION_ENGINE,
+) -> TimeSeries:
+    """Check the frequency of a parsed series, fill its gaps and resample it to 15 minutes.
+
+    Parameters
+    ----------
+    series : TimeSeries
+        The parsed series.
+    on_stage : Callable[[str], None], optional
+        Called with the name of each pipeline stage when it starts.
+    engine : str, optional
+        Name of the imputation engine used for long gaps.
 
     Returns
     -------
-    DataFrame
-        The processed DataFrame resampled to the required frequency.
+    TimeSeries
+        The processed series resampled to the required frequency.
 
     Raises
     ------
     BadRequestError
         If the timeseries data is too short to process.
     """
-    parsed_df = parse_timeseries_data(file=file, file_path=f".{file_extension}")
+    if on_stage is not None:
+        on_stage("resampling")
+
+    with stage_timer("resampling"):
+        freq = check_frequency(series=series)
+        has_min_data = check_minimum_data_to_process(series=series, freq=freq["freq"])
 
-    freq = check_frequency(df=parsed_df)
-    has_min_data = check_minimum_data_to_process(df=parsed_df, freq=freq["freq"])
+        if not has_min_data:
+            err_msg = "Timeseries data is to short, needs more data to process"
+            raise BadRequestError(err_msg)
 
-    if not has_min_data:
-        err_msg = "Timeseries data is to short, needs more data to process"
-        raise BadRequestError(err_msg)
+        resampled_series = resampling_data_based_on_freq(series=series, td=freq["freq_time"])
+    del series
 
-    pre_process_df = parsed_df.set_index("datetime")
-    df_resampled = resampling_data_based_on_freq(df=pre_process_df, td=freq["freq_time"])
-    new_df = predict_gaps_on_timeseries_data(df=df_resampled, target_column="energy")
+    filled_series = predict_gaps_on_timeseries_data(series=resampled_series, on_stage=on_stage, engine=engine)
     if freq["freq"] == 15:
-        return new_df.reset_index()
+        return filled_series
 
     if freq["freq"] == 5:
         # NOTE: need to do a resampling by averaging
-        df = resampling_5min_freq_to_15min_req(df=new_df)
-        return df.reset_index()
+        return resampling_5min_freq_to_15min_req(series=filled_series)
 
-    default_resample = resampling_data_based_on_freq(df=new_df, td="15min")
-    df = default_resample.interpolate(method="linear")
-    return df.reset_index()
+    default_resample = resampling_data_based_on_freq(series=filled_series, td="15min")
+    return default_resample.interpolate()
 
 
-async def store_timeseries_data(df: DataFrame, engine: AsyncEngine) -> None:
-    """Store timeseries data in the database.
+def process_timeseries_file(
+    file_path: str,
+    file_extension: str,
+    on_stage: Callable[[str], None] | None = None,
+    engine: str = config.IMPUTATION_ENGINE,
+) -> TimeSeries:
+    """Process a timeseries file stored on disk, entry point used by the pipeline process pool.
+
+    gzip and zstd compressed uploads are decompressed while they are parsed.
 
     Parameters
     ----------
-    df : DataFrame
-        The DataFrame containing timeseries data with a 'datetime' column.
+    file_path : str
+        Path of the spooled upload.
+    file_extension : str
+        The file extension indicating the type of file.
+    on_stage : Callable[[str], None], optional
+        Called with the name of each pipeline stage when it starts.
+    engine : str, optional
+        Name of the imputation engine used for long gaps.
+
+    Returns
+    -------
+    TimeSeries
+        The processed series resampled to the required frequency.
     """
-    df = df.rename(columns={"datetime": "timestamp"})
-    async with engine.begin() as conn:
-        await conn.run_sync(
-            lambda sync_conn: df.to_sql(name="energy", con=sync_conn, if_exists="append", index=False, chunksize=5000)
+    with open_upload(file_path=file_path, file_extension=file_extension) as file:
+        return process_timeseries_data_at_different_freq(
+            file=file,
+            file_extension=file_extension,
+            on_stage=on_stage,
+            engine=engine,
         )
-    logger.info("Timeseries has been successfully stored")
+
+
+def measure_series_ids(series_id: str, measures: tuple[str, ...]) -> list[str]:
+    """Build the id every measure of a series is stored under, see `series_records`.
+
+    Parameters
+    ----------
+    series_id : str
+        Id of the series.
+    measures : tuple[str, ...]
+        Names of the measures, empty for a single measure series.
+
+    Returns
+    -------
+    list[str]
+        The stored series id of every measure.
+    """
+    return [
+        series_id,
+        *(f"{series_id}{config.MEASURE_SERIES_ID_SEPARATOR}{measure}" for measure in measures[1:]),
+    ]
+
+
+def series_records(series_id: str, series: TimeSeries) -> list[SeriesRecords]:
+    """Split a series into the records of every stored series.
+
+    The first measure of a multi-measure series is stored under its id, every other measure under the id followed by
+    `MEASURE_SERIES_ID_SEPARATOR` and the name of the measure, e.g. "meter-1:power".
+
+    Parameters
+    ----------
+    series_id : str
+        Id of the series.
+    series : TimeSeries
+        The processed series.
+
+    Returns
+    -------
+    list[SeriesRecords]
+        Points of every stored series, sharing the timestamps of the series.
+    """
+    if not series.measures:
+        return [SeriesRecords(series_id=series_id, timestamps=series.datetimes, energy=series.values)]
+
+    return [
+        SeriesRecords(series_id=measure_series_id, timestamps=series.datetimes, energy=column)
+        for measure_series_id, column in zip(
+            measure_series_ids(series_id=series_id, measures=series.measures),
+            series.columns.T,
+            strict=True,
+        )
+    ]
+
+
+async def store_timeseries_data(
+    series: TimeSeries,
+    engine: AsyncEngine,
+    series_id: str = config.DEFAULT_SERIES_ID,
+) -> None:
+    """Store timeseries data in the database, re uploading a series updates its points instead of duplicating them.
+
+    Every store is recorded once in the upload batches table, the points written only keep the id of their batch.
+    Cached results writing to a series whose points changed are stored again when reused, see `ResultCache`.
+
+    Parameters
+    ----------
+    series : TimeSeries
+        The processed series.
+    engine : AsyncEngine
+        The configured asynchronous database engine.
+    series_id : str, optional
+        Id of the series the data belongs to.
+    """
+    start_time = time.perf_counter()
+    with stage_timer("storing"):
+        records = series_records(series_id=series_id, series=series)
+        async with driver_transaction(engine=engine) as conn:
+            rows = await upsert_timeseries_batch(conn=conn, batch=records)
+
+    if rows and result_cache.enabled:
+        await asyncio.to_thread(result_cache.invalidate_series, [stored.series_id for stored in records])
+    record_metric(Metric.ROWS_INGESTED, rows)
+    elapsed = time.perf_counter() - start_time
+    total_rows = series.columns.size
+    logger.info(
+        "Timeseries %s has been successfully stored, %s of %s rows written in %.3f s (%.0f rows/s)",
+        series_id,
+        rows,
+        total_rows,
+        elapsed,
+        total_rows / elapsed if elapsed else float("inf"),
+    )
+
+
+async def store_timeseries_batch(batch: Mapping[str, TimeSeries], engine: AsyncEngine) -> int:
+    """Store many series in a single transaction, either all of them are stored or none.
+
+    The whole batch is recorded as a single upload batch, see `store_timeseries_data`.
+
+    Parameters
+    ----------
+    batch : Mapping[str, TimeSeries]
+        The processed series by series id.
+    engine : AsyncEngine
+        The configured asynchronous database engine.
+
+    Returns
+    -------
+    int
+        Number of rows inserted or updated.
+    """
+    start_time = time.perf_counter()
+    with stage_timer("storing"):
+        records = [
+            stored
+            for series_id, series in batch.items()
+            for stored in series_records(series_id=series_id, series=series)
+        ]
+        async with driver_transaction(engine=engine) as conn:
+            rows = await upsert_timeseries_batch(conn=conn, batch=records)
+
+    if rows and result_cache.enabled:
+        await asyncio.to_thread(result_cache.invalidate_series, [stored.series_id for stored in records])
+    record_metric(Metric.ROWS_INGESTED, rows)
+    elapsed = time.perf_counter() - start_time
+    total_rows = sum(series.columns.size for series in batch.values())
+    logger.info(
+        "Batch of %s series has been successfully stored, %s of %s rows written in %.3f s (%.0f rows/s)",
+        len(batch),
+        rows,
+        total_rows,
+        elapsed,
+        total_rows / elapsed if elapsed else float("inf"),
+    )
+    return rows
 
 
 def plotting_data(df: DataFrame, time_col_name: str, show: bool = True) -> None:
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import pickle  # noqa: S403
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+from pandas import DataFrame, Series
+from sklearn.tree._tree import NODE_DTYPE, Tree  # noqa: PLC2701
+
+from app.adapters import logger
+from app.config import config
+
+MODEL_FILE_SUFFIX = ".joblib"
+
+
+def estimate_model_size(model: Any, seen: set[int] | None = None) -> int:  # noqa: ANN401
+    """Estimate the bytes a trained model takes from the arrays it holds, without serializing it.
+
+    Args:
+        model (Any): The trained model, or any object reachable from it.
+        seen (set[int] | None): Ids of the objects already counted.
+
+    Returns:
+        int: Bytes of the arrays and trees reachable from the model.
+    """
+    seen = set() if seen is None else seen
+    if id(model) in seen:
+        return 0
+
+    seen.add(id(model))
+    if isinstance(model, np.ndarray):
+        size = model.nbytes
+    elif isinstance(model, Tree):
+        # NOTE: sklearn trees keep their nodes and values in C arrays, `value` is a view over them
+        size = model.node_count * NODE_DTYPE.itemsize + model.value.nbytes
+    elif isinstance(model, (dict, list, tuple)) or hasattr(model, "__dict__"):
+        children = vars(model) if hasattr(model, "__dict__") else model
+        values = children.values() if isinstance(children, dict) else children
+        size = sum(estimate_model_size(value, seen) for value in values)
+    else:
+        size = 0
+
+    return int(size)
+
+
+class ModelCache:
+    """Cache of trained models keyed by a fingerprint of their training data and parameters.
+
+    Models are kept in an in-memory LRU bounded in bytes. When a directory is configured they are also stored there as
+    joblib artifacts, loaded back memory-mapped, so every pipeline process shares the models trained by the others.
+    """
+
+    def __init__(self, max_bytes: int, directory: str = "", max_disk_bytes: int = 0) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes (int): Max size of the models kept in memory, 0 disables the in-memory cache.
+            directory (str): Directory of the on-disk artifact store, empty disables it.
+            max_disk_bytes (int): Max size of the on-disk artifact store, 0 means unbounded.
+        """
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self._models: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._size = 0
+        # NOTE: the models of independent gap windows are fitted on threads sharing the cache
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(x_train: DataFrame, y_train: Series, params: dict[str, Any]) -> str:
+        """Build the key of a model from its training data and parameters.
+
+        Values are hashed as float32, so uploads that only differ by float noise share the same model.
+
+        Args:
+            x_train (DataFrame): Training features.
+            y_train (Series): Training target.
+            params (dict[str, Any]): Model class and parameters.
+
+        Returns:
+            str: Hex digest identifying the model.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        digest.update(json.dumps(list(x_train.columns)).encode())
+        digest.update(np.ascontiguousarray(x_train.to_numpy(dtype=np.float32)).tobytes())
+        digest.update(np.ascontiguousarray(y_train.to_numpy(dtype=np.float32)).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Any | None:  # noqa: ANN401
+        """Retrieve a model, from memory first and then from the on-disk store.
+
+        Args:
+            key (str): Model fingerprint.
+
+        Returns:
+            Any | None: The trained model or None if it is not cached.
+        """
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+
+        try:
+            model = joblib.load(path, mmap_mode="r")
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError) as err:
+            logger.warning("Discarding unreadable cached model %s: %s", path, err)
+            path.unlink(missing_ok=True)
+            return None
+
+        # NOTE: refresh the modification time, the on-disk store evicts the least recently used models first
+        path.touch()
+        self._remember(key, model, path.stat().st_size)
+        return model
+
+    def put(self, key: str, model: Any) -> None:  # noqa: ANN401
+        """Store a trained model.
+
+        Args:
+            key (str): Model fingerprint.
+            model (Any): The trained model.
+        """
+        path = self._path(key)
+        if path is None:
+            if self.max_bytes > 0:
+                self._remember(key, model, estimate_model_size(model))
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # NOTE: write to a temporary file first, other processes must never load a half written model
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp_file:
+            tmp_path = Path(tmp_file.name)
+
+        try:
+            joblib.dump(model, tmp_path)
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._remember(key, model, path.stat().st_size)
+        self._prune_disk()
+
+    def clear(self) -> None:
+        """Drop every model kept in memory."""
+        with self._lock:
+            self._models.clear()
+            self._size = 0
+
+    def _path(self, key: str) -> Path | None:
+        return None if self.directory is None else self.directory / f"{key}{MODEL_FILE_SUFFIX}"
+
+    def _remember(self, key: str, model: Any, size: int) -> None:  # noqa: ANN401
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._models:
+                self._size -= self._models.pop(key)[1]
+
+            self._models[key] = (model, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._models.popitem(last=False)
+                self._size -= evicted_size
+
+    def _prune_disk(self) -> None:
+        if self.directory is None or self.max_disk_bytes <= 0:
+            return
+
+        files = []
+        for entry in self.directory.glob(f"*{MODEL_FILE_SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # NOTE: removed by another process in the meantime
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, entry in sorted(files):
+            if total_size <= self.max_disk_bytes:
+                break
+
+            # NOTE: processes that already memory-mapped the model keep working with it on POSIX
+            entry.unlink(missing_ok=True)
+            total_size -= size
+
+
+model_cache = ModelCache(
+    max_bytes=config.MODEL_CACHE_MAX_BYTES,
+    directory=config.MODEL_CACHE_DIR,
+    max_disk_bytes=config.MODEL_CACHE_MAX_DISK_BYTES,
+)
@@ -0,0 +1,225 @@
+import hashlib
+import io
+import json
+import sqlite3
+import time
+from collections.abc import Collection, Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from app.adapters import logger
+from app.config import config
+
+from .timeseries import TimeSeries
+
+# NOTE: results are only a cache, a database with another layout is dropped instead of being migrated
+RESULTS_SCHEMA_VERSION = 2
+CREATE_RESULTS_TABLE = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    stored INTEGER NOT NULL,
+    series_ids TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class CachedResult(NamedTuple):
+    """Filled series of an upload and whether it has already been stored."""
+
+    series: TimeSeries
+    stored: bool
+
+
+class ResultCache:
+    """Cache of the filled series of uploads, keyed by a hash of their content and of the pipeline parameters.
+
+    Results live in a SQLite database so every API worker shares them. Entries expire `ttl` seconds after being
+    filled and the least recently used ones are evicted once the payloads exceed `max_bytes`. A result stays stored
+    until another upload changes the points of one of the series it stores, see `invalidate_series`.
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int) -> None:
+        """Initialize the cache, the database is created on first use.
+
+        Args:
+            path (str): Path of the SQLite database, empty disables the cache.
+            ttl (float): Seconds a result is reused after being filled.
+            max_bytes (int): Max size of the cached payloads, 0 means unbounded.
+        """
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._initialized = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a database is configured."""
+        return self.path is not None
+
+    @staticmethod
+    def fingerprint(content_digest: str, params: dict[str, Any]) -> str:
+        """Build the key of a result from the hash of the upload and the parameters of the pipeline.
+
+        Args:
+            content_digest (str): Hex digest of the uploaded bytes.
+            params (dict[str, Any]): Everything else changing the result, e.g. the series id and the engine.
+
+        Returns:
+            str: Hex digest identifying the result.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(content_digest.encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if self.path is None:
+            err_msg = "Result cache is disabled"
+            raise ValueError(err_msg)
+
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn, conn:
+            if not self._initialized:
+                # NOTE: WAL lets the workers read while another one writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                if conn.execute("PRAGMA user_version").fetchone()[0] != RESULTS_SCHEMA_VERSION:
+                    conn.execute("DROP TABLE IF EXISTS results")
+                    conn.execute(f"PRAGMA user_version = {RESULTS_SCHEMA_VERSION}")
+                conn.execute(CREATE_RESULTS_TABLE)
+                conn.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+                self._initialized = True
+
+            yield conn
+
+    def get(self, key: str) -> CachedResult | None:
+        """Retrieve a result that has not expired yet.
+
+        Args:
+            key (str): Result fingerprint.
+
+        Returns:
+            CachedResult | None: The cached result or None if it is not cached.
+        """
+        if self.path is None:
+            return None
+
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT stored, payload FROM results WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+
+        try:
+            series = _load_series(row[1])
+        except (OSError, ValueError, KeyError) as err:
+            logger.warning("Discarding unreadable cached result %s: %s", key, err)
+            self.discard(key)
+            return None
+
+        return CachedResult(series=series, stored=bool(row[0]))
+
+    def put(self, key: str, series: TimeSeries, series_ids: Collection[str], stored: bool) -> None:
+        """Store a result, evicting the expired and least recently used ones.
+
+        Args:
+            key (str): Result fingerprint.
+            series (TimeSeries): The filled series.
+            series_ids (Collection[str]): Ids of the stored series the filled series is written to.
+            stored (bool): Whether the series has already been stored.
+        """
+        if self.path is None:
+            return
+
+        payload = _dump_series(series)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, stored, series_ids, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, int(stored), json.dumps(sorted(series_ids)), payload, len(payload), now, now),
+            )
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+            if self.max_bytes > 0:
+                conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER "
+                    "(ORDER BY accessed_at DESC, key) AS total_size FROM results) WHERE total_size > ?)",
+                    (self.max_bytes,),
+                )
+
+    def mark_stored(self, key: str) -> None:
+        """Record that the series of a result has been stored.
+
+        Args:
+            key (str): Result fingerprint.
+        """
+        if self.path is None:
+            return
+
+        with self._connect() as conn:
+            conn.execute("UPDATE results SET stored = 1 WHERE key = ?", (key,))
+
+    def invalidate_series(self, series_ids: Collection[str]) -> None:
+        """Record that the stored points of some series have changed, results writing to them are stored again.
+
+        Args:
+            series_ids (Collection[str]): Ids of the stored series whose points changed.
+        """
+        if self.path is None or not series_ids:
+            return
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE results SET stored = 0 WHERE stored = 1 AND EXISTS (SELECT 1 FROM json_each(series_ids) "
+                "AS stored_series WHERE stored_series.value IN (SELECT value FROM json_each(?)))",
+                (json.dumps(list(series_ids)),),
+            )
+
+    def discard(self, key: str) -> None:
+        """Remove a result.
+
+        Args:
+            key (str): Result fingerprint.
+        """
+        if self.path is None:
+            return
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+
+def _dump_series(series: TimeSeries) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, epochs=series.epochs, values=series.values, measures=np.array(series.measures, dtype=str))
+    return buffer.getvalue()
+
+
+def _load_series(payload: bytes) -> TimeSeries:
+    with np.load(io.BytesIO(payload), allow_pickle=False) as arrays:
+        return TimeSeries(
+            epochs=arrays["epochs"],
+            values=arrays["values"],
+            regular=True,
+            measures=tuple(str(measure) for measure in arrays["measures"]),
+        )
+
+
+result_cache = ResultCache(
+    path=config.RESULT_CACHE_PATH,
+    ttl=config.RESULT_CACHE_TTL,
+    max_bytes=config.RESULT_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,181 @@
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.adapters import logger
+from app.adapters.db.models import TimeSeriesData
+from app.config import config
+
+# NOTE: every API worker applies the policies on startup, the lock makes them take turns
+STORAGE_POLICIES_LOCK_ID = 0x656E65726779
+ROWS_PER_MILLION = 1_000_000
+
+
+async def _is_hypertable(conn: AsyncConnection, table_name: str) -> bool:
+    if not await conn.scalar(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')")):
+        return False
+
+    return bool(
+        await conn.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = :name)"),
+            {"name": table_name},
+        ),
+    )
+
+
+async def _apply_compression_policy(conn: AsyncConnection, table_name: str) -> None:
+    await conn.execute(text("SELECT remove_compression_policy(:name, if_exists => TRUE)"), {"name": table_name})
+    if config.ENERGY_COMPRESS_AFTER_DAYS <= 0:
+        return
+
+    compression_enabled = await conn.scalar(
+        text("SELECT compression_enabled FROM timescaledb_information.hypertables WHERE hypertable_name = :name"),
+        {"name": table_name},
+    )
+    if not compression_enabled:
+        # NOTE: segments hold the points of a series in time order, the layout every read and upsert uses
+        await conn.execute(
+            text(
+                f"""
+                ALTER TABLE {table_name} SET (
+                    timescaledb.compress,
+                    timescaledb.compress_segmentby = 'series_id',
+                    timescaledb.compress_orderby = 'timestamp'
+                )
+                """,
+            ),
+        )
+
+    await conn.execute(
+        text("SELECT add_compression_policy(:name, compress_after => CAST(:days AS float8) * INTERVAL '1 day')"),
+        {"name": table_name, "days": config.ENERGY_COMPRESS_AFTER_DAYS},
+    )
+
+
+async def _apply_retention_policy(conn: AsyncConnection, table_name: str) -> None:
+    await conn.execute(text("SELECT remove_retention_policy(:name, if_exists => TRUE)"), {"name": table_name})
+    if config.ENERGY_RETENTION_DAYS <= 0:
+        return
+
+    await conn.execute(
+        text("SELECT add_retention_policy(:name, drop_after => CAST(:days AS float8) * INTERVAL '1 day')"),
+        {"name": table_name, "days": config.ENERGY_RETENTION_DAYS},
+    )
+
+
+async def apply_storage_policies(engine: AsyncEngine) -> bool:
+    """Bring the chunking, compression and retention of the energy hypertable in line with the configuration.
+
+    Policies are removed and added again on every call, so changing the configuration and restarting the service is
+    enough to change them. Chunks already compressed stay compressed when compression is disabled, and a new chunk
+    interval only applies to the chunks created from then on.
+
+    Parameters
+    ----------
+    engine : AsyncEngine
+        The configured asynchronous database engine.
+
+    Returns
+    -------
+    bool
+        Whether the policies were applied, False when energy is not a TimescaleDB hypertable.
+    """
+    table_name = TimeSeriesData.__tablename__
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": STORAGE_POLICIES_LOCK_ID})
+        if not await _is_hypertable(conn=conn, table_name=table_name):
+            logger.warning("%s is not a TimescaleDB hypertable, its storage policies are not applied", table_name)
+            return False
+
+        await conn.execute(
+            text("SELECT set_chunk_time_interval(:name, CAST(:hours AS double precision) * INTERVAL '1 hour')"),
+            {"name": table_name, "hours": config.ENERGY_CHUNK_INTERVAL_HOURS},
+        )
+        await _apply_compression_policy(conn=conn, table_name=table_name)
+        await _apply_retention_policy(conn=conn, table_name=table_name)
+
+    logger.info(
+        "Storage policies of %s applied, compression after %s days, retention %s days",
+        table_name,
+        config.ENERGY_COMPRESS_AFTER_DAYS or "disabled",
+        config.ENERGY_RETENTION_DAYS or "disabled",
+    )
+    return True
+
+
+def _per_million_rows(size: int, rows: int) -> int | None:
+    return round(size * ROWS_PER_MILLION / rows) if rows else None
+
+
+async def energy_storage_report(engine: AsyncEngine) -> dict[str, Any]:
+    """Measure the on-disk size of the energy table, before and after the compression of its chunks.
+
+    Row counts are estimated from the planner statistics, counting billions of rows would scan the whole table.
+
+    Parameters
+    ----------
+    engine : AsyncEngine
+        The configured asynchronous database engine.
+
+    Returns
+    -------
+    dict[str, Any]
+        Estimated rows, bytes on disk and bytes per million rows, and the size the compressed chunks had before
+        their compression.
+    """
+    table_name = TimeSeriesData.__tablename__
+    async with engine.connect() as conn:
+        if not await _is_hypertable(conn=conn, table_name=table_name):
+            rows, total_bytes = (
+                await conn.execute(
+                    text(
+                        "SELECT CAST(GREATEST(reltuples, 0) AS bigint), pg_total_relation_size(oid) "
+                        "FROM pg_class WHERE oid = CAST(:name AS regclass)",
+                    ),
+                    {"name": table_name},
+                )
+            ).one()
+            return {
+                "hypertable": False,
+                "rows": rows,
+                "bytes": total_bytes,
+                "bytes_per_million_rows": _per_million_rows(total_bytes, rows),
+            }
+
+        rows, total_bytes = (
+            await conn.execute(
+                text("SELECT approximate_row_count(CAST(:name AS regclass)), hypertable_size(CAST(:name AS regclass))"),
+                {"name": table_name},
+            )
+        ).one()
+        compression_stats = (
+            await conn.execute(
+                text(
+                    """
+                    SELECT
+                        coalesce(total_chunks, 0),
+                        coalesce(number_compressed_chunks, 0),
+                        coalesce(before_compression_total_bytes, 0),
+                        coalesce(after_compression_total_bytes, 0)
+                    FROM hypertable_compression_stats(CAST(:name AS regclass))
+                    """,
+                ),
+                {"name": table_name},
+            )
+        ).first()
+
+    total_chunks, compressed_chunks, before_bytes, after_bytes = compression_stats or (0, 0, 0, 0)
+    # NOTE: the uncompressed size is what the table would take if none of its chunks were compressed
+    uncompressed_bytes = total_bytes - after_bytes + before_bytes
+    return {
+        "hypertable": True,
+        "rows": rows,
+        "bytes": total_bytes,
+        "bytes_per_million_rows": _per_million_rows(total_bytes, rows),
+        "uncompressed_bytes": uncompressed_bytes,
+        "uncompressed_bytes_per_million_rows": _per_million_rows(uncompressed_bytes, rows),
+        "chunks": total_chunks,
+        "compressed_chunks": compressed_chunks,
+        "compression_ratio": round(before_bytes / after_bytes, 2) if after_bytes else None,
+    }
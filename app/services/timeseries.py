@@ -0,0 +1,227 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Self
+
+import numpy as np
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+NAT_EPOCH = np.iinfo(np.int64).min
+
+
+class TimeSeries:
+    """Compact timeseries passed through the whole pipeline instead of pandas DataFrames.
+
+    Points are kept sorted, without duplicated timestamps, as an int64 array of epoch nanoseconds and a float32 array
+    of values, NaN where a value is missing. Series measuring many quantities at the same timestamps hold one column
+    of values per name of `measures`. `regular` flags a series laid out on an evenly spaced grid, every
+    transformation returns a new series sharing as many arrays as possible with its source.
+    """
+
+    __slots__ = ("epochs", "measures", "regular", "values")
+
+    def __init__(
+        self,
+        epochs: np.ndarray,
+        values: np.ndarray,
+        regular: bool = False,
+        measures: tuple[str, ...] = (),
+    ) -> None:
+        """Initialize the series.
+
+        Args:
+            epochs (np.ndarray): Sorted int64 epoch nanoseconds, without duplicates.
+            values (np.ndarray): float32 value of every timestamp, one column per measure for multi-measure series.
+            regular (bool): Whether the timestamps are evenly spaced.
+            measures (tuple[str, ...]): Name of every column of values, empty for a single measure series.
+        """
+        self.epochs = epochs
+        self.values = values
+        self.regular = regular
+        self.measures = measures
+
+    @classmethod
+    def from_observations(cls, datetimes: np.ndarray, values: np.ndarray, measures: tuple[str, ...] = ()) -> Self:
+        """Build a series from raw observations.
+
+        Observations without a timestamp or without any value are dropped, the rest is sorted by time and only the
+        first observation of every duplicated timestamp is kept.
+
+        Args:
+            datetimes (np.ndarray): datetime64 timestamps, in any order.
+            values (np.ndarray): Numeric values, one column per measure for multi-measure series.
+            measures (tuple[str, ...]): Name of every column of values, empty for a single measure series.
+
+        Returns:
+            Self: The series.
+        """
+        epochs = np.asarray(datetimes, dtype="datetime64[ns]").view(np.int64)
+        values = np.asarray(values, dtype=np.float32)
+
+        valid = (epochs != NAT_EPOCH) & ~np.isnan(values).reshape(epochs.size, -1).all(axis=1)
+        order = np.argsort(epochs[valid], kind="stable")
+        epochs = epochs[valid][order]
+        values = values[valid][order]
+
+        first = np.ones(epochs.size, dtype=bool)
+        first[1:] = epochs[1:] != epochs[:-1]
+        return cls(epochs=epochs[first], values=values[first], measures=measures)
+
+    @classmethod
+    def concatenate(cls, chunks: Sequence["TimeSeries"]) -> Self:
+        """Put series one after the other, the caller makes sure the result is still sorted.
+
+        Args:
+            chunks (Sequence[TimeSeries]): The series to concatenate.
+
+        Returns:
+            Self: The concatenated series, empty when there is no series.
+        """
+        if not chunks:
+            return cls(epochs=np.empty(0, dtype=np.int64), values=np.empty(0, dtype=np.float32))
+
+        return cls(
+            epochs=np.concatenate([chunk.epochs for chunk in chunks]),
+            values=np.concatenate([chunk.values for chunk in chunks]),
+            measures=chunks[0].measures,
+        )
+
+    def __len__(self) -> int:
+        """Count the points of the series.
+
+        Returns:
+            int: Number of points.
+        """
+        return int(self.epochs.size)
+
+    @property
+    def datetimes(self) -> np.ndarray:
+        """datetime64[ns] view of the timestamps, without copying them."""
+        return self.epochs.view("datetime64[ns]")
+
+    @property
+    def start(self) -> datetime | None:
+        """First timestamp, None for an empty series."""
+        return self.datetimes[0].astype("datetime64[us]").item() if len(self) else None
+
+    @property
+    def end(self) -> datetime | None:
+        """Last timestamp, None for an empty series."""
+        return self.datetimes[-1].astype("datetime64[us]").item() if len(self) else None
+
+    @property
+    def missing(self) -> np.ndarray:
+        """Boolean mask, True where a value is missing, with the shape of the values."""
+        return np.isnan(self.values)
+
+    @property
+    def columns(self) -> np.ndarray:
+        """(points, measures) view of the values, a single column for a single measure series."""
+        return self.values.reshape(len(self), -1)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes taken by the arrays of the series."""
+        return self.epochs.nbytes + self.values.nbytes
+
+    def most_frequent_step(self) -> int:
+        """Most frequent interval between consecutive timestamps, the shortest one on ties.
+
+        Returns:
+            int: Interval in nanoseconds, 0 for series with less than two points.
+        """
+        if len(self) < 2:
+            return 0
+
+        steps, counts = np.unique(np.diff(self.epochs), return_counts=True)
+        return int(steps[np.argmax(counts)])
+
+    def with_values(self, values: np.ndarray) -> Self:
+        """Build a series with the same timestamps and other values.
+
+        Args:
+            values (np.ndarray): New value of every timestamp.
+
+        Returns:
+            Self: The series, sharing its timestamps with this one.
+        """
+        return type(self)(
+            epochs=self.epochs,
+            values=values.astype(np.float32, copy=False),
+            regular=self.regular,
+            measures=self.measures,
+        )
+
+    def _grid(self, step: int) -> tuple[int, int]:
+        # NOTE: like pandas resampling, the grid is anchored on the midnight of the first day
+        first_epoch = int(self.epochs[0])
+        origin = first_epoch - first_epoch % NS_PER_DAY
+        start = origin + (first_epoch - origin) // step * step
+        return start, (int(self.epochs[-1]) - start) // step + 1
+
+    def asfreq(self, step: int) -> Self:
+        """Lay the series out on an evenly spaced grid, grid timestamps without an observation are missing.
+
+        Args:
+            step (int): Interval of the grid in nanoseconds.
+
+        Returns:
+            Self: The regular series.
+        """
+        if not len(self):
+            return type(self)(epochs=self.epochs, values=self.values, regular=True, measures=self.measures)
+
+        start, size = self._grid(step)
+        positions, offsets = np.divmod(self.epochs - start, step)
+        on_grid = offsets == 0
+
+        values = np.full((size, *self.values.shape[1:]), np.nan, dtype=np.float32)
+        values[positions[on_grid]] = self.values[on_grid]
+        epochs = start + step * np.arange(size, dtype=np.int64)
+        return type(self)(epochs=epochs, values=values, regular=True, measures=self.measures)
+
+    def resample_mean(self, step: int) -> Self:
+        """Downsample the series to an evenly spaced grid, averaging the values falling into every interval.
+
+        Args:
+            step (int): Interval of the grid in nanoseconds.
+
+        Returns:
+            Self: The regular series, intervals without any value are missing.
+        """
+        if not len(self):
+            return type(self)(epochs=self.epochs, values=self.values, regular=True, measures=self.measures)
+
+        start, size = self._grid(step)
+        positions = (self.epochs - start) // step
+
+        values = np.full((size, *self.values.shape[1:]), np.nan, dtype=np.float32)
+        for column, resampled in zip(self.columns.T, values.reshape(size, -1).T, strict=True):
+            observed = ~np.isnan(column)
+            sums = np.bincount(positions[observed], weights=column[observed], minlength=size)
+            counts = np.bincount(positions[observed], minlength=size)
+            np.divide(sums, counts, out=resampled, where=counts > 0, casting="unsafe")
+
+        epochs = start + step * np.arange(size, dtype=np.int64)
+        return type(self)(epochs=epochs, values=values, regular=True, measures=self.measures)
+
+    def interpolate(self) -> Self:
+        """Fill the missing values by linear interpolation between the observed ones.
+
+        Returns:
+            Self: The series without missing values.
+        """
+        missing = self.missing
+        if not missing.any():
+            return self
+
+        values = self.values.copy()
+        columns_missing = missing.reshape(len(self), -1).T
+        for column, column_missing in zip(values.reshape(len(self), -1).T, columns_missing, strict=True):
+            if column_missing.all():
+                continue
+
+            observed = ~column_missing
+            column[column_missing] = np.interp(self.epochs[column_missing], self.epochs[observed], column[observed])
+
+        return self.with_values(values)
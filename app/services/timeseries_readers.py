@@ -0,0 +1,470 @@
+import itertools
+import re
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from pathlib import Path
+from types import NoneType
+from typing import BinaryIO
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+from pandas import DataFrame, Series
+
+from .datetime_parsing import combine_date_and_time_columns, parse_datetime_column
+from .timeseries import NAT_EPOCH, TimeSeries
+
+XLSX_INITIAL_ROWS = 64 * 1024
+# NOTE: rows are boxed in a block this size before every column of the block is converted at once
+XLSX_BLOCK_ROWS = 4096
+# NOTE: dtype kind of the column a cell value fits in, any other type only fits in an object column
+XLSX_CELL_KINDS: dict[type, str] = {datetime: "M", float: "f", int: "f"}
+# NOTE: missing cells become NaT, NaN or None
+XLSX_COLUMN_DTYPES = {"M": np.dtype("datetime64[ns]"), "f": np.dtype(np.float64), "O": np.dtype(object)}
+ARROW_IPC_EXTENSIONS = frozenset({"arrow", "feather", "ipc"})
+SERIES_ID_COLUMN = "series_id"
+PANDAS_INDEX_COLUMN = re.compile(r"__index_level_\d+__")
+
+
+def _series_from_columns(datetimes: np.ndarray, columns: Sequence[np.ndarray], names: Sequence[str]) -> TimeSeries:
+    if len(columns) == 1:
+        return TimeSeries.from_observations(datetimes=datetimes, values=columns[0])
+
+    return TimeSeries.from_observations(
+        datetimes=datetimes,
+        values=np.column_stack([np.asarray(column, dtype=np.float32) for column in columns]),
+        measures=tuple(names),
+    )
+
+
+def parse_timeseries_columns(df: DataFrame) -> TimeSeries:
+    """Build a series from the columns of an upload.
+
+    Uploads have either a datetime column, or a date and a time column, followed by one or many value columns, e.g.
+    energy, power and temperature. A non numeric second column tells a date and time upload apart.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The raw columns of the upload.
+
+    Returns
+    -------
+    TimeSeries
+        The sorted series, without missing values nor duplicated timestamps, with one measure per value column when
+        the upload has many of them.
+
+    Raises
+    ------
+    ValueError
+        If the column count is invalid or a column cannot be converted to datetime.
+    """
+    num_columns = df.shape[1]
+    has_time_column = num_columns >= 3 and not pd.api.types.is_numeric_dtype(df.iloc[:, 1])
+    num_time_columns = 2 if has_time_column else 1
+    if num_columns <= num_time_columns:
+        err_msg = (
+            f"Invalid file format, file should have a datetime and at least one value column, current: {num_columns}"
+        )
+        raise ValueError(err_msg)
+
+    time_columns = list(df.columns[:num_time_columns])
+    if df[time_columns].isna().to_numpy().any():
+        df = df.dropna(axis=0, how="any", subset=time_columns)
+
+    # NOTE: Handle date and time columns
+    layout = tuple(str(column) for column in df.columns)
+    if has_time_column:
+        date_col, time_col = time_columns
+        datetimes = combine_date_and_time_columns(dates=df[date_col], times=df[time_col], layout=layout)
+    else:
+        datetimes = parse_datetime_column(values=df[time_columns[0]], layout=layout)
+
+    value_columns = df.columns[num_time_columns:]
+    return _series_from_columns(
+        datetimes=datetimes,
+        columns=[df[column].to_numpy() for column in value_columns],
+        names=[str(column) for column in value_columns],
+    )
+
+
+def merge_series_chunks(chunks: Sequence[TimeSeries]) -> TimeSeries:
+    """Merge the series parsed from consecutive chunks of an upload.
+
+    A running max of the timestamps tells whether the chunks arrived in order, in which case they are simply
+    concatenated, otherwise the sorted chunks are merged.
+
+    Parameters
+    ----------
+    chunks : Sequence[TimeSeries]
+        The sorted series of every chunk, in the order of the upload.
+
+    Returns
+    -------
+    TimeSeries
+        The sorted series, without missing values nor duplicated timestamps.
+    """
+    chunks = [chunk for chunk in chunks if len(chunk)]
+    if not chunks:
+        return TimeSeries.concatenate(chunks)
+
+    latest_epoch = NAT_EPOCH
+    in_order = True
+    for chunk in chunks:
+        in_order = in_order and int(chunk.epochs[0]) > latest_epoch
+        latest_epoch = max(latest_epoch, int(chunk.epochs[-1]))
+
+    merged = TimeSeries.concatenate(chunks)
+    if in_order:
+        return merged
+
+    # NOTE: the stable sort merges the already sorted runs and keeps the first of every duplicated timestamp
+    return TimeSeries.from_observations(datetimes=merged.datetimes, values=merged.values, measures=merged.measures)
+
+
+def read_csv_in_chunks(file: BinaryIO, chunk_rows: int) -> TimeSeries:
+    """Stream a CSV upload chunk by chunk, only the compact arrays of the parsed chunks are kept in memory.
+
+    Every chunk is parsed and sorted on its own, then the chunks are merged, see `merge_series_chunks`.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The uploaded CSV file.
+    chunk_rows : int
+        Rows parsed at once, bounds the memory taken by the text of the file.
+
+    Returns
+    -------
+    TimeSeries
+        The sorted series, without missing values nor duplicated timestamps.
+    """
+    with pd.read_csv(file, chunksize=chunk_rows) as reader:
+        return merge_series_chunks([parse_timeseries_columns(df=chunk) for chunk in reader])
+
+
+def _as_object_column(column: np.ndarray) -> np.ndarray:
+    if column.dtype.kind == "M":
+        # NOTE: nanosecond datetimes turn into integers when boxed, microseconds turn into datetimes
+        return column.astype("datetime64[us]").astype(object)
+
+    return column.astype(object)
+
+
+def _store_xlsx_block(columns: list[np.ndarray | None], block: np.ndarray, first_row: int, capacity: int) -> None:
+    for index, cells in enumerate(block.T):
+        kinds = {XLSX_CELL_KINDS.get(cell_type, "O") for cell_type in set(map(type, cells)) - {NoneType}}
+        if not kinds:
+            continue
+
+        kind = kinds.pop() if len(kinds) == 1 else "O"
+        column = columns[index]
+        if column is None:
+            column = columns[index] = np.full(capacity, None, dtype=XLSX_COLUMN_DTYPES[kind])
+        elif kind != column.dtype.kind != "O":
+            column = columns[index] = _as_object_column(column)
+
+        column[first_row : first_row + len(cells)] = cells
+
+
+def read_xlsx_frame(file: BinaryIO) -> DataFrame:
+    """Stream the first sheet of an Excel upload with openpyxl read-only, values-only mode.
+
+    The workbook object model is never built: the rows of the first sheet are streamed in small blocks into an array
+    per column, preallocated from the dimension the sheet declares and grown when it is missing or wrong, and the
+    other sheets are never read. Columns are float64 or datetime64 after their first values, so numbers and
+    timestamps are only boxed within a block, a column holding a value of another type falls back to an object array.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The uploaded .xlsx file.
+
+    Returns
+    -------
+    DataFrame
+        The cells of the first sheet, named after its header row.
+
+    Raises
+    ------
+    ValueError
+        If the sheet is empty.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            err_msg = "Invalid file format, the first sheet is empty"
+            raise ValueError(err_msg)
+
+        # NOTE: sheets often declare a wider dimension than their data, trailing unnamed columns are dropped
+        num_columns = len(header)
+        while num_columns and header[num_columns - 1] is None:
+            num_columns -= 1
+
+        capacity = max(sheet.max_row or 0, XLSX_INITIAL_ROWS)
+        columns: list[np.ndarray | None] = [None] * num_columns
+        block = np.full((XLSX_BLOCK_ROWS, num_columns), None, dtype=object)
+        num_rows = block_rows = 0
+        for row in itertools.chain(rows, [None]):
+            if row is not None:
+                row_cells = row[:num_columns]
+                block[block_rows, : len(row_cells)] = row_cells
+                block_rows += 1
+                if block_rows < XLSX_BLOCK_ROWS:
+                    continue
+
+            if num_rows + block_rows > capacity:
+                capacity *= 2
+                columns = [
+                    None if column is None else np.concatenate((column, np.full_like(column, None)))
+                    for column in columns
+                ]
+
+            _store_xlsx_block(columns=columns, block=block[:block_rows], first_row=num_rows, capacity=capacity)
+            num_rows += block_rows
+            block_rows = 0
+            block.fill(None)
+    finally:
+        workbook.close()
+
+    frame = DataFrame(
+        dict(enumerate(np.full(num_rows, np.nan) if column is None else column[:num_rows] for column in columns)),
+        copy=False,
+    )
+    frame.columns = [str(name) for name in header[:num_columns]]
+    return frame
+
+
+def read_xlsx_rows(file: BinaryIO) -> TimeSeries:
+    """Read the series of an Excel upload, see `read_xlsx_frame`.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The uploaded .xlsx file.
+
+    Returns
+    -------
+    TimeSeries
+        The sorted series, without missing values nor duplicated timestamps.
+    """
+    return parse_timeseries_columns(df=read_xlsx_frame(file=file))
+
+
+def _arrow_source(file: BinaryIO) -> pa.NativeFile:
+    # NOTE: spooled uploads are real files, they are memory-mapped so columns are read without copying them
+    file_name = getattr(file, "name", None)
+    if isinstance(file_name, str) and Path(file_name).is_file():
+        return pa.memory_map(file_name, "r")
+
+    return pa.PythonFile(file, mode="r")
+
+
+def _arrow_datetimes(column: pa.ChunkedArray, name: str, layout: tuple[str, ...]) -> np.ndarray:
+    if pa.types.is_timestamp(column.type) or pa.types.is_date(column.type):
+        datetimes: np.ndarray = pc.cast(column, pa.timestamp("ns")).to_numpy()
+        return datetimes
+
+    return parse_datetime_column(values=Series(column.to_numpy(zero_copy_only=False), name=name), layout=layout)
+
+
+def parse_arrow_table(table: pa.Table) -> TimeSeries:
+    """Build a series straight from the columns of an Arrow table, typed columns skip any text parsing.
+
+    Tables have either a timestamp column, or a date and a time column, followed by one or many value columns, like
+    CSV uploads.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The columns of the upload.
+
+    Returns
+    -------
+    TimeSeries
+        The sorted series, without missing values nor duplicated timestamps.
+
+    Raises
+    ------
+    ValueError
+        If the column count is invalid or a column cannot be converted to datetime.
+    """
+    layout = tuple(table.column_names)
+    num_columns = table.num_columns
+    second_type = table.column(1).type if num_columns >= 2 else None
+    has_time_column = num_columns >= 3 and not (pa.types.is_integer(second_type) or pa.types.is_floating(second_type))
+    num_time_columns = 2 if has_time_column else 1
+    if num_columns <= num_time_columns:
+        err_msg = (
+            f"Invalid file format, file should have a datetime and at least one value column, current: {num_columns}"
+        )
+        raise ValueError(err_msg)
+
+    if has_time_column:
+        date_name, time_name = layout[:2]
+        dates, times = table.column(0), table.column(1)
+        if pa.types.is_time(times.type):
+            day_starts = _arrow_datetimes(dates, name=date_name, layout=layout).astype("datetime64[D]")
+            time_of_day = pc.cast(pc.cast(times, pa.time64("ns")), pa.int64()).to_numpy(zero_copy_only=False)
+            datetimes = day_starts.astype("datetime64[ns]") + time_of_day.astype("timedelta64[ns]")
+        else:
+            datetimes = combine_date_and_time_columns(
+                dates=Series(dates.to_numpy(zero_copy_only=False), name=date_name),
+                times=Series(times.to_numpy(zero_copy_only=False), name=time_name),
+                layout=layout,
+            )
+    else:
+        datetimes = _arrow_datetimes(table.column(0), name=layout[0], layout=layout)
+
+    return _series_from_columns(
+        datetimes=datetimes,
+        columns=[
+            pc.cast(column, pa.float32()).to_numpy(zero_copy_only=False) for column in table.columns[num_time_columns:]
+        ],
+        names=layout[num_time_columns:],
+    )
+
+
+def drop_pandas_index_columns(table: pa.Table) -> pa.Table:
+    """Drop the index pandas stores along with the columns of a frame that does not have a default index.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The columns of the upload.
+
+    Returns
+    -------
+    pa.Table
+        The table without the `__index_level_N__` columns and the columns listed as index in its pandas metadata.
+    """
+    pandas_metadata = table.schema.pandas_metadata or {}
+    # NOTE: a range index is only described in the metadata, it has no column
+    index_columns = {name for name in pandas_metadata.get("index_columns", []) if isinstance(name, str)}
+    dropped = [name for name in table.column_names if name in index_columns or PANDAS_INDEX_COLUMN.fullmatch(name)]
+    return table.drop_columns(dropped) if dropped else table
+
+
+def read_arrow_table(file: BinaryIO, file_format: str) -> pa.Table:
+    """Read a Parquet or Arrow IPC upload through memory-mapped, columnar access.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The uploaded file.
+    file_format : str
+        "parquet", or one of the Arrow IPC extensions ("arrow", "feather", "ipc").
+
+    Returns
+    -------
+    pa.Table
+        The columns of the upload, backed by the memory map when the upload is a file on disk, without the index of
+        the pandas frame it was written from, see `drop_pandas_index_columns`.
+    """
+    source = _arrow_source(file)
+    if file_format == "parquet":
+        return drop_pandas_index_columns(pq.read_table(source))
+
+    try:
+        table = pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        # NOTE: not the random access file format, read it as an IPC stream instead
+        source.seek(0)
+        table = pa.ipc.open_stream(source).read_all()
+
+    return drop_pandas_index_columns(table)
+
+
+def read_arrow_file(file: BinaryIO, file_format: str) -> TimeSeries:
+    """Read the series of a Parquet or Arrow IPC upload, see `read_arrow_table`.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The uploaded file.
+    file_format : str
+        "parquet", or one of the Arrow IPC extensions ("arrow", "feather", "ipc").
+
+    Returns
+    -------
+    TimeSeries
+        The sorted series, without missing values nor duplicated timestamps.
+    """
+    return parse_arrow_table(table=read_arrow_table(file=file, file_format=file_format))
+
+
+def split_long_format(df: DataFrame, default_series_id: str) -> dict[str, TimeSeries]:
+    """Split the columns of a batch upload into one series per id of its `series_id` column.
+
+    Uploads without a `series_id` column hold a single series, the default one.
+
+    Parameters
+    ----------
+    df : DataFrame
+        The raw columns of the upload, the other columns follow the layout of `parse_timeseries_columns`.
+    default_series_id : str
+        Id of the series of uploads without a `series_id` column.
+
+    Returns
+    -------
+    dict[str, TimeSeries]
+        The sorted series of every id.
+    """
+    if SERIES_ID_COLUMN not in df.columns:
+        return {default_series_id: parse_timeseries_columns(df=df)}
+
+    series_ids = df[SERIES_ID_COLUMN].astype(str)
+    groups = df.drop(columns=SERIES_ID_COLUMN).groupby(series_ids, sort=False)
+    return {str(series_id): parse_timeseries_columns(df=group) for series_id, group in groups}
+
+
+def read_batch_file(file: BinaryIO, file_format: str, default_series_id: str, chunk_rows: int) -> dict[str, TimeSeries]:
+    """Read a batch upload, a long format file holding one or many series told apart by a `series_id` column.
+
+    CSV files are streamed in chunks, every chunk is split by series and the chunks of every series are merged.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The uploaded file.
+    file_format : str
+        The file extension indicating the type of file.
+    default_series_id : str
+        Id of the series of uploads without a `series_id` column.
+    chunk_rows : int
+        Rows of a CSV upload parsed at once, 0 parses the whole file at once.
+
+    Returns
+    -------
+    dict[str, TimeSeries]
+        The sorted series of every id.
+
+    Raises
+    ------
+    TypeError
+        If the file format is not supported.
+    """
+    if file_format == "csv":
+        frames: Iterable[DataFrame] = pd.read_csv(file, chunksize=chunk_rows) if chunk_rows > 0 else [pd.read_csv(file)]
+    elif file_format == "xlsx":
+        frames = [read_xlsx_frame(file=file)]
+    elif file_format == "parquet" or file_format in ARROW_IPC_EXTENSIONS:
+        frames = [read_arrow_table(file=file, file_format=file_format).to_pandas()]
+    else:
+        err_msg = (
+            f"Unsupported file format -> .{file_format}. Please provide a .csv, .xlsx, .parquet or Arrow IPC file."
+        )
+        raise TypeError(err_msg)
+
+    chunks: dict[str, list[TimeSeries]] = {}
+    for frame in frames:
+        for series_id, series in split_long_format(df=frame, default_series_id=default_series_id).items():
+            chunks.setdefault(series_id, []).append(series)
+
+    return {series_id: merge_series_chunks(series_chunks) for series_id, series_chunks in chunks.items()}
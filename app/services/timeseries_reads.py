@@ -0,0 +1,380 @@
+import io
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from enum import StrEnum
+
+import numpy as np
+import pyarrow as pa
+from sqlalchemy import ColumnElement, Float, Select, TableClause, func, select, text, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters import logger
+from app.adapters.db.models import ENERGY_DAILY, ENERGY_HOURLY, ENERGY_MONTHLY, TimeSeriesData
+from app.config import config
+from app.connections import connections
+from app.server.errors import BadRequestError
+
+from .downsampling import LargestTriangleThreeBuckets
+
+
+class ReadAggregation(StrEnum):
+    """Buckets the stored points are aggregated to when read."""
+
+    RAW = "raw"
+    HOUR = "hour"
+    DAY = "day"
+    MONTH = "month"
+
+
+class ReadStatistic(StrEnum):
+    """SQL aggregate of the points falling into a bucket."""
+
+    SUM = "sum"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+
+
+class ReadFormat(StrEnum):
+    """Formats a read is streamed as."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+    ARROW = "arrow"
+
+
+READ_MEDIA_TYPES = {
+    ReadFormat.NDJSON: "application/x-ndjson",
+    ReadFormat.CSV: "text/csv",
+    ReadFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+# NOTE: from the finest to the coarsest, every rollup is an exact aggregate of the previous one
+ROLLUPS: dict[ReadAggregation, TableClause] = {
+    ReadAggregation.HOUR: ENERGY_HOURLY,
+    ReadAggregation.DAY: ENERGY_DAILY,
+    ReadAggregation.MONTH: ENERGY_MONTHLY,
+}
+ARROW_SCHEMA = pa.schema([("timestamp", pa.timestamp("ns")), ("energy", pa.float64())])
+
+# NOTE: the session of a dependency with yield is closed before a streaming response is sent, streams open their own
+db_session = asynccontextmanager(connections.get_db)
+
+
+def _naive_utc(moment: datetime | None) -> datetime | None:
+    if moment is None or moment.tzinfo is None:
+        return moment
+
+    return moment.astimezone(UTC).replace(tzinfo=None)
+
+
+def read_time_range(start: datetime | None, end: datetime | None) -> tuple[datetime | None, datetime | None]:
+    """Bring the bounds of a read to the naive UTC timestamps stored.
+
+    Parameters
+    ----------
+    start : datetime | None
+        First timestamp read, timestamps without a timezone are UTC.
+    end : datetime | None
+        Timestamps from this one on are not read.
+
+    Returns
+    -------
+    tuple[datetime | None, datetime | None]
+        The naive UTC bounds.
+
+    Raises
+    ------
+    BadRequestError
+        If the time range is empty.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start is not None and end is not None and start >= end:
+        err_msg = f"Start of the time range {start.isoformat()} should be before its end {end.isoformat()}"
+        raise BadRequestError(err_msg)
+
+    return start, end
+
+
+def _aligned(moment: datetime | None, granularity: ReadAggregation) -> bool:
+    if moment is None:
+        return True
+
+    aligned = moment.minute == moment.second == moment.microsecond == 0
+    if granularity in {ReadAggregation.DAY, ReadAggregation.MONTH}:
+        aligned &= moment.hour == 0
+    if granularity == ReadAggregation.MONTH:
+        aligned &= moment.day == 1
+
+    return aligned
+
+
+def pick_rollup(
+    aggregation: ReadAggregation,
+    start: datetime | None,
+    end: datetime | None,
+    available: set[ReadAggregation],
+) -> ReadAggregation | None:
+    """Pick the coarsest rollup answering an aggregated read exactly.
+
+    A rollup answers a read when its buckets are not coarser than the requested ones and the time range does not cut
+    any of them, e.g. a daily read from 06:00 is answered by the hourly rollup.
+
+    Parameters
+    ----------
+    aggregation : ReadAggregation
+        Buckets the points are aggregated to.
+    start : datetime | None
+        First timestamp read, naive UTC.
+    end : datetime | None
+        Timestamps from this one on are not read, naive UTC.
+    available : set[ReadAggregation]
+        Granularities of the rollups found in the DB.
+
+    Returns
+    -------
+    ReadAggregation | None
+        Granularity of the rollup, None if the read must aggregate the raw points.
+    """
+    if aggregation == ReadAggregation.RAW:
+        return None
+
+    granularities = list(ROLLUPS)
+    for granularity in reversed(granularities[: granularities.index(aggregation) + 1]):
+        if granularity in available and _aligned(start, granularity) and _aligned(end, granularity):
+            return granularity
+
+    return None
+
+
+async def available_rollups(session: AsyncSession) -> set[ReadAggregation]:
+    """Find the rollups of the energy table, they only exist when TimescaleDB is installed.
+
+    Parameters
+    ----------
+    session : AsyncSession
+        DB session.
+
+    Returns
+    -------
+    set[ReadAggregation]
+        Granularities of the rollups found.
+    """
+    if not config.READ_FROM_ROLLUPS:
+        return set()
+
+    names = await session.scalars(
+        text("SELECT name FROM unnest(CAST(:names AS text[])) AS name WHERE to_regclass(name) IS NOT NULL"),
+        {"names": [rollup.name for rollup in ROLLUPS.values()]},
+    )
+    found = set(names)
+    return {granularity for granularity, rollup in ROLLUPS.items() if rollup.name in found}
+
+
+def _rollup_statistic(rollup: TableClause, statistic: ReadStatistic) -> ColumnElement[float]:
+    if statistic == ReadStatistic.SUM:
+        return func.sum(rollup.c.energy_sum)
+    if statistic == ReadStatistic.MIN:
+        return func.min(rollup.c.energy_min)
+    if statistic == ReadStatistic.MAX:
+        return func.max(rollup.c.energy_max)
+
+    # NOTE: averages of averages are skewed by partial buckets, the rollups keep sums and counts instead
+    return type_coerce(func.sum(rollup.c.energy_sum) / func.sum(rollup.c.points), Float)
+
+
+def timeseries_read_query(  # noqa: PLR0913
+    *,
+    series_id: str,
+    start: datetime | None,
+    end: datetime | None,
+    aggregation: ReadAggregation,
+    statistic: ReadStatistic,
+    rollup: ReadAggregation | None = None,
+) -> Select[tuple[datetime, float]]:
+    """Build the query reading a series over a time range, aggregated in SQL.
+
+    Parameters
+    ----------
+    series_id : str
+        Id of the series.
+    start : datetime | None
+        First timestamp read, naive UTC, None reads from the first stored point.
+    end : datetime | None
+        Timestamps from this one on are not read, naive UTC, None reads up to the last stored point.
+    aggregation : ReadAggregation
+        Buckets the points are aggregated to, raw points are not aggregated.
+    statistic : ReadStatistic
+        Aggregate of the points of every bucket.
+    rollup : ReadAggregation | None
+        Granularity of the rollup aggregated instead of the raw points, see `pick_rollup`.
+
+    Returns
+    -------
+    Select[tuple[datetime, float]]
+        The (timestamp, energy) rows in time order.
+    """
+    if rollup is not None:
+        source = ROLLUPS[rollup]
+        bucket = func.date_trunc(aggregation.value, source.c.timestamp).label("timestamp")
+        conditions = [source.c.series_id == series_id]
+        if start is not None:
+            conditions.append(source.c.timestamp >= start)
+        if end is not None:
+            conditions.append(source.c.timestamp < end)
+
+        energy = _rollup_statistic(rollup=source, statistic=statistic).label("energy")
+        return select(bucket, energy).where(*conditions).group_by(bucket).order_by(bucket)
+
+    conditions = [TimeSeriesData.series_id == series_id]
+    if start is not None:
+        conditions.append(TimeSeriesData.timestamp >= start)
+    if end is not None:
+        conditions.append(TimeSeriesData.timestamp < end)
+
+    if aggregation == ReadAggregation.RAW:
+        return (
+            select(TimeSeriesData.timestamp, TimeSeriesData.energy)
+            .where(*conditions)
+            .order_by(TimeSeriesData.timestamp)
+        )
+
+    # NOTE: date_trunc buckets match time_bucket ones, and do not need the TimescaleDB extension
+    bucket = func.date_trunc(aggregation.value, TimeSeriesData.timestamp).label("timestamp")
+    energy = getattr(func, statistic.value)(TimeSeriesData.energy).label("energy")
+    return select(bucket, energy).where(*conditions).group_by(bucket).order_by(bucket)
+
+
+async def _read_batches(
+    session: AsyncSession,
+    query: Select[tuple[datetime, float]],
+) -> AsyncIterator[tuple[np.ndarray, np.ndarray]]:
+    result = await session.stream(query, execution_options={"yield_per": config.READ_BATCH_ROWS})
+    async for rows in result.partitions():
+        timestamps, energy = zip(*rows, strict=True)
+        yield np.array(timestamps, dtype="datetime64[ns]").view(np.int64), np.array(energy, dtype=np.float64)
+
+
+async def _downsample(
+    batches: AsyncIterator[tuple[np.ndarray, np.ndarray]],
+    total: int,
+    max_points: int,
+) -> AsyncIterator[tuple[np.ndarray, np.ndarray]]:
+    lttb = LargestTriangleThreeBuckets(total=total, threshold=max_points)
+    async for epochs, energy in batches:
+        yield lttb.push(epochs, energy)
+
+    yield lttb.finish()
+
+
+def _iso_timestamps(epochs: np.ndarray) -> list[str]:
+    timestamps: list[str] = np.datetime_as_string(epochs.view("datetime64[ns]"), unit="s").tolist()
+    return timestamps
+
+
+async def _encode_ndjson(batches: AsyncIterator[tuple[np.ndarray, np.ndarray]]) -> AsyncIterator[bytes]:
+    async for epochs, energy in batches:
+        if epochs.size:
+            lines = (
+                f'{{"timestamp":"{timestamp}","energy":{value!r}}}\n'
+                for timestamp, value in zip(_iso_timestamps(epochs), energy.tolist(), strict=True)
+            )
+            yield "".join(lines).encode()
+
+
+async def _encode_csv(batches: AsyncIterator[tuple[np.ndarray, np.ndarray]]) -> AsyncIterator[bytes]:
+    yield b"timestamp,energy\n"
+    async for epochs, energy in batches:
+        if epochs.size:
+            lines = (
+                f"{timestamp},{value!r}\n"
+                for timestamp, value in zip(_iso_timestamps(epochs), energy.tolist(), strict=True)
+            )
+            yield "".join(lines).encode()
+
+
+async def _encode_arrow(batches: AsyncIterator[tuple[np.ndarray, np.ndarray]]) -> AsyncIterator[bytes]:
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, ARROW_SCHEMA) as writer:
+        async for epochs, energy in batches:
+            if epochs.size:
+                writer.write_batch(
+                    pa.record_batch([pa.array(epochs.view("datetime64[ns]")), pa.array(energy)], schema=ARROW_SCHEMA),
+                )
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+
+    # NOTE: the schema and the end of stream marker are written even when no point is read
+    yield sink.getvalue()
+
+
+ENCODERS = {
+    ReadFormat.NDJSON: _encode_ndjson,
+    ReadFormat.CSV: _encode_csv,
+    ReadFormat.ARROW: _encode_arrow,
+}
+
+
+async def stream_timeseries(  # noqa: PLR0913
+    *,
+    series_id: str,
+    start: datetime | None,
+    end: datetime | None,
+    aggregation: ReadAggregation,
+    statistic: ReadStatistic,
+    max_points: int | None,
+    output_format: ReadFormat,
+) -> AsyncIterator[bytes]:
+    """Stream a stored series over a time range, read from a server-side cursor.
+
+    Only `READ_BATCH_ROWS` rows are fetched from the DB at once, so the API process never holds the whole read.
+    Aggregated reads are answered from the coarsest continuous aggregate that can, see `pick_rollup`. The LTTB
+    downsampling counts the rows first, both queries then read the same snapshot of the series.
+
+    Parameters
+    ----------
+    series_id : str
+        Id of the series.
+    start : datetime | None
+        First timestamp read, naive UTC, None reads from the first stored point.
+    end : datetime | None
+        Timestamps from this one on are not read, naive UTC, None reads up to the last stored point.
+    aggregation : ReadAggregation
+        Buckets the points are aggregated to in SQL, raw points are not aggregated.
+    statistic : ReadStatistic
+        Aggregate of the points of every bucket.
+    max_points : int | None
+        Number of points kept by the LTTB downsampling, None streams every row.
+    output_format : ReadFormat
+        Format of the stream.
+
+    Yields
+    ------
+    bytes
+        The next chunk of the encoded stream.
+    """
+    async with db_session() as session:
+        if max_points is not None:
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        available = await available_rollups(session=session) if aggregation != ReadAggregation.RAW else set()
+        rollup = pick_rollup(aggregation=aggregation, start=start, end=end, available=available)
+        logger.debug("Reading series %s aggregated by %s from the %s rollup", series_id, aggregation, rollup or "raw")
+        query = timeseries_read_query(
+            series_id=series_id,
+            start=start,
+            end=end,
+            aggregation=aggregation,
+            statistic=statistic,
+            rollup=rollup,
+        )
+
+        if max_points is None:
+            batches = _read_batches(session=session, query=query)
+        else:
+            total = await session.scalar(select(func.count()).select_from(query.subquery())) or 0
+            batches = _downsample(_read_batches(session=session, query=query), total=total, max_points=max_points)
+
+        async for chunk in ENCODERS[output_format](batches):
+            yield chunk
@@ -0,0 +1,100 @@
+import itertools
+
+import numpy as np
+
+from .gap_analysis import find_gap_runs
+
+
+def plan_training_windows(
+    hours: np.ndarray,
+    missing: np.ndarray,
+    observed: np.ndarray,
+    horizon: float,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Group the gaps of a series into independent clusters and pick the training rows around each of them.
+
+    Every gap gets a window of `horizon` hours on each side, gaps whose windows overlap share a single cluster.
+
+    Parameters
+    ----------
+    hours : np.ndarray
+        Sorted time of every row, in hours.
+    missing : np.ndarray
+        Boolean mask, True for the rows to predict.
+    observed : np.ndarray
+        Boolean mask, True for the rows the model can be trained on.
+    horizon : float
+        Hours of history taken on each side of a gap, 0 or less trains every cluster on the whole series.
+
+    Returns
+    -------
+    list[tuple[np.ndarray, np.ndarray]]
+        Positions of the training rows and of the rows to predict of every cluster.
+    """
+    observed_rows = np.flatnonzero(observed)
+    if horizon <= 0:
+        return [(observed_rows, np.flatnonzero(missing))]
+
+    starts, lengths = find_gap_runs(missing)
+    if starts.size == 0:
+        return []
+
+    window_starts = hours[starts] - horizon
+    window_ends = hours[starts + lengths - 1] + horizon
+
+    # NOTE: a new cluster begins where a window starts after every previous window has ended
+    new_cluster = np.ones(starts.size, dtype=bool)
+    new_cluster[1:] = window_starts[1:] > np.maximum.accumulate(window_ends)[:-1]
+    bounds = [*np.flatnonzero(new_cluster).tolist(), starts.size]
+    observed_hours = hours[observed_rows]
+
+    windows = []
+    for first, last in itertools.pairwise(bounds):
+        first_row, last_row = starts[first], starts[last - 1] + lengths[last - 1]
+        predict_rows = np.flatnonzero(missing[first_row:last_row]) + first_row
+
+        lower, upper = np.searchsorted(observed_hours, [window_starts[first], window_ends[first:last].max()])
+        train_rows = observed_rows[lower:upper]
+        # NOTE: a window without enough history around its gaps falls back to the whole series
+        if train_rows.size < predict_rows.size:
+            train_rows = observed_rows
+
+        windows.append((train_rows, predict_rows))
+
+    return windows
+
+
+def stratified_subsample(keys: np.ndarray, max_rows: int, seed: int = 42) -> np.ndarray:
+    """Pick `max_rows` positions keeping the share of every stratum.
+
+    Parameters
+    ----------
+    keys : np.ndarray
+        Non negative integer stratum of every row, e.g. day of the week and hour.
+    max_rows : int
+        Max number of positions returned, 0 or less keeps every row.
+    seed : int, optional
+        Seed of the random pick within every stratum.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted positions of the picked rows.
+    """
+    if max_rows <= 0 or keys.size <= max_rows:
+        return np.arange(keys.size)
+
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(keys.size), keys))
+    counts = np.bincount(keys)
+    # NOTE: largest remainder, quotas are rounded down and the rows left go to the largest fractional parts
+    shares = counts * (max_rows / keys.size)
+    quotas = np.floor(shares).astype(np.int64)
+    leftover = max_rows - int(quotas.sum())
+    quotas[np.argsort(quotas - shares, kind="stable")[:leftover]] += 1
+
+    # NOTE: rank of every row within its stratum, rows ranked under the quota of the stratum are kept
+    sorted_keys = keys[order]
+    stratum_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ranks = np.arange(keys.size) - stratum_starts[sorted_keys]
+    return np.sort(order[ranks < quotas[sorted_keys]])
@@ -0,0 +1,114 @@
+import gzip
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, cast
+
+import zstandard
+from fastapi import UploadFile
+
+from app.adapters import stage_timer
+from app.config import config
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+COMPRESSION_EXTENSIONS = {"gz": "gzip", "gzip": "gzip", "zst": "zstd", "zstd": "zstd"}
+COMPRESSION_MAGIC_BYTES = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+# NOTE: the other formats need random access, they can not be read while being decompressed
+STREAMABLE_FORMATS = frozenset({"csv"})
+
+
+async def spool_upload_to_disk(file: UploadFile, on_chunk: Callable[[bytes], None] | None = None) -> Path:
+    """Copy an uploaded file into a named temporary file so it can be handed over to another process.
+
+    The upload is copied in chunks, the file is never fully loaded in memory.
+
+    Args:
+        file (UploadFile): The uploaded file object.
+        on_chunk (Callable[[bytes], None] | None): Called with every chunk copied, e.g. to hash the upload on the fly.
+
+    Returns:
+        Path: Path of the temporary file, the caller is responsible for removing it.
+    """
+    suffix = Path(file.filename or "").suffix.lower()
+    directory = config.UPLOADS_DIR or None
+    if directory:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    with (
+        stage_timer("spooling"),
+        tempfile.NamedTemporaryFile(mode="wb", suffix=suffix, dir=directory, delete=False) as spooled_file,
+    ):
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            spooled_file.write(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+
+    return Path(spooled_file.name)
+
+
+def upload_file_format(file_name: str) -> tuple[str, str | None]:
+    """Split the name of an upload into its file format and its compression, e.g. "data.csv.gz" -> ("csv", "gzip").
+
+    Args:
+        file_name (str): Name of the uploaded file.
+
+    Returns:
+        tuple[str, str | None]: The lower cased file extension and the compression, None if the name has none.
+    """
+    extensions = [part.strip().lower() for part in file_name.split(".")[1:]]
+    if extensions and extensions[-1] in COMPRESSION_EXTENSIONS:
+        compression = COMPRESSION_EXTENSIONS[extensions.pop()]
+        return (extensions[-1] if extensions else ""), compression
+
+    return (extensions[-1] if extensions else ""), None
+
+
+def detect_compression(file: BinaryIO) -> str | None:
+    """Detect a gzip or zstd compressed file from its magic bytes, the read position is left untouched.
+
+    Args:
+        file (BinaryIO): A seekable file.
+
+    Returns:
+        str | None: "gzip", "zstd" or None when the file is not compressed.
+    """
+    position = file.tell()
+    head = file.read(max(len(magic) for magic in COMPRESSION_MAGIC_BYTES))
+    file.seek(position)
+    return next((name for magic, name in COMPRESSION_MAGIC_BYTES.items() if head.startswith(magic)), None)
+
+
+@contextmanager
+def open_upload(file_path: str, file_extension: str) -> Iterator[BinaryIO]:
+    """Open a spooled upload, transparently decompressing gzip and zstd files while they are read.
+
+    The decompressed content is streamed to the reader, it is never fully held in memory nor written to disk.
+
+    Args:
+        file_path (str): Path of the spooled upload.
+        file_extension (str): Format of the (decompressed) upload.
+
+    Yields:
+        BinaryIO: The readable upload.
+
+    Raises:
+        TypeError: If a compressed upload is not in a format that can be streamed.
+    """
+    with Path(file_path).open("rb") as file:
+        compression = detect_compression(file)
+        if compression is None:
+            yield file
+            return
+
+        if file_extension not in STREAMABLE_FORMATS:
+            err_msg = f"Compressed uploads are only supported for {', '.join(sorted(STREAMABLE_FORMATS))} files"
+            raise TypeError(err_msg)
+
+        if compression == "gzip":
+            with gzip.GzipFile(fileobj=file, mode="rb") as stream:
+                # NOTE: GzipFile reads like any binary file, typeshed only types it as a BufferedIOBase
+                yield cast("BinaryIO", stream)
+        else:
+            with zstandard.ZstdDecompressor().stream_reader(file) as stream:
+                yield stream
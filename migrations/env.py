@@ -8,7 +8,7 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 # ? Mandatory declare the models otherwise the metadata will not point to my schemas
-from app.adapters.db.models import BaseModel, TimeSeriesData
+from app.adapters.db.models import Base, GapFillerJob, TimeSeriesData, UploadBatch
 from app.config import config as app_config
 
 # this is the Alembic Config object, which provides
@@ -27,7 +27,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = BaseModel.metadata
+target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -0,0 +1,108 @@
+"""add-energy-continuous-aggregates
+
+Revision ID: 4f6b2e9d0c53
+Revises: e3a7c15f2d84
+Create Date: 2025-08-27 14:36:09.418760
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f6b2e9d0c53'
+down_revision: Union[str, Sequence[str], None] = 'e3a7c15f2d84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# NOTE: (view, bucket, source, refresh end offset, refresh schedule), every rollup is aggregated from the previous one
+ROLLUPS = (
+    ('energy_hourly', '1 hour', 'energy', '1 hour', '15 minutes'),
+    ('energy_daily', '1 day', 'energy_hourly', '1 day', '1 hour'),
+    ('energy_monthly', '1 month', 'energy_daily', '1 month', '1 day'),
+)
+
+
+def _is_hypertable() -> bool:
+    bind = op.get_bind()
+    if not bind.scalar(sa.text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')")):
+        return False
+
+    return bool(
+        bind.scalar(
+            sa.text("SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = 'energy')")
+        )
+    )
+
+
+def _rollup_select(bucket: str, source: str) -> str:
+    if source == 'energy':
+        return f"""
+            SELECT
+                series_id,
+                time_bucket(INTERVAL '{bucket}', timestamp) AS timestamp,
+                sum(energy) AS energy_sum,
+                min(energy) AS energy_min,
+                max(energy) AS energy_max,
+                count(*) AS points
+            FROM energy
+            WHERE deleted_at IS NULL
+            GROUP BY series_id, time_bucket(INTERVAL '{bucket}', timestamp)
+        """
+
+    return f"""
+        SELECT
+            series_id,
+            time_bucket(INTERVAL '{bucket}', timestamp) AS timestamp,
+            sum(energy_sum) AS energy_sum,
+            min(energy_min) AS energy_min,
+            max(energy_max) AS energy_max,
+            CAST(sum(points) AS bigint) AS points
+        FROM {source}
+        GROUP BY series_id, time_bucket(INTERVAL '{bucket}', timestamp)
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _is_hypertable():
+        logger.warning("energy is not a TimescaleDB hypertable, its continuous aggregates are not created")
+        return
+
+    with op.get_context().autocommit_block():
+        for view, bucket, source, end_offset, schedule in ROLLUPS:
+            # NOTE: real time aggregation answers from the raw rows until the policy has materialized them,
+            # WITH NO DATA leaves the initial materialization of the history to the first policy run
+            op.execute(
+                f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+                WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+                {_rollup_select(bucket=bucket, source=source)}
+                WITH NO DATA
+                """
+            )
+            # NOTE: without a start offset a refresh covers the whole history, re uploads of old points rewrite it
+            # and only the invalidated buckets are computed again
+            op.execute(
+                f"""
+                SELECT add_continuous_aggregate_policy(
+                    '{view}',
+                    start_offset => NULL,
+                    end_offset => INTERVAL '{end_offset}',
+                    schedule_interval => INTERVAL '{schedule}',
+                    if_not_exists => TRUE
+                )
+                """
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for view, *_ in reversed(ROLLUPS):
+            op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view}")
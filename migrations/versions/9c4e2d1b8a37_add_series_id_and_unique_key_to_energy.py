@@ -0,0 +1,49 @@
+"""add-series-id-and-unique-key-to-energy
+
+Revision ID: 9c4e2d1b8a37
+Revises: 5b1f3c9a7e21
+Create Date: 2025-08-22 10:41:07.228316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2d1b8a37'
+down_revision: Union[str, Sequence[str], None] = '5b1f3c9a7e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('energy', sa.Column('series_id', sa.String(length=255), server_default='default', nullable=False))
+    op.add_column(
+        'gap_filler_jobs',
+        sa.Column('series_id', sa.String(length=255), server_default='default', nullable=False),
+    )
+
+    # NOTE: re uploads appended full copies of the series, keep only the latest copy of every point
+    op.execute(
+        """
+        DELETE FROM energy AS old
+        USING energy AS new
+        WHERE old.series_id = new.series_id
+          AND old.timestamp = new.timestamp
+          AND old.id < new.id
+        """
+    )
+
+    op.drop_index(op.f('ix_energy_id'), table_name='energy')
+    op.create_unique_constraint('uq_energy_series_id_timestamp', 'energy', ['series_id', 'timestamp'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_energy_series_id_timestamp', 'energy', type_='unique')
+    op.create_index(op.f('ix_energy_id'), 'energy', ['id'], unique=False)
+    op.drop_column('gap_filler_jobs', 'series_id')
+    op.drop_column('energy', 'series_id')
@@ -0,0 +1,182 @@
+"""narrow-energy-rows-with-upload-batches
+
+Revision ID: b81d4c7e3a06
+Revises: 4f6b2e9d0c53
+Create Date: 2025-09-01 11:05:43.872215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d4c7e3a06'
+down_revision: Union[str, Sequence[str], None] = '4f6b2e9d0c53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# NOTE: same rollups as 4f6b2e9d0c53, they read columns of energy and are created again on top of the new table
+ROLLUPS = (
+    ('energy_hourly', '1 hour', 'energy', '1 hour', '15 minutes'),
+    ('energy_daily', '1 day', 'energy_hourly', '1 day', '1 hour'),
+    ('energy_monthly', '1 month', 'energy_daily', '1 month', '1 day'),
+)
+
+
+def _is_hypertable() -> bool:
+    bind = op.get_bind()
+    if not bind.scalar(sa.text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')")):
+        return False
+
+    return bool(
+        bind.scalar(
+            sa.text("SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = 'energy')")
+        )
+    )
+
+
+def _drop_rollups() -> None:
+    for view, *_ in reversed(ROLLUPS):
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view}")
+
+
+def _create_rollups(raw_filter: str) -> None:
+    with op.get_context().autocommit_block():
+        for view, bucket, source, end_offset, schedule in ROLLUPS:
+            if source == 'energy':
+                measures = "sum(energy) AS energy_sum, min(energy) AS energy_min, max(energy) AS energy_max, count(*) AS points"
+                where = raw_filter
+            else:
+                measures = (
+                    "sum(energy_sum) AS energy_sum, min(energy_min) AS energy_min, max(energy_max) AS energy_max, "
+                    "CAST(sum(points) AS bigint) AS points"
+                )
+                where = ""
+
+            op.execute(
+                f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+                WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+                SELECT series_id, time_bucket(INTERVAL '{bucket}', timestamp) AS timestamp, {measures}
+                FROM {source}
+                {where}
+                GROUP BY series_id, time_bucket(INTERVAL '{bucket}', timestamp)
+                WITH NO DATA
+                """
+            )
+            op.execute(
+                f"""
+                SELECT add_continuous_aggregate_policy(
+                    '{view}',
+                    start_offset => NULL,
+                    end_offset => INTERVAL '{end_offset}',
+                    schedule_interval => INTERVAL '{schedule}',
+                    if_not_exists => TRUE
+                )
+                """
+            )
+
+
+def _create_hypertable_like(table_name: str, source_name: str) -> None:
+    op.execute(
+        f"""
+        SELECT create_hypertable(
+            '{table_name}',
+            'timestamp',
+            chunk_time_interval => (
+                SELECT time_interval FROM timescaledb_information.dimensions
+                WHERE hypertable_name = '{source_name}' AND column_name = 'timestamp'
+            ),
+            create_default_indexes => FALSE
+        )
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('upload_batches',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('series_count', sa.Integer(), nullable=False),
+    sa.Column('points', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    hypertable = _is_hypertable()
+    _drop_rollups()
+    op.rename_table('energy', 'energy_wide')
+    op.execute("ALTER INDEX energy_pkey RENAME TO energy_wide_pkey")
+
+    op.create_table('energy',
+    sa.Column('series_id', sa.String(length=255), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('energy', sa.Float(), nullable=False),
+    sa.Column('batch_id', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('series_id', 'timestamp')
+    )
+    if hypertable:
+        _create_hypertable_like(table_name='energy', source_name='energy_wide')
+
+    # NOTE: the points already stored become a single legacy batch keeping their oldest and newest audit dates,
+    # soft deleted points were never read and are not moved
+    op.execute(
+        """
+        WITH legacy AS (
+            INSERT INTO upload_batches (series_count, points, created_at, updated_at)
+            SELECT count(DISTINCT series_id), count(*), min(created_at), max(updated_at)
+            FROM energy_wide
+            WHERE deleted_at IS NULL
+            HAVING count(*) > 0
+            RETURNING id
+        )
+        INSERT INTO energy (series_id, timestamp, energy, batch_id)
+        SELECT energy_wide.series_id, energy_wide.timestamp, energy_wide.energy, legacy.id
+        FROM energy_wide CROSS JOIN legacy
+        WHERE energy_wide.deleted_at IS NULL
+        """
+    )
+    op.drop_table('energy_wide')
+
+    if hypertable:
+        _create_rollups(raw_filter="")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    hypertable = _is_hypertable()
+    _drop_rollups()
+    op.rename_table('energy', 'energy_narrow')
+    op.execute("ALTER INDEX energy_pkey RENAME TO energy_narrow_pkey")
+
+    op.create_table('energy',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('energy', sa.Float(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.Column('series_id', sa.String(length=255), server_default='default', nullable=False),
+    sa.PrimaryKeyConstraint('id', 'timestamp'),
+    sa.UniqueConstraint('series_id', 'timestamp', name='uq_energy_series_id_timestamp')
+    )
+    if hypertable:
+        _create_hypertable_like(table_name='energy', source_name='energy_narrow')
+
+    op.execute(
+        """
+        INSERT INTO energy (series_id, timestamp, energy, created_at, updated_at)
+        SELECT energy_narrow.series_id, energy_narrow.timestamp, energy_narrow.energy,
+               upload_batches.created_at, upload_batches.updated_at
+        FROM energy_narrow JOIN upload_batches ON upload_batches.id = energy_narrow.batch_id
+        """
+    )
+    op.drop_table('energy_narrow')
+    op.drop_table('upload_batches')
+
+    if hypertable:
+        _create_rollups(raw_filter="WHERE deleted_at IS NULL")
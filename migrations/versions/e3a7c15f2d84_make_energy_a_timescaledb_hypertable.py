@@ -0,0 +1,88 @@
+"""make-energy-a-timescaledb-hypertable
+
+Revision ID: e3a7c15f2d84
+Revises: 9c4e2d1b8a37
+Create Date: 2025-08-25 09:17:52.640193
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import config
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c15f2d84'
+down_revision: Union[str, Sequence[str], None] = '9c4e2d1b8a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _timescaledb_available() -> bool:
+    return bool(
+        op.get_bind().scalar(sa.text("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb')"))
+    )
+
+
+def _is_hypertable() -> bool:
+    bind = op.get_bind()
+    if not bind.scalar(sa.text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')")):
+        return False
+
+    return bool(
+        bind.scalar(
+            sa.text("SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = 'energy')")
+        )
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTE: every unique key of a hypertable must hold the partitioning column,
+    # uq_energy_series_id_timestamp already does and is the composite index of the table
+    op.drop_constraint('energy_pkey', 'energy', type_='primary')
+    op.create_primary_key('energy_pkey', 'energy', ['id', 'timestamp'])
+
+    if not _timescaledb_available():
+        logger.warning("TimescaleDB is not installed, energy is kept as a plain table")
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+    # NOTE: reads always filter on series_id, the default timestamp index would only slow down writes,
+    # time ranges are pruned to their chunks before the composite index is used
+    op.get_bind().execute(
+        sa.text(
+            """
+            SELECT create_hypertable(
+                'energy',
+                'timestamp',
+                chunk_time_interval => CAST(:chunk_hours AS double precision) * INTERVAL '1 hour',
+                create_default_indexes => FALSE,
+                migrate_data => TRUE,
+                if_not_exists => TRUE
+            )
+            """
+        ),
+        {"chunk_hours": config.ENERGY_CHUNK_INTERVAL_HOURS},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_hypertable():
+        # NOTE: a hypertable cannot be turned back into a plain table, its rows are copied into a new one
+        op.execute("CREATE TABLE energy_plain (LIKE energy INCLUDING DEFAULTS)")
+        op.execute("INSERT INTO energy_plain SELECT * FROM energy")
+        op.execute("ALTER SEQUENCE energy_id_seq OWNED BY energy_plain.id")
+        op.drop_table('energy')
+        op.rename_table('energy_plain', 'energy')
+        op.create_unique_constraint('uq_energy_series_id_timestamp', 'energy', ['series_id', 'timestamp'])
+    else:
+        op.drop_constraint('energy_pkey', 'energy', type_='primary')
+
+    op.create_primary_key('energy_pkey', 'energy', ['id'])
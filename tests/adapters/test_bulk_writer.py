@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+
+import asyncpg
+import numpy as np
+import pytest
+
+from app.adapters.db.bulk_writer import SeriesRecords, driver_transaction, upsert_timeseries_batch
+from app.connections import connections
+
+
+async def _upsert(series_id: str, energy: np.ndarray) -> tuple[int, asyncpg.Record | None]:
+    timestamps = np.arange("2020-01-01", "2020-01-02", dtype="datetime64[h]").astype("datetime64[ns]")
+    async with driver_transaction(connections.engine) as conn:
+        rows = await upsert_timeseries_batch(
+            conn,
+            [SeriesRecords(series_id=series_id, timestamps=timestamps, energy=energy)],
+        )
+        batch = await conn.fetchrow(
+            "SELECT id, series_count, points FROM upload_batches WHERE id = (SELECT max(batch_id) FROM energy "
+            "WHERE series_id = $1)",
+            series_id,
+        )
+
+    return rows, batch
+
+
+async def _resend_series() -> None:
+    series_id = f"test-{uuid.uuid4().hex}"
+    energy = np.arange(24, dtype=np.float64)
+    try:
+        rows, first_batch = await _upsert(series_id=series_id, energy=energy)
+        assert rows == 24
+        assert first_batch is not None
+        assert (first_batch["series_count"], first_batch["points"]) == (1, 24)
+
+        rows, batch = await _upsert(series_id=series_id, energy=energy)
+        assert rows == 0
+        assert batch == first_batch
+
+        energy[3] = 99
+        rows, batch = await _upsert(series_id=series_id, energy=energy)
+        assert rows == 1
+        assert batch is not None
+        assert (batch["series_count"], batch["points"]) == (1, 1)
+    finally:
+        async with driver_transaction(connections.engine) as conn:
+            batch_ids = await conn.fetchval(
+                "SELECT array_agg(DISTINCT batch_id) FROM energy WHERE series_id = $1",
+                series_id,
+            )
+            await conn.execute("DELETE FROM energy WHERE series_id = $1", series_id)
+            await conn.execute("DELETE FROM upload_batches WHERE id = ANY($1::bigint[])", batch_ids or [])
+        await connections.engine.dispose()
+
+
+@pytest.mark.usefixtures("database")
+def test_unchanged_points_are_not_written_again() -> None:
+    asyncio.run(_resend_series())
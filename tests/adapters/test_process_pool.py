@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from app.adapters.process_pool import PipelineExecutor
+from app.server.errors import InternalServerError, ServiceUnavailableError
+
+
+async def _run_on_full_pool() -> None:
+    executor = PipelineExecutor(workers=1, max_queued=0, timeout=30)
+    executor.start()
+    try:
+        running = asyncio.create_task(executor.run(time.sleep, 1))
+        await asyncio.sleep(0)
+
+        assert executor.is_full
+        with pytest.raises(ServiceUnavailableError) as err:
+            await executor.run(time.sleep, 0)
+        assert err.value.status_code == 503
+
+        await running
+    finally:
+        executor.shutdown()
+
+
+async def _run_past_timeout() -> None:
+    executor = PipelineExecutor(workers=1, max_queued=0, timeout=0.2)
+    executor.start()
+    try:
+        with pytest.raises(InternalServerError) as err:
+            await executor.run(time.sleep, 2)
+        assert err.value.status_code == 504
+        # NOTE: the job is still running in its process, it keeps its slot until it finishes
+        assert executor.is_full
+    finally:
+        executor.shutdown()
+
+
+def test_full_pool_rejects_jobs_with_503() -> None:
+    asyncio.run(_run_on_full_pool())
+
+
+def test_job_past_its_timeout_fails_with_504() -> None:
+    asyncio.run(_run_past_timeout())
+
+
+def test_stopped_pool_rejects_jobs_with_503() -> None:
+    executor = PipelineExecutor(workers=1, max_queued=0, timeout=1)
+
+    with pytest.raises(ServiceUnavailableError) as err:
+        asyncio.run(executor.run(time.sleep, 0))
+    assert err.value.status_code == 503
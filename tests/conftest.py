@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.connections import connections
+
+
+async def _ping_database() -> None:
+    try:
+        async with connections.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        await connections.engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def database() -> None:
+    """Skip the tests needing the migrated database of `.env` when it can not be reached."""
+    try:
+        asyncio.run(_ping_database())
+    except (SQLAlchemyError, OSError) as err:
+        pytest.skip(f"Database is not reachable: {err}")
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from app.services import datetime_parsing
+from app.services.datetime_parsing import parse_datetime_column, resolve_day_month_order
+
+
+def test_day_first_values_outside_of_the_detection_sample_are_parsed_day_first() -> None:
+    values = pd.Series(["03/04/2024 10:00"] * 1000, name="datetime")
+    # NOTE: the only day above 12 is not part of the sample the format is detected on
+    values[1] = "25/04/2024 10:00"
+
+    timestamps = parse_datetime_column(values, layout="day-first")
+
+    assert timestamps[0] == np.datetime64("2024-04-03T10:00")
+    assert timestamps[1] == np.datetime64("2024-04-25T10:00")
+
+
+def test_month_first_is_kept_when_a_second_field_is_above_12() -> None:
+    values = pd.Series(["03/04/2024 10:00", "03/25/2024 10:00"], name="datetime")
+
+    timestamps = parse_datetime_column(values, layout="month-first")
+
+    assert timestamps[0] == np.datetime64("2024-03-04T10:00")
+
+
+def test_ambiguous_dates_keep_the_preferred_format() -> None:
+    values = np.array(["03/04/2024", "04/05/2024"], dtype=object)
+
+    assert resolve_day_month_order(values, date_format="%m/%d/%Y", warn=False) == "%m/%d/%Y"
+    assert resolve_day_month_order(values, date_format="%Y-%m-%d", warn=False) == "%Y-%m-%d"
+
+
+def test_failed_detection_is_not_cached() -> None:
+    layout = "failed-detection"
+    parse_datetime_column(pd.Series(["2024.01.03 10:00", "2024.01.04 10:00"], name="datetime"), layout=layout)
+
+    assert (layout, "datetime") not in datetime_parsing._detected_formats  # noqa: SLF001
+
+    timestamps = parse_datetime_column(pd.Series(["2024-01-05 10:00"], name="datetime"), layout=layout)
+
+    assert timestamps[0] == np.datetime64("2024-01-05T10:00")
+    assert datetime_parsing._detected_formats[layout, "datetime"] == "%Y-%m-%d %H:%M"  # noqa: SLF001
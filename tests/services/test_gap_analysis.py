@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.services.gap_analysis import fill_short_gaps, short_gaps_mask
+from app.services.timeseries import TimeSeries
+
+NAN = np.nan
+
+
+def _series(values: list[float]) -> TimeSeries:
+    epochs = np.arange(len(values), dtype=np.int64) * 900 * 10**9
+    return TimeSeries(epochs=epochs, values=np.array(values, dtype=np.float32), regular=True)
+
+
+def test_only_runs_up_to_max_gap_are_flagged() -> None:
+    missing = np.array([True, True, False, True, False, True, True, True])
+
+    np.testing.assert_array_equal(
+        short_gaps_mask(missing, max_gap=2),
+        [True, True, False, True, False, False, False, False],
+    )
+
+
+def test_gaps_at_the_start_and_end_take_the_nearest_value() -> None:
+    series = _series([NAN, NAN, 3, 4, 5, 6, NAN, NAN])
+
+    filled = fill_short_gaps(series, max_gap=2)
+
+    np.testing.assert_array_equal(filled.values, [3, 3, 3, 4, 5, 6, 6, 6])
+    assert filled.epochs is series.epochs
+
+
+def test_long_gaps_are_left_untouched() -> None:
+    filled = fill_short_gaps(_series([1, NAN, NAN, NAN, NAN, 6, NAN, 8]), max_gap=2)
+
+    np.testing.assert_array_equal(filled.values, [1, NAN, NAN, NAN, NAN, 6, 7, 8])
+
+
+def test_series_without_any_value_is_left_untouched() -> None:
+    filled = fill_short_gaps(_series([NAN] * 4), max_gap=4)
+
+    assert np.isnan(filled.values).all()
+
+
+def test_max_gap_of_zero_fills_nothing() -> None:
+    filled = fill_short_gaps(_series([1, NAN, 3]), max_gap=0)
+
+    np.testing.assert_array_equal(filled.values, [1, NAN, 3])
+
+
+def test_seasonal_naive_repeats_the_previous_season() -> None:
+    filled = fill_short_gaps(_series([1, 2, 3, 4, NAN, 6]), max_gap=1, method="seasonal_naive", season_length=3)
+
+    np.testing.assert_array_equal(filled.values, [1, 2, 3, 4, 2, 6])
+
+
+def test_measures_are_filled_on_their_own() -> None:
+    epochs = np.arange(4, dtype=np.int64) * 900 * 10**9
+    values = np.array([[1, NAN], [NAN, 10], [3, NAN], [4, 30]], dtype=np.float32)
+    series = TimeSeries(epochs=epochs, values=values, regular=True, measures=("active", "reactive"))
+
+    filled = fill_short_gaps(series, max_gap=1)
+
+    np.testing.assert_array_equal(filled.values, [[1, 10], [2, 10], [3, 20], [4, 30]])
+    assert filled.measures == ("active", "reactive")
@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.adapters.db.models import GapFillerJob, JobStatus
+from app.connections import connections
+from app.services import gap_filler_jobs
+
+
+class _BlockedPool:
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.started = asyncio.Event()
+
+    async def run(self, *_: object, **__: object) -> None:
+        self.started.set()
+        if self.error is not None:
+            raise self.error
+
+        await asyncio.Event().wait()
+
+
+@pytest.fixture
+def upload(tmp_path: Path) -> Path:
+    path = tmp_path / "upload.csv"
+    path.write_text("timestamp,energy\n")
+    return path
+
+
+@pytest.fixture
+def finish_job(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    finish = AsyncMock()
+    monkeypatch.setattr(gap_filler_jobs, "_finish_gap_filler_job", finish)
+    return finish
+
+
+async def _run_job(pool: _BlockedPool, upload: Path, cancel: bool) -> None:
+    task = asyncio.create_task(
+        gap_filler_jobs.run_gap_filler_job(
+            job_id="job",
+            series_id="series",
+            file_path=str(upload),
+            file_extension="csv",
+            engine="seasonal_profile",
+        ),
+    )
+    await pool.started.wait()
+    if cancel:
+        task.cancel()
+
+    await task
+
+
+def test_cancelled_job_keeps_its_upload(
+    monkeypatch: pytest.MonkeyPatch,
+    upload: Path,
+    finish_job: AsyncMock,
+) -> None:
+    pool = _BlockedPool()
+    monkeypatch.setattr(gap_filler_jobs, "pipeline_executor", pool)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(_run_job(pool, upload, cancel=True))
+
+    assert upload.exists()
+    finish_job.assert_not_awaited()
+
+
+def test_failed_job_deletes_its_upload_once_recorded(
+    monkeypatch: pytest.MonkeyPatch,
+    upload: Path,
+    finish_job: AsyncMock,
+) -> None:
+    pool = _BlockedPool(error=ValueError("Unreadable file"))
+    monkeypatch.setattr(gap_filler_jobs, "pipeline_executor", pool)
+
+    asyncio.run(_run_job(pool, upload, cancel=False))
+
+    assert not upload.exists()
+    finish_job.assert_awaited_once()
+    assert finish_job.await_args.kwargs["status"] == JobStatus.FAILED
+
+
+def _job(file_path: Path, worker_id: str | None, lease: timedelta | None) -> GapFillerJob:
+    return GapFillerJob(
+        id=uuid.uuid4().hex,
+        status=JobStatus.RUNNING,
+        file_name=file_path.name,
+        file_extension="csv",
+        file_path=str(file_path),
+        worker_id=worker_id,
+        lease_expires_at=None if lease is None else func.now() + lease,
+    )
+
+
+async def _resume_jobs(upload: Path, scheduled: list[str]) -> None:
+    jobs = [
+        _job(upload, worker_id="stopped-worker", lease=timedelta(seconds=-1)),
+        _job(upload, worker_id="live-worker", lease=timedelta(minutes=1)),
+        _job(upload.with_name("lost.csv"), worker_id=None, lease=None),
+    ]
+    expired, leased, lost = (job.id for job in jobs)
+
+    try:
+        async with connections.async_session() as session, session.begin():
+            session.add_all(jobs)
+
+        assert await gap_filler_jobs.resume_gap_filler_jobs() == 1
+        assert scheduled == [expired]
+
+        async with connections.async_session() as session:
+            query = select(GapFillerJob).where(GapFillerJob.id.in_([expired, leased, lost]))
+            stored = {job.id: job for job in await session.scalars(query)}
+
+        assert stored[expired].status == JobStatus.QUEUED
+        assert stored[expired].worker_id == gap_filler_jobs.WORKER_ID
+        assert stored[leased].status == JobStatus.RUNNING
+        assert stored[leased].worker_id == "live-worker"
+        assert stored[lost].status == JobStatus.FAILED
+    finally:
+        async with connections.async_session() as session, session.begin():
+            await session.execute(delete(GapFillerJob).where(GapFillerJob.id.in_([expired, leased, lost])))
+        await connections.engine.dispose()
+
+
+@pytest.mark.usefixtures("database")
+def test_only_jobs_with_an_expired_lease_are_resumed(monkeypatch: pytest.MonkeyPatch, upload: Path) -> None:
+    scheduled: list[str] = []
+    monkeypatch.setattr(gap_filler_jobs, "_schedule_gap_filler_job", lambda job: scheduled.append(job.id))
+
+    asyncio.run(_resume_jobs(upload, scheduled))
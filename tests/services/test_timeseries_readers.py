@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from app.services.timeseries_readers import read_arrow_file, read_batch_file
+
+
+@pytest.fixture
+def indexed_frame() -> pd.DataFrame:
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=4, freq="15min"),
+        "energy": [1.0, 2.0, 3.0, 4.0],
+    })
+    # NOTE: a filtered frame keeps a non-default index, pandas writes it as an `__index_level_0__` column
+    df.index = pd.Index([2990, 2995, 3000, 3005])
+    return df
+
+
+def _write(df: pd.DataFrame, path: Path) -> None:
+    if path.suffix == ".parquet":
+        df.to_parquet(path)
+        return
+
+    with pa.OSFile(str(path), "wb") as sink:
+        table = pa.Table.from_pandas(df)
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_pandas_index_is_not_read_as_a_measure(indexed_frame: pd.DataFrame, tmp_path: Path, file_format: str) -> None:
+    path = tmp_path / f"upload.{file_format}"
+    _write(indexed_frame, path)
+
+    with path.open("rb") as file:
+        series = read_arrow_file(file=file, file_format=file_format)
+
+    assert series.measures == ()
+    np.testing.assert_array_equal(series.values, [1.0, 2.0, 3.0, 4.0])
+
+
+def test_pandas_index_is_not_read_as_a_measure_of_a_batch(indexed_frame: pd.DataFrame, tmp_path: Path) -> None:
+    path = tmp_path / "upload.parquet"
+    indexed_frame.assign(series_id="meter-1").to_parquet(path)
+
+    with path.open("rb") as file:
+        batch = read_batch_file(file=file, file_format="parquet", default_series_id="default", chunk_rows=0)
+
+    assert list(batch) == ["meter-1"]
+    assert batch["meter-1"].measures == ()
@@ -0,0 +1,62 @@
+import numpy as np
+
+from app.services.training_windows import plan_training_windows, stratified_subsample
+
+HOURS = np.arange(48, dtype=np.float64)
+
+
+def _missing(*rows: int | slice) -> np.ndarray:
+    missing = np.zeros(HOURS.size, dtype=bool)
+    for row in rows:
+        missing[row] = True
+    return missing
+
+
+def test_series_without_gaps_has_no_window() -> None:
+    missing = _missing()
+
+    assert plan_training_windows(HOURS, missing, ~missing, horizon=2) == []
+
+
+def test_gaps_close_to_each_other_share_a_window() -> None:
+    missing = _missing(5, 8, 40)
+
+    windows = plan_training_windows(HOURS, missing, ~missing, horizon=2)
+
+    assert [(train.tolist(), predict.tolist()) for train, predict in windows] == [
+        ([3, 4, 6, 7, 9], [5, 8]),
+        ([38, 39, 41], [40]),
+    ]
+
+
+def test_window_smaller_than_its_gap_trains_on_the_whole_series() -> None:
+    missing = _missing(slice(10, 20))
+
+    ((train, predict),) = plan_training_windows(HOURS, missing, ~missing, horizon=2)
+
+    np.testing.assert_array_equal(train, np.flatnonzero(~missing))
+    np.testing.assert_array_equal(predict, np.arange(10, 20))
+
+
+def test_no_horizon_trains_every_gap_on_the_whole_series() -> None:
+    missing = _missing(0, 47)
+
+    ((train, predict),) = plan_training_windows(HOURS, missing, ~missing, horizon=0)
+
+    np.testing.assert_array_equal(train, np.arange(1, 47))
+    np.testing.assert_array_equal(predict, [0, 47])
+
+
+def test_stratified_subsample_stays_within_max_rows() -> None:
+    keys = np.arange(1000) % 7
+
+    rows = stratified_subsample(keys, max_rows=100)
+
+    assert rows.size == 100
+    assert np.all(np.diff(rows) > 0)
+    # NOTE: 100 rows over 7 even strata, two of them get the rows left by the rounding
+    np.testing.assert_array_equal(np.sort(np.bincount(keys[rows])), [14, 14, 14, 14, 14, 15, 15])
+
+
+def test_stratified_subsample_keeps_every_row_below_max_rows() -> None:
+    np.testing.assert_array_equal(stratified_subsample(np.zeros(5, dtype=np.int64), max_rows=10), np.arange(5))